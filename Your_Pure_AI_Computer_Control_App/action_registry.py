@@ -0,0 +1,160 @@
+# action_registry.py
+# Table of action types -> resolved 'execute' callables.
+#
+# Every entry of actions_config.json is imported and checked once when the registry is
+# loaded, so a missing module or 'execute' function is reported at startup instead of in
+# the middle of a scenario. Third-party packages can contribute actions through the
+# 'your_pure_ai.actions' entry point group, e.g. in their pyproject.toml:
+#
+#   [project.entry-points."your_pure_ai.actions"]
+#   "Double Click" = "my_package.double_click"
+#
+# The entry point may refer to a module with an execute() function (and optional
+# validate()), or directly to the execute callable. actions_config.json takes precedence
+# if both define the same action type.
+import importlib
+import os
+import threading
+from importlib import metadata
+
+ENTRY_POINT_GROUP = "your_pure_ai.actions"
+
+
+class ActionEntry:
+    __slots__ = ("type", "module_name", "execute", "validate", "source")
+
+    def __init__(self, action_type, module_name, execute, validate, source):
+        self.type = action_type
+        self.module_name = module_name
+        self.execute = execute
+        self.validate = validate
+        self.source = source  # 'config' or 'entry point'
+
+
+def _iter_entry_points():
+    try:
+        return metadata.entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:
+        # Python < 3.10: entry_points() returns a dict of groups
+        return metadata.entry_points().get(ENTRY_POINT_GROUP, [])
+
+
+class ActionRegistry:
+    def __init__(self, config_path, actions_package, load_config):
+        """
+        Args:
+            config_path (str): Path of actions_config.json.
+            actions_package (str): Package containing the built-in action modules ('actions').
+            load_config (callable): Reads and returns the parsed config file (raises on errors).
+        """
+        self.config_path = config_path
+        self.actions_package = actions_package
+        self.load_config = load_config
+        self._table = {}
+        self._signature = None
+        self._failed_signature = None  # Signature of a config file that could not be loaded
+        self._lock = threading.Lock()
+        self._reload_lock = threading.Lock()  # One check-and-reload at a time
+
+    def _config_signature(self):
+        try:
+            stat = os.stat(self.config_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None
+
+    def _resolve_module(self, action_type, module_name):
+        # Construct the full module path (e.g., 'actions.left_mouse_click')
+        module_path = f"{self.actions_package}.{module_name}"
+        try:
+            action_module = importlib.import_module(module_path)
+        except ModuleNotFoundError as e:
+            if e.name != module_path:
+                raise ValueError(f"Action module '{module_path}' failed to import: {e}")
+            raise ValueError(f"Action module not found: '{module_path}.py'. Ensure file exists in '{self.actions_package}' and is listed correctly in {self.config_path}.")
+
+        execute_func = getattr(action_module, 'execute', None)
+        if not callable(execute_func):
+            raise ValueError(f"Module '{module_path}' does not have an 'execute' function.")
+        return ActionEntry(action_type, module_name, execute_func,
+                           getattr(action_module, 'validate', None), "config")
+
+    @staticmethod
+    def _resolve_entry_point(entry_point):
+        target = entry_point.load()
+        if callable(getattr(target, 'execute', None)):
+            execute_func = target.execute
+        elif callable(target):
+            execute_func = target
+        else:
+            raise ValueError(f"Entry point '{entry_point.value}' is neither an action module nor a callable.")
+        return ActionEntry(entry_point.name, entry_point.value, execute_func,
+                           getattr(target, 'validate', None), "entry point")
+
+    def load(self):
+        """
+        Resolves every configured action and swaps in the new table.
+
+        Raises:
+            ValueError: Listing every action that could not be resolved. The previous
+                        table (if any) stays active in that case.
+        """
+        signature = self._config_signature()
+        actions_config = self.load_config()
+        if not isinstance(actions_config, dict):
+            raise ValueError(f"'{self.config_path}' must contain a JSON object mapping action types to modules.")
+
+        table = {}
+        problems = []
+        for action_type, module_name in actions_config.items():
+            try:
+                table[action_type] = self._resolve_module(action_type, module_name)
+            except Exception as e:
+                problems.append(f"'{action_type}': {e}")
+
+        for entry_point in _iter_entry_points():
+            if entry_point.name in table:
+                print(f"Warning: Action '{entry_point.name}' from entry point '{entry_point.value}' is shadowed by {self.config_path}.")
+                continue
+            try:
+                table[entry_point.name] = self._resolve_entry_point(entry_point)
+                print(f"Registered action '{entry_point.name}' from entry point '{entry_point.value}'.")
+            except Exception as e:
+                problems.append(f"'{entry_point.name}' (entry point '{entry_point.value}'): {e}")
+
+        if problems:
+            raise ValueError("Invalid action configuration:\n  " + "\n  ".join(problems))
+
+        with self._lock:
+            self._table, self._signature = table, signature
+        print(f"Action registry loaded ({len(table)} actions).")
+
+    def reload_if_changed(self):
+        """
+        Reloads the table if actions_config.json changed. Returns True if it was reloaded.
+
+        A broken config is reported once and the previous table stays active; the file is
+        not read again until it changes.
+        """
+        signature = self._config_signature()
+        if signature is not None and signature in (self._signature, self._failed_signature):
+            return False
+        with self._reload_lock:
+            signature = self._config_signature()
+            if signature is not None and signature in (self._signature, self._failed_signature):
+                return False  # Another thread reloaded it meanwhile
+            try:
+                self.load()
+            except Exception as e:
+                self._failed_signature = signature
+                print(f"Error: Could not reload '{self.config_path}', keeping the previous actions: {e}")
+                return False
+            self._failed_signature = None
+            return True
+
+    def resolve(self, action_type):
+        """Returns (module_name, execute, validate) for an action type. Raises ValueError if unknown."""
+        entry = self._table.get(action_type)
+        if entry is None:
+            raise ValueError(f"Unknown action type '{action_type}'. Check scenario and {self.config_path}.")
+        return entry.module_name, entry.execute, entry.validate
@@ -0,0 +1,31 @@
+# actions/_validation.py
+# Checks of screen positions and regions shared by the validate() functions of the actions.
+
+REGION_KEYS = ("x", "y", "width", "height")
+
+
+def _is_number(value, integer=False):
+    if isinstance(value, bool):
+        return False
+    return isinstance(value, int) if integer else isinstance(value, (int, float))
+
+
+def validate_region(region, key="region"):
+    """Raises ValueError unless 'region' is None or an object with integer x, y, width and height."""
+    if region is None:
+        return
+    if not isinstance(region, dict) or not all(_is_number(region.get(name), integer=True) for name in REGION_KEYS):
+        raise ValueError(f"'{key}' must be an object with integer 'x', 'y', 'width' and 'height'.")
+    if region["width"] <= 0 or region["height"] <= 0:
+        raise ValueError(f"'{key}' width and height must be positive.")
+
+
+def validate_position(position, key, integer=False):
+    """Raises ValueError unless 'position' is an object with numeric (or integer) 'x' and 'y'."""
+    kind = "an integer" if integer else "a number"
+    if not isinstance(position, dict):
+        raise ValueError(f"Missing or invalid '{key}': must be an object with 'x' and 'y'.")
+    for axis in ("x", "y"):
+        value = position.get(axis)
+        if not _is_number(value, integer):
+            raise ValueError(f"'{key}' '{axis}' must be {kind} (received {value!r}).")
@@ -0,0 +1,91 @@
+# actions/click_image.py
+import os
+from input_backend import get_input_backend, MOUSE_BUTTONS
+from wait_conditions import wait_until
+import image_matcher
+from actions._validation import validate_region
+
+DEFAULT_CONFIDENCE = 0.9
+RETRY_POLL_INTERVAL_SECONDS = 0.1
+RETRY_MAX_POLL_INTERVAL_SECONDS = 0.5
+
+
+def _region_tuple(region):
+    return tuple(region[key] for key in ("x", "y", "width", "height")) if region else None
+
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    if not isinstance(data.get("template"), str) or not data.get("template"):
+        raise ValueError("Missing 'template' (path of the image to click).")
+    if not os.path.isfile(data["template"]):
+        raise ValueError(f"Template image '{data['template']}' not found.")
+    confidence = data.get("confidence", DEFAULT_CONFIDENCE)
+    if isinstance(confidence, bool) or not isinstance(confidence, (int, float)) or not 0 < confidence <= 1:
+        raise ValueError(f"'confidence' must be a number between 0 and 1 (received {confidence!r}).")
+    validate_region(data.get("region"))
+    offset = data.get("offset", {})
+    if not isinstance(offset, dict) or not all(isinstance(offset.get(axis, 0), int) for axis in ("x", "y")):
+        raise ValueError("'offset' must be an object with integer 'x' and 'y'.")
+    if data.get("button", "left") not in MOUSE_BUTTONS:
+        raise ValueError(f"'button' must be one of {list(MOUSE_BUTTONS)}.")
+    timeout = data.get("timeout", 0)
+    if isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout < 0:
+        raise ValueError("'timeout' must be a number of seconds (0 = search once).")
+    if not isinstance(data.get("use_cache", True), bool):
+        raise ValueError("'use_cache' must be true or false.")
+
+
+def execute(data, variables, runner_instance):
+    """
+    Finds the template image on the screen and clicks its center (plus the optional offset).
+
+    Args:
+        data (dict): The action's data dictionary from the scenario.
+                     Expected keys: 'template' (image path). Optional: 'confidence' (0..1),
+                     'region' (dict with 'x', 'y', 'width', 'height'), 'offset' (dict with
+                     'x', 'y'), 'button' ('left', 'middle', 'right'), 'timeout' (seconds to
+                     keep searching until the image appears), 'use_cache' (check the
+                     last known location first, default True).
+        variables (dict): The dictionary of current scenario variables.
+        runner_instance (ScenarioRunner): The instance of the ScenarioRunner.
+
+    Returns:
+        bool: True if the image was found and clicked, False otherwise.
+    """
+    template_path = data.get("template")
+    confidence = data.get("confidence", DEFAULT_CONFIDENCE)
+    region = _region_tuple(data.get("region"))
+    try:
+        found = []
+
+        def search():
+            match = image_matcher.locate_on_screen(template_path, confidence, region,
+                                                   use_cache=data.get("use_cache", True))
+            if match is not None:
+                found.append(match)
+            return match is not None
+
+        wait_until(search, data.get("timeout", 0), RETRY_POLL_INTERVAL_SECONDS,
+                   RETRY_MAX_POLL_INTERVAL_SECONDS, runner_instance.stop_execution_flag)
+        if not found:
+            if runner_instance.stop_execution_flag.is_set():
+                print("Click Image: Execution cancelled.")
+                return False
+            error_message = f"Click Image: '{template_path}' not found on screen (confidence {confidence})."
+            print(error_message)
+            runner_instance.display_message("Action Error", error_message, error=True)
+            return False
+
+        match = found[0]
+        offset = data.get("offset", {})
+        x, y = match.center
+        x, y = x + offset.get("x", 0), y + offset.get("y", 0)
+        get_input_backend().click(x, y, button=data.get("button", "left"))
+        print(f"Action 'Click Image' executed at ({x}, {y}), {match}.")
+        return True
+    except Exception as e:
+        error_message = f"Error executing 'Click Image': {e}"
+        print(error_message)
+        runner_instance.display_message("Action Error", error_message, error=True)
+        return False
@@ -1,8 +1,13 @@
 # actions/copy_to_clipboard.py
-import pyautogui
-import time
+from input_backend import get_input_backend
+from wait_conditions import parse_post_condition
 import platform # To potentially add OS-specific keys later
 
+# Used unless the step defines its own 'wait_until': continue as soon as the clipboard
+# content changed, but don't fail if it didn't (the same text may have been copied again)
+DEFAULT_POST_CONDITION = parse_post_condition(
+    {"condition": "clipboard_changed", "timeout": 0.5, "required": False})
+
 def execute(data, variables, runner_instance):
     """
     Simulates pressing Ctrl+C (or Cmd+C on macOS) to copy selected content to the clipboard.
@@ -24,18 +29,22 @@ def execute(data, variables, runner_instance):
         copy_key = 'command'
 
     try:
+        # The application updates the clipboard asynchronously - wait for the new content
+        # unless the step has its own 'wait_until' (handled by the runner)
+        predicate = None if "wait_until" in data else DEFAULT_POST_CONDITION.arm(runner_instance)
+
         print(f"Copy to Clipboard: Simulating '{copy_key}+c'")
-        # Use pyautogui's hotkey function to press the combination
-        pyautogui.hotkey(copy_key, 'c')
+        get_input_backend().hotkey(copy_key, 'c')
 
-        # It's crucial to wait briefly after issuing the command
-        # for the OS and application to process it and update the clipboard.
-        time.sleep(0.2) # Adjust if needed, 200ms is usually sufficient
+        if predicate is not None and not DEFAULT_POST_CONDITION.wait(predicate, runner_instance.stop_execution_flag):
+            if runner_instance.stop_execution_flag.is_set():
+                return False
+            print("Copy to Clipboard: Clipboard content did not change (same text copied again?).")
 
         return True
 
     except Exception as e:
-        # Catch potential errors from pyautogui or unexpected issues
+        # Catch potential errors from the input backend or unexpected issues
         error_message = f"Error executing 'Copy to Clipboard': {e}"
         import traceback
         print(error_message)
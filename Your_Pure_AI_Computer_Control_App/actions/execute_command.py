@@ -1,105 +1,252 @@
 # actions/execute_command.py
-import subprocess
-import platform
-import os
-import urllib.parse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import command_cache
+import command_runner
+import shell_sessions
 
-def execute(data, variables, runner_instance):
+ENCODED_VARIABLE_FILTERS = {"enc_": "urlencode"} # Variable name prefix -> template filter
+VARIABLE_KEYS = ("exit_code_variable", "output_variable", "error_variable")
+FAN_OUT_POLICIES = ("collect_all", "fail_fast")
+DEFAULT_MAX_WORKERS = 4
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    command_type = str(data.get("command_type", "")).lower()
+    if command_type not in command_runner.SHELLS:
+        raise ValueError(f"Invalid 'command_type' ('{command_type}'). Must be one of {list(command_runner.SHELLS)}.")
+    if command_type not in command_runner.available_shells():
+        raise ValueError(f"'command_type' '{command_type}' is only available on Windows.")
+    commands = data.get("commands")
+    if not commands:
+        raise ValueError("Missing 'commands' to execute.")
+    if isinstance(commands, list):
+        if not all(isinstance(command, str) and command.strip() for command in commands):
+            raise ValueError("Every entry of the 'commands' list must be a non-empty string.")
+    elif not isinstance(commands, str):
+        raise ValueError("'commands' must be a string or a list of strings (run in parallel).")
+    timeout = data.get("timeout")
+    if timeout is not None and (isinstance(timeout, bool) or not isinstance(timeout, (int, float)) or timeout <= 0):
+        raise ValueError("'timeout' must be a positive number of seconds.")
+    output_lines = data.get("output_lines", command_runner.OUTPUT_TAIL_LINES)
+    if isinstance(output_lines, bool) or not isinstance(output_lines, int) or output_lines < 1:
+        raise ValueError("'output_lines' must be a positive integer.")
+    for key in VARIABLE_KEYS:
+        if data.get(key) is not None and not isinstance(data[key], str):
+            raise ValueError(f"'{key}' must be a variable name.")
+    if not isinstance(data.get("reuse_session", False), bool):
+        raise ValueError("'reuse_session' must be true or false.")
+    if data.get("reuse_session") and command_type not in shell_sessions.SESSION_SHELLS:
+        raise ValueError(f"'reuse_session' is supported for {list(shell_sessions.SESSION_SHELLS)}, not '{command_type}'.")
+    max_workers = data.get("max_workers", DEFAULT_MAX_WORKERS)
+    if isinstance(max_workers, bool) or not isinstance(max_workers, int) or max_workers < 1:
+        raise ValueError("'max_workers' must be a positive integer.")
+    if data.get("policy", "collect_all") not in FAN_OUT_POLICIES:
+        raise ValueError(f"'policy' must be one of {list(FAN_OUT_POLICIES)}.")
+    command_cache.validate(data.get("cache"))
+
+
+class _EitherEvent:
+    """is_set() of two events combined - stops a branch on a scenario stop or a fail-fast abort."""
+
+    def __init__(self, first, second):
+        self.first = first
+        self.second = second
+
+    def is_set(self):
+        return self.first.is_set() or self.second.is_set()
+
+
+def _run(data, command_type, commands, stop_event, echo_prefix=""):
     """
-    Executes one or more commands in the specified shell (cmd or powershell).
-    ...
+    Runs one command (in a fresh process or a reused session) and returns its CommandResult.
+    With a "cache" setting, a cached result of the same command is returned instead.
     """
+    tail_lines = data.get("output_lines", command_runner.OUTPUT_TAIL_LINES)
+    cache = command_cache.settings(data)
+    if cache:
+        result = command_cache.get(command_type, commands, tail_lines)
+        if result is not None:
+            print(f"{echo_prefix}(cached result)")
+            for line in result.stdout:
+                print(f"{echo_prefix}{line}")
+            for line in result.stderr:
+                print(f"{echo_prefix}[stderr] {line}")
+            return result
 
-    if runner_instance.stop_execution_flag.is_set():
-        print("Execute Command: Execution cancelled before start.")
-        return False
+    options = {
+        "timeout": data.get("timeout"),
+        "stop_event": stop_event,
+        "tail_lines": tail_lines,
+        "echo_prefix": echo_prefix
+    }
+    if data.get("reuse_session", False):
+        result = shell_sessions.run(command_type, commands, **options)
+    else:
+        result = command_runner.run_command(command_runner.shell_args(command_type, commands)[1], **options)
+    if cache:
+        ttl, persist = cache
+        command_cache.put(command_type, commands, tail_lines, result, ttl, persist)
+    return result
 
-    # --- Basic Platform Check ---
-    if platform.system() != "Windows":
-        error_message = "Execute Command: This action currently only supports Windows."
-        print(f"Warning: {error_message}")
-        runner_instance.display_message("Action Error", error_message, error=True)
-        return False
 
-    # --- Get Data ---
-    command_type = str(data.get("command_type", "")).lower()
-    commands_template = data.get("commands", "")
+def _store_result(data, variables, result, suffix=""):
+    """Stores the captured exit code / output in the configured variables (+ 'suffix')."""
+    captured = {
+        "exit_code_variable": "" if result.returncode is None else str(result.returncode),
+        "output_variable": result.stdout_text,
+        "error_variable": result.stderr_text,
+    }
+    for key, value in captured.items():
+        if data.get(key):
+            variables[f"{data[key]}{suffix}"] = value
 
-    # --- Validate Data ---
-    if not command_type:
-        error_message = "Execute Command: Missing 'command_type' (should be 'cmd' or 'powershell')."
-        print(error_message)
-        runner_instance.display_message("Action Error", error_message, error=True)
+
+def _execute_fan_out(data, variables, runner_instance, command_type, commands_list, shell_name):
+    """
+    Runs the entries of a 'commands' list in parallel (at most 'max_workers' at a time).
+    Results go to indexed variables, e.g. 'output_variable' "out" -> out_0, out_1, ...
+    'policy' "collect_all" runs every command; "fail_fast" stops the others as soon as one
+    fails (non-zero exit code, timeout or launch error) and fails the step.
+    """
+    fail_fast = data.get("policy", "collect_all") == "fail_fast"
+    aborted = threading.Event()
+    stop_event = _EitherEvent(runner_instance.stop_execution_flag, aborted)
+
+    def run_branch(index, commands):
+        if stop_event.is_set():
+            return None, "not started"
+        try:
+            result = _run(data, command_type, commands, stop_event, echo_prefix=f"[{index}] ")
+        except OSError as e:
+            if fail_fast:
+                aborted.set()
+            return None, f"could not be started: {e}"
+        if fail_fast and not result.cancelled and result.returncode != 0:
+            aborted.set()
+        return result, None
+
+    max_workers = min(data.get("max_workers", DEFAULT_MAX_WORKERS), len(commands_list))
+    print(f"Execute Command: Running {len(commands_list)} commands via {shell_name}, "
+          f"{max_workers} at a time ({'fail fast' if fail_fast else 'collect all'}).")
+    print("--- Command Output ---")
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="execute_command") as pool:
+        futures = [pool.submit(run_branch, index, commands) for index, commands in enumerate(commands_list)]
+        outcomes = [future.result() for future in futures]
+    print("----------------------")
+
+    failures = []
+    for index, (result, error) in enumerate(outcomes):
+        if result is None:
+            print(f"Execute Command: [{index}] {error}.")
+            if error != "not started":
+                failures.append(f"[{index}] {error}")
+            continue
+        _store_result(data, variables, result, suffix=f"_{index}")
+        if result.cancelled:
+            print(f"Execute Command: [{index}] cancelled, process terminated.")
+        elif result.timed_out:
+            print(f"Execute Command: [{index}] did not finish within {data.get('timeout')} seconds and was terminated.")
+            failures.append(f"[{index}] timed out")
+        else:
+            print(f"Execute Command: [{index}] finished with return code: {result.returncode} ({result.duration:.2f} s)")
+            if fail_fast and result.returncode != 0:
+                failures.append(f"[{index}] returned {result.returncode}")
+
+    if runner_instance.stop_execution_flag.is_set():
+        print("Execute Command: Execution cancelled, processes terminated.")
         return False
-    if command_type not in ["cmd", "powershell"]:
-        error_message = f"Execute Command: Invalid 'command_type' ('{command_type}'). Must be 'cmd' or 'powershell'."
+    if failures:
+        error_message = f"Execute Command: {len(failures)} of {len(commands_list)} commands failed: {', '.join(failures)}."
         print(error_message)
         runner_instance.display_message("Action Error", error_message, error=True)
         return False
-    if not commands_template:
-        error_message = "Execute Command: Missing 'commands' to execute."
-        print(error_message)
-        runner_instance.display_message("Action Error", error_message, error=True)
+    return True
+
+
+def execute(data, variables, runner_instance):
+    """
+    Executes one or more commands in the specified shell (cmd, powershell, bash or sh).
+    Output is streamed to the console while the command runs.
+
+    Args:
+        data (dict): The action's data dictionary from the scenario.
+                     Expected keys: 'command_type', 'commands' (a script, or a list of
+                     independent commands that are run in parallel).
+                     Optional: 'timeout' (seconds, the command is killed after it),
+                     'exit_code_variable', 'output_variable', 'error_variable' (receive the
+                     exit code and the last 'output_lines' lines of stdout / stderr),
+                     'reuse_session' (run in a pooled, already running shell),
+                     'max_workers' and 'policy' (for a list of commands), 'cache' (reuse
+                     the result of the same command for a while).
+        variables (dict): The dictionary of current scenario variables.
+        runner_instance (ScenarioRunner): The instance of the ScenarioRunner.
+
+    Returns:
+        bool: True if the command ran to completion (whatever its exit code), False if it
+              could not be started, timed out or was cancelled.
+    """
+
+    if runner_instance.stop_execution_flag.is_set():
+        print("Execute Command: Execution cancelled before start.")
         return False
 
-    # --- URL Encode variables starting with "enc_" ---
-    for key in variables:
-        if key.startswith("enc_"):
-            original_value = variables[key]
-            encoded_value = urllib.parse.quote(str(original_value), safe='')
-            variables[key] = encoded_value
+    # --- Get Data --- (already checked by validate() when the scenario was compiled)
+    command_type = str(data.get("command_type", "")).lower()
+    commands_template = data.get("commands", "")
 
     # --- Substitute Variables ---
+    # Variables starting with "enc_" are URL encoded while rendering (same as ${name|urlencode}),
+    # the stored variable values are left untouched.
     try:
-        commands_to_execute = runner_instance._substitute_variables(commands_template)
+        if isinstance(commands_template, list):
+            commands_to_execute = [runner_instance._substitute_variables(command, prefix_filters=ENCODED_VARIABLE_FILTERS)
+                                   for command in commands_template]
+        else:
+            commands_to_execute = runner_instance._substitute_variables(commands_template,
+                                                                        prefix_filters=ENCODED_VARIABLE_FILTERS)
     except Exception as e:
         error_message = f"Execute Command: Error during variable substitution: {e}"
         print(error_message)
         runner_instance.display_message("Action Error", error_message, error=True)
         return False
 
-    # --- Prepare Arguments for subprocess ---
-    args = []
-    shell_name = ""
-    if command_type == "cmd":
-        shell_name = "Command Prompt (cmd.exe)"
-        args = ['cmd', '/d', '/c', commands_to_execute]
-    elif command_type == "powershell":
-        shell_name = "PowerShell"
-        args = ['powershell', '-NoProfile', '-ExecutionPolicy', 'Bypass', '-Command', commands_to_execute]
-
-    print(f"Execute Command: Running via {shell_name}:")
+    shell_name = command_runner.SHELLS[command_type][0]
+    timeout = data.get("timeout")
+    reuse_session = data.get("reuse_session", False)
+    if isinstance(commands_to_execute, list):
+        try:
+            return _execute_fan_out(data, variables, runner_instance, command_type, commands_to_execute, shell_name)
+        except Exception as e:
+            error_message = f"Execute Command: An unexpected error occurred: {e}"
+            import traceback
+            print(error_message)
+            traceback.print_exc()
+            runner_instance.display_message("Action Error", error_message, error=True)
+            return False
+
+    print(f"Execute Command: Running via {shell_name}{' (reused session)' if reuse_session else ''}:")
     print(f"--- Start Command ---")
     print(commands_to_execute)
     print(f"--- End Command ---")
 
     # --- Execute Command ---
     try:
-        startupinfo = None
-        if platform.system() == "Windows":
-            startupinfo = subprocess.STARTUPINFO()
-            startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
-
-        result = subprocess.run(
-            args,
-            capture_output=True,
-            text=True,
-            check=False,
-            encoding='utf-8',
-            errors='replace',
-            startupinfo=startupinfo
-        )
-
-        print(f"Execute Command: Process finished with return code: {result.returncode}")
-        if result.stdout:
-            print("--- Command Output (stdout) ---")
-            print(result.stdout.strip())
-            print("-------------------------------")
-        if result.stderr:
-            print("--- Command Error Output (stderr) ---")
-            print(result.stderr.strip())
-            print("-----------------------------------")
+        print("--- Command Output ---")
+        result = _run(data, command_type, commands_to_execute, runner_instance.stop_execution_flag)
+        print("----------------------")
+
+        if result.cancelled:
+            print("Execute Command: Execution cancelled, process terminated.")
+            return False
+        if result.timed_out:
+            error_message = f"Execute Command: Command did not finish within {timeout} seconds and was terminated."
+            print(error_message)
+            runner_instance.display_message("Action Error", error_message, error=True)
+            return False
 
+        print(f"Execute Command: Process finished with return code: {result.returncode} ({result.duration:.2f} s)")
+        _store_result(data, variables, result)
         return True
 
     except FileNotFoundError:
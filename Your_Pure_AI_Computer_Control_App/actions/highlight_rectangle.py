@@ -1,9 +1,9 @@
 # actions/highlight_rectangle.py
 import tkinter as tk
 import threading
-import time
+from collections import OrderedDict
 import keyboard  # For waiting on 'enter'
-import pyautogui
+from input_backend import get_input_backend
 
 # --- Configuration for the Label ---
 LABEL_PADDING_Y = 5  # Vertical padding around the label text
@@ -11,17 +11,88 @@ LABEL_FONT = ("Arial", 10, "bold")  # Font for the message label
 LABEL_POSITION = "above"  # Or "below"
 WINDOW_OPACITY = 0.3  # Opacity for the entire window (0.0 to 1.0)
 
+# --- Timing (milliseconds) ---
+BRIEF_DISPLAY_MS = 1500       # How long the highlight is shown when nothing is awaited
+STOP_CHECK_INTERVAL_MS = 50   # How often the stop flag / Enter key are checked while waiting
+UNMAP_TIMEOUT_MS = 500        # Fallback if the window system never reports the window as hidden
+
+# --- Reuse ---
+MAX_POOLED_OVERLAYS = 2       # Hidden overlay windows kept per runner for the next highlights
+LABEL_HEIGHT_CACHE_SIZE = 256
+
+_label_heights = OrderedDict()  # (message, font) -> label height incl. padding
+_overlay_pools = {}             # Tk root -> OverlayPool
+
 
 class HighlightOverlayWindow(tk.Toplevel):
     """
     A Toplevel window for displaying the highlight rectangle and optional message.
     Handles positioning, always-on-top, transparency, and drawing.
+
+    The window is built once, hidden, and reconfigured by show() for each highlight
+    (see OverlayPool), so consecutive highlights don't rebuild and flicker.
     """
 
-    def __init__(self, parent, x, y, width, height, color="green", thickness=3, message=""):
+    def __init__(self, parent):
         super().__init__(parent)
+        self.withdraw()  # Shown by show() once geometry and contents are set
 
         self.parent = parent
+        self.message = ""
+        self.label_height = 0
+        self.click_coordinates = None  # Store the click coordinates
+        self.perform_automatic_click = False  # Flag to indicate if automatic click should be performed
+
+        # --- Window Attributes ---
+        self.overrideredirect(True)  # No window decorations
+
+        # --- Transparency Setup ---
+        try:
+            self.attributes("-alpha", WINDOW_OPACITY)  # Set window transparency
+            print(f"Using -alpha transparency with opacity: {WINDOW_OPACITY}")
+            self.config(bg="white")  # Set a background color (can be any color)
+        except tk.TclError:
+            print("Warning: -alpha attribute not supported. Overlay will be solid.")
+            self.config(bg="white")  # Default solid background
+
+        # --- Create Canvas, Rectangle and Label ---
+        # Canvas should fill the entire Toplevel window; items are positioned by show()
+        self.canvas = tk.Canvas(self, bg=self.config('bg')[-1], highlightthickness=0)
+        self.canvas.pack(fill=tk.BOTH, expand=True)
+        self.rectangle_item = self.canvas.create_rectangle(0, 0, 0, 0)
+        self.label_widget = tk.Label(
+            self.canvas,  # Place label inside the canvas
+            font=LABEL_FONT,
+            fg="black",  # Use black for readability against transparent bg
+            bg=self.config('bg')[-1]  # Match canvas background (transparent color or solid)
+        )
+        self.label_item = self.canvas.create_window(0, 0, window=self.label_widget, state="hidden")
+
+        # --- Event Handling Setup ---
+        # Set by the event handlers; wait_for() runs the Tk event loop until it changes
+        self._wait_result = tk.StringVar(self, value="")
+        self.bind("<Destroy>", self._on_destroy, add="+")
+        # Bind click to the canvas, as it covers the window
+        self.canvas.bind("<Button-1>", self._on_click)
+        self.label_widget.bind("<Button-1>", self._on_click)  # Also bind to label
+
+    def _measure_label_height(self, message):
+        """Height of the message label plus padding, cached per (message, font)."""
+        key = (message, LABEL_FONT)
+        height = _label_heights.get(key)
+        if height is None:
+            # A label's requested size is known as soon as its text is set
+            self.label_widget.config(text=message)
+            height = self.label_widget.winfo_reqheight() + (LABEL_PADDING_Y * 2)
+            _label_heights[key] = height
+            if len(_label_heights) > LABEL_HEIGHT_CACHE_SIZE:
+                _label_heights.popitem(last=False)
+        else:
+            _label_heights.move_to_end(key)
+        return height
+
+    def show(self, x, y, width, height, color="green", thickness=3, message=""):
+        """Moves, resizes and redraws the overlay for a new highlight and shows it."""
         self.rect_x = x
         self.rect_y = y
         self.rect_width = width
@@ -29,20 +100,11 @@ class HighlightOverlayWindow(tk.Toplevel):
         self.color = color
         self.thickness = thickness
         self.message = message
-        self.label_height = 0
-        self.label_widget = None
-        self.click_coordinates = None  # Store the click coordinates
-        self.perform_automatic_click = False  # Flag to indicate if automatic click should be performed
+        self.click_coordinates = None
+        self.perform_automatic_click = False
 
         # --- Calculate Label Size ---
-        if self.message:
-            # Create a temporary label to measure its size
-            temp_label = tk.Label(self, text=self.message, font=LABEL_FONT, fg=self.color,
-                                  bg="white")  # Use white bg temporarily
-            temp_label.pack()  # Pack temporarily to calculate size
-            self.update_idletasks()  # Ensure geometry is calculated
-            self.label_height = temp_label.winfo_reqheight() + (LABEL_PADDING_Y * 2)
-            temp_label.destroy()  # Remove the temporary label
+        self.label_height = self._measure_label_height(message) if message else 0
 
         # --- Calculate Overall Window Geometry ---
         self.window_width = self.rect_width
@@ -63,25 +125,6 @@ class HighlightOverlayWindow(tk.Toplevel):
 
         self.geometry(f"{self.window_width}x{self.window_height}+{self.window_x}+{self.window_y}")
 
-        # --- Window Attributes ---
-        self.overrideredirect(True)  # No window decorations
-        self.wm_attributes("-topmost", True)  # Always on top!
-        self.lift()  # Bring window to the front
-
-        # --- Transparency Setup ---
-        try:
-            self.attributes("-alpha", WINDOW_OPACITY)  # Set window transparency
-            print(f"Using -alpha transparency with opacity: {WINDOW_OPACITY}")
-            self.config(bg="white")  # Set a background color (can be any color)
-        except tk.TclError:
-            print("Warning: -alpha attribute not supported. Overlay will be solid.")
-            self.config(bg="white")  # Default solid background
-
-        # --- Create Canvas for Rectangle ---
-        # Canvas should fill the entire Toplevel window
-        self.canvas = tk.Canvas(self, bg=self.config('bg')[-1], highlightthickness=0)
-        self.canvas.pack(fill=tk.BOTH, expand=True)
-
         # --- Draw Rectangle ---
         # Calculate rectangle coordinates *relative to the canvas*
         canvas_rect_x0 = self.thickness / 2
@@ -94,37 +137,28 @@ class HighlightOverlayWindow(tk.Toplevel):
             canvas_rect_y0 += self.label_height
             canvas_rect_y1 += self.label_height
 
-        # Draw the rectangle border
-        self.canvas.create_rectangle(
-            canvas_rect_x0, canvas_rect_y0, canvas_rect_x1, canvas_rect_y1,
-            outline=self.color, width=self.thickness
-        )
+        # Move the rectangle border
+        self.canvas.coords(self.rectangle_item, canvas_rect_x0, canvas_rect_y0, canvas_rect_x1, canvas_rect_y1)
+        self.canvas.itemconfigure(self.rectangle_item, outline=self.color, width=self.thickness)
 
-        # --- Create Label for Message ---
-        if self.message:
-            self.label_widget = tk.Label(
-                self.canvas,  # Place label inside the canvas
-                text=self.message,
-                font=LABEL_FONT,
-                fg="black",  # Use black for readability against transparent bg
-                bg=self.config('bg')[-1]  # Match canvas background (transparent color or solid)
-            )
-            # Position label within the canvas
+        # --- Position Label for Message ---
+        if self.message and LABEL_POSITION in ("above", "below"):
+            self.label_widget.config(text=self.message)
             if LABEL_POSITION == "above":
-                self.canvas.create_window(self.rect_width / 2, self.label_height / 2, window=self.label_widget)
-            elif LABEL_POSITION == "below":
+                label_y_center = self.label_height / 2
+            else:
                 # Adjust y-position to be below the rectangle area within the canvas
                 label_y_center = self.rect_height + self.label_height / 2
-                self.canvas.create_window(self.rect_width / 2, label_y_center, window=self.label_widget)
-
-        # --- Event Handling Setup ---
-        self._clicked_event = threading.Event()
-        # Bind click to the canvas, as it covers the window
-        self.canvas.bind("<Button-1>", self._on_click)
-        if self.label_widget:
-            self.label_widget.bind("<Button-1>", self._on_click)  # Also bind to label
+            self.canvas.coords(self.label_item, self.rect_width / 2, label_y_center)
+            self.canvas.itemconfigure(self.label_item, state="normal")
+        else:
+            self.canvas.itemconfigure(self.label_item, state="hidden")
 
-        self.update()  # Ensure window is drawn
+        # --- Show ---
+        self.deiconify()
+        self.wm_attributes("-topmost", True)  # Always on top!
+        self.lift()  # Bring window to the front
+        self.update_idletasks()  # Ensure window is drawn
 
     def _on_click(self, event):
         # Check if click is within the *logical rectangle bounds* on the canvas
@@ -138,54 +172,138 @@ class HighlightOverlayWindow(tk.Toplevel):
         if (0 <= event.x <= self.rect_width and
                 rect_canvas_y_start <= event.y <= rect_canvas_y_end):
             print("Highlight clicked inside logical bounds!")
-            self._clicked_event.set()
             # Store the click coordinates relative to the screen
             self.click_coordinates = (self.window_x + event.x, self.window_y + event.y)
             self.perform_automatic_click = True  # Set the flag to perform the automatic click
+            self._wait_result.set("clicked")
         else:
             print("Highlight clicked outside logical bounds (e.g., on label area or padding).")
 
-    def wait_for_click_in_bounds(self, timeout=None):
+    def _on_destroy(self, event):
+        if event.widget is self:
+            self._wait_result.set("destroyed")
+
+    def wait_for(self, timeout_ms=None, stop_flag=None, event=None):
+        """
+        Processes Tk events until the rectangle is clicked, 'timeout_ms' passes, 'stop_flag' or
+        'event' (threading.Event) is set, or the window is destroyed. Nothing runs in between:
+        the click handler and 'after' timers end the wait, the flags are checked every
+        STOP_CHECK_INTERVAL_MS.
+
+        Returns:
+            str: "clicked", "timeout", "stopped", "event" or "destroyed".
+        """
+        self._wait_result.set("")
+        timers = {}
+        if timeout_ms is not None:
+            timers["timeout"] = self.parent.after(timeout_ms, self._wait_result.set, "timeout")
+
+        def check_flags():
+            if stop_flag is not None and stop_flag.is_set():
+                self._wait_result.set("stopped")
+            elif event is not None and event.is_set():
+                self._wait_result.set("event")
+            else:
+                timers["flags"] = self.parent.after(STOP_CHECK_INTERVAL_MS, check_flags)
+
+        if stop_flag is not None or event is not None:
+            check_flags()
+        if not self._wait_result.get():
+            self.wait_variable(self._wait_result)
+        for timer in timers.values():
+            self.parent.after_cancel(timer)
+        return self._wait_result.get()
+
+    def wait_for_click_in_bounds(self, timeout=None, stop_flag=None):
         """Waits until the user clicks within the logical highlight area."""
         print("Waiting for click inside highlight rectangle...")
-        # We need to run the Tkinter main loop briefly to process events
-        # This is tricky with threading. A simple wait might suffice if events get processed.
-        # Alternative: use self.parent.after() to periodically check the event?
-        start_time = time.time()
-        while True:
-            self.parent.update_idletasks()  # Process pending Tkinter events
-            self.parent.update()
-            if self._clicked_event.is_set():
-                print("Click detected by wait loop.")
-                return True
-            if timeout is not None and (time.time() - start_time) > timeout:
-                print("Timeout waiting for click.")
-                return False
-            time.sleep(0.05)  # Small sleep to prevent busy-waiting
-
-        # return self._clicked_event.wait(timeout) # Simple wait might not process clicks reliably
-
-    def close(self):
-        """Safely destroys the overlay window and performs the automatic click if needed."""
+        timeout_ms = None if timeout is None else int(timeout * 1000)
+        result = self.wait_for(timeout_ms, stop_flag)
+        if result == "clicked":
+            print("Click detected.")
+            return True
+        if result == "timeout":
+            print("Timeout waiting for click.")
+        return False
+
+    def hide(self):
+        """
+        Hides the overlay for reuse. After a click inside the rectangle, the click is passed on
+        to the window underneath once the overlay is gone.
+        """
+        if not self.winfo_ismapped():
+            self.withdraw()
+        elif self.perform_automatic_click and self.click_coordinates:
+            # Wait until the window is really unmapped, otherwise the click would hit the overlay
+            unmapped = tk.BooleanVar(self, value=False)
+            bind_id = self.bind("<Unmap>", lambda event: unmapped.set(True) if event.widget is self else None, add="+")
+            fallback = self.parent.after(UNMAP_TIMEOUT_MS, unmapped.set, True)
+            self.withdraw()
+            self.wait_variable(unmapped)
+            self.parent.after_cancel(fallback)
+            self.unbind("<Unmap>", bind_id)
+            get_input_backend().click(self.click_coordinates[0], self.click_coordinates[1], button='left')
+            print(f"Highlight Rectangle: Automatic click performed at {self.click_coordinates}")
+        else:
+            self.withdraw()
+        self.perform_automatic_click = False
+
+
+class OverlayPool:
+    """Hidden overlay windows of one Tk root, reused by consecutive Highlight Rectangle steps."""
+
+    def __init__(self, root):
+        self.root = root
+        self.idle = []
+
+    def acquire(self):
+        while self.idle:
+            overlay = self.idle.pop()
+            if overlay.winfo_exists():
+                return overlay
+        return HighlightOverlayWindow(self.root)
+
+    def release(self, overlay):
+        """Hides the overlay (performing its automatic click) and keeps it for the next step."""
         try:
-            # Schedule the destroy operation within the Tkinter event loop
-            # Needed if called from a different thread, good practice anyway.
-            if self.perform_automatic_click and self.click_coordinates:
-                self.parent.after(0, self._perform_click_and_destroy)
-            else:
-                self.parent.after(0, self.destroy)
+            overlay.hide()
         except tk.TclError as e:
-            print(f"Error scheduling highlight overlay destruction (may already be destroyed): {e}")
-        except Exception as e:
-            print(f"Unexpected error during overlay close scheduling: {e}")
+            print(f"Error hiding highlight overlay (may already be destroyed): {e}")
+            return
+        if len(self.idle) < MAX_POOLED_OVERLAYS:
+            self.idle.append(overlay)
+        else:
+            overlay.destroy()
+
+
+def get_overlay_pool(root):
+    """The overlay pool of 'root'; it is dropped when the root window is destroyed."""
+    pool = _overlay_pools.get(root)
+    if pool is None:
+        pool = _overlay_pools[root] = OverlayPool(root)
+
+        def on_destroy(event):
+            if event.widget is root:
+                _overlay_pools.pop(root, None)
+
+        root.bind("<Destroy>", on_destroy, add="+")
+    return pool
 
-    def _perform_click_and_destroy(self):
-        """Performs the automatic click and then destroys the window."""
-        self.update()  # Process any pending events, including destroy
-        time.sleep(1)  # Wait for 1 second to ensure the window is gone
-        pyautogui.click(x=self.click_coordinates[0], y=self.click_coordinates[1], button='left')
-        print(f"Highlight Rectangle: Automatic click performed at {self.click_coordinates}")
-        self.destroy()
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    coords = data.get("coordinates", {})
+    if not isinstance(coords, dict):
+        raise ValueError("'coordinates' must be an object with 'start' and 'end'.")
+    for corner in ("start", "end"):
+        point = coords.get(corner, [0, 0])
+        if (not isinstance(point, (list, tuple)) or len(point) != 2 or
+                not all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in point)):
+            raise ValueError(f"Coordinate '{corner}' must be a pair of numbers (received {point!r}).")
+    try:
+        int(data.get("thickness", 3))
+    except (TypeError, ValueError):
+        raise ValueError(f"'thickness' must be a number (received {data.get('thickness')!r}).")
 
 
 def execute(data, variables, runner_instance):
@@ -206,6 +324,7 @@ def execute(data, variables, runner_instance):
         return False
 
     overlay = None  # Initialize overlay variable
+    pool = None
 
     try:
         # --- Get Data ---
@@ -233,16 +352,15 @@ def execute(data, variables, runner_instance):
         # --- Create and Show Overlay ---
         print(
             f"Highlight Rectangle: Displaying at ({x},{y}) size {width}x{height}, Color: {color}, Msg: '{message[:30]}...'")
-        overlay = HighlightOverlayWindow(
-            runner_instance.root,  # Use hidden root as parent
-            x, y, width, height,
-            color, thickness, message
-        )
+        pool = get_overlay_pool(runner_instance.root)  # Overlays are children of the hidden root
+        overlay = pool.acquire()
+        overlay.show(x, y, width, height, color, thickness, message)
 
         # --- Handle Waiting Logic ---
         success = True
+        stop_flag = runner_instance.stop_execution_flag
         if wait_click:
-            clicked = overlay.wait_for_click_in_bounds(timeout=None)  # No timeout for now
+            clicked = overlay.wait_for_click_in_bounds(timeout=None, stop_flag=stop_flag)  # No timeout for now
             if not clicked:
                 print("Highlight Rectangle: Wait for click failed or timed out.")
                 # Decide if this is a failure - typically yes if waiting was required
@@ -253,21 +371,23 @@ def execute(data, variables, runner_instance):
         elif wait_text:
             # Simplified: Wait for Enter key press after highlight is shown
             print("Highlight Rectangle: Waiting for ENTER key press...")
+            # The keyboard hook runs on its own thread; the overlay keeps handling Tk events
+            # and picks the key press up with the stop flag check
+            enter_pressed = threading.Event()
             try:
-                keyboard.wait('enter')  # This blocks this thread
-                print("Highlight Rectangle: Enter key pressed.")
+                hook = keyboard.on_press_key('enter', lambda event: enter_pressed.set())
+                try:
+                    if overlay.wait_for(stop_flag=stop_flag, event=enter_pressed) == "event":
+                        print("Highlight Rectangle: Enter key pressed.")
+                finally:
+                    keyboard.unhook(hook)
             except Exception as ke:
                 print(f"Highlight Rectangle: Error waiting for Enter key: {ke}")
                 success = False  # Indicate failure if keyboard wait failed
         else:
             # No wait required, show briefly
             print("Highlight Rectangle: Displaying briefly.")
-            # We need to keep Tkinter events processed for the duration
-            start_time = time.time()
-            while time.time() - start_time < 1.5:  # Show for 1.5 seconds
-                runner_instance.root.update_idletasks()
-                runner_instance.root.update()
-                time.sleep(0.05)
+            overlay.wait_for(timeout_ms=BRIEF_DISPLAY_MS, stop_flag=stop_flag)
 
         # --- Final Check for Cancellation ---
         if runner_instance.stop_execution_flag.is_set():
@@ -292,7 +412,7 @@ def execute(data, variables, runner_instance):
         # --- Cleanup ---
         if overlay:
             print("Highlight Rectangle: Closing overlay.")
-            overlay.close()
+            pool.release(overlay)
         # Ensure Tkinter state is updated after potential blocking calls
         try:
             if runner_instance and runner_instance.root and runner_instance.root.winfo_exists():
@@ -3,6 +3,12 @@
 # We'll keep tts_engine initialization in the main script for simplicity,
 # and access it via runner_instance if needed, or just use display_message.
 
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    if not isinstance(data.get("message", ""), str):
+        raise ValueError("'message' must be a string.")
+
+
 def execute(data, variables, runner_instance):
     """
     Displays an informational message box to the user.
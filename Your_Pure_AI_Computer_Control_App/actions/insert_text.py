@@ -1,5 +1,66 @@
 # actions/insert_text.py
-import pyautogui
+import platform
+import time
+from input_backend import get_input_backend
+from clipboard_service import get_clipboard_service, CLIPBOARD_TRIGGER_PREFIX
+
+# Insertion modes ('mode' in the step data):
+#   type  - Types character by character with a short delay (default, previous behaviour).
+#   keys  - Injects all key events in one batch without a per-character delay.
+#   paste - Puts the text on the clipboard, presses Ctrl+V (Cmd+V on macOS) and restores
+#           the previous clipboard content afterwards. Fastest for large text blocks and
+#           works for any character the target application accepts.
+INSERT_MODES = ("type", "keys", "paste")
+TYPE_INTERVAL_SECONDS = 0.01
+# How long 'paste' mode waits for the target application to fetch the clipboard content
+# before the previous content is restored
+PASTE_RESTORE_TIMEOUT_SECONDS = 0.5
+# Minimum time between Ctrl+V and the restore. A clipboard manager fetching the new content
+# also counts as a request, so a request alone doesn't prove the application has pasted.
+PASTE_RESTORE_MIN_DELAY_SECONDS = 0.2
+
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    if not isinstance(data.get("text", ""), str):
+        raise ValueError("'text' must be a string.")
+    if data.get("mode", "type") not in INSERT_MODES:
+        raise ValueError(f"'mode' must be one of {list(INSERT_MODES)}.")
+    if not isinstance(data.get("restore_clipboard", True), bool):
+        raise ValueError("'restore_clipboard' must be true or false.")
+
+
+def _paste_text(text, restore_clipboard):
+    """Inserts 'text' through the clipboard, then puts the previous content back."""
+    clipboard = get_clipboard_service()
+    previous = None
+    if restore_clipboard:
+        try:
+            previous = clipboard.paste()
+        except Exception as e:
+            print(f"Insert Text: Could not save the clipboard ({e}). It will not be restored.")
+        if previous is not None and previous.startswith(CLIPBOARD_TRIGGER_PREFIX):
+            # Restoring the trigger that started this scenario would make the clipboard
+            # monitor see it as new content and run the scenario again
+            print("Insert Text: Clipboard held a scenario trigger. It will not be restored.")
+            previous = None
+
+    paste_key = 'command' if platform.system() == 'Darwin' else 'ctrl'
+    clipboard.copy(text)
+    requests_before = clipboard.request_count
+    get_input_backend().hotkey(paste_key, 'v')
+    pasted_at = time.monotonic()
+
+    if previous is not None:
+        # Restoring too early would make the application paste the old content
+        if not clipboard.wait_for_request(requests_before, PASTE_RESTORE_TIMEOUT_SECONDS) \
+                and clipboard.name != "pyperclip":
+            print("Insert Text: Target application did not fetch the clipboard in time.")
+        remaining = PASTE_RESTORE_MIN_DELAY_SECONDS - (time.monotonic() - pasted_at)
+        if remaining > 0:
+            time.sleep(remaining)
+        clipboard.copy(previous)
+
 
 def execute(data, variables, runner_instance):
     """
@@ -9,12 +70,18 @@ def execute(data, variables, runner_instance):
         text_to_insert_template = data.get("text", "")
         # Use the runner's variable substitution method
         text_to_insert = runner_instance._substitute_variables(text_to_insert_template)
+        mode = data.get("mode", "type")
 
-        pyautogui.write(text_to_insert, interval=0.01)
-        print(f"Action 'Insert Text' executed with text: {text_to_insert[:50]}...") # Log truncated text
+        if mode == "paste":
+            _paste_text(text_to_insert, data.get("restore_clipboard", True))
+        elif mode == "keys":
+            get_input_backend().write(text_to_insert)
+        else:
+            get_input_backend().write(text_to_insert, interval=TYPE_INTERVAL_SECONDS)
+        print(f"Action 'Insert Text' ({mode}) executed with text: {text_to_insert[:50]}...") # Log truncated text
         return True
     except Exception as e:
         error_message = f"Error executing 'Insert Text': {e}"
         print(error_message)
         runner_instance.display_message("Action Error", error_message, error=True)
-        return False
\ No newline at end of file
+        return False
@@ -1,6 +1,11 @@
 # actions/left_mouse_click.py
-import pyautogui
-import time
+from input_backend import get_input_backend
+from actions._validation import validate_position
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    validate_position(data.get("coordinates"), "coordinates")
+
 
 def execute(data, variables, runner_instance):
     """
@@ -23,8 +28,7 @@ def execute(data, variables, runner_instance):
         # You can access runner methods/attributes if needed:
         # runner_instance.display_message("Debug", f"Clicking at {x},{y}")
 
-        pyautogui.click(x=x, y=y, button='left')
-        time.sleep(0.1) # Small delay after click
+        get_input_backend().click(x, y, button='left') # No implicit pause after the click
         print(f"Action 'Left Mouse Click' executed at ({x}, {y}).")
         return True
     except Exception as e:
@@ -1,6 +1,5 @@
 # actions/paste_from_clipboard.py
-import pyautogui
-import time
+from input_backend import get_input_backend
 import platform # To potentially add OS-specific keys later
 
 def execute(data, variables, runner_instance):
@@ -25,16 +24,11 @@ def execute(data, variables, runner_instance):
 
     try:
         print(f"Paste from Clipboard: Simulating '{paste_key}+v'")
-        # Use pyautogui's hotkey function to press the combination
-        pyautogui.hotkey(paste_key, 'v')
-
-        # Add a small delay after pasting, though often less critical than after copy
-        time.sleep(0.1)
-
+        get_input_backend().hotkey(paste_key, 'v')
         return True
 
     except Exception as e:
-        # Catch potential errors from pyautogui or unexpected issues
+        # Catch potential errors from the input backend or unexpected issues
         error_message = f"Error executing 'Paste from Clipboard': {e}"
         import traceback
         print(error_message)
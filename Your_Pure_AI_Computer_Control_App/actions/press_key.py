@@ -1,6 +1,5 @@
 # actions/press_key.py
-import pyautogui
-import time
+from input_backend import get_input_backend
 
 # List of keys supported by pyautogui.press() that we explicitly allow
 # You can expand this list based on pyautogui's documentation if needed.
@@ -20,6 +19,15 @@ SUPPORTED_KEYS = [
 # SUPPORTED_KEYS.extend(list('abcdefghijklmnopqrstuvwxyz0123456789'))
 
 
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    key = data.get("key")
+    if not key:
+        raise ValueError("No 'key' specified in action data.")
+    if str(key).lower() not in SUPPORTED_KEYS:
+        raise ValueError(f"Key '{key}' is not supported or allowed. Allowed keys: {SUPPORTED_KEYS}")
+
+
 def execute(data, variables, runner_instance):
     """
     Presses a specified keyboard key.
@@ -56,12 +64,11 @@ def execute(data, variables, runner_instance):
 
     try:
         print(f"Press Key: Pressing '{key_to_press}'")
-        pyautogui.press(key_to_press)
-        time.sleep(0.1) # Small delay after pressing the key
+        get_input_backend().press(key_to_press) # No implicit pause after the key press
         return True
 
     except Exception as e:
-        # Catch potential errors from pyautogui or unexpected issues
+        # Catch potential errors from the input backend or unexpected issues
         error_message = f"Error executing 'Press Key' for key '{key_to_press}': {e}"
         import traceback
         print(error_message)
@@ -1,6 +1,11 @@
 # actions/right_mouse_click.py
-import pyautogui
-import time
+from input_backend import get_input_backend
+from actions._validation import validate_position
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    validate_position(data.get("coordinates"), "coordinates")
+
 
 def execute(data, variables, runner_instance):
     """
@@ -46,14 +51,12 @@ def execute(data, variables, runner_instance):
 
         # --- Execute Click ---
         print(f"Right Mouse Click: Clicking at ({int(x)}, {int(y)})")
-        # pyautogui handles float coordinates, but printing ints is cleaner
-        pyautogui.click(x=int(x), y=int(y), button='right')
-        time.sleep(0.1) # Small delay after click
+        get_input_backend().click(int(x), int(y), button='right') # No implicit pause after the click
 
         return True
 
     except Exception as e:
-        # Catch potential errors from pyautogui or unexpected issues
+        # Catch potential errors from the input backend or unexpected issues
         error_message = f"Error executing 'Right Mouse Click': {e}"
         import traceback
         print(error_message)
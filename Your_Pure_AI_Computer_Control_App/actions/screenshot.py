@@ -0,0 +1,61 @@
+# actions/screenshot.py
+import base64
+import io
+import os
+import screen_capture
+from actions._validation import validate_region
+
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    path, variable = data.get("path"), data.get("variable")
+    if not path and not variable:
+        raise ValueError("Set 'path' (file to write) and/or 'variable' (variable to store the image in).")
+    for key in ("path", "variable"):
+        if data.get(key) is not None and not isinstance(data[key], str):
+            raise ValueError(f"'{key}' must be a string.")
+    validate_region(data.get("region"))
+
+
+def execute(data, variables, runner_instance):
+    """
+    Captures the screen (or a region of it) as a PNG image.
+
+    Args:
+        data (dict): The action's data dictionary from the scenario.
+                     Keys: 'path' (file to write, supports ${variable}) and/or 'variable'
+                     (name of the variable that receives the PNG as base64 text).
+                     Optional: 'region' (dict with 'x', 'y', 'width', 'height').
+        variables (dict): The dictionary of current scenario variables.
+        runner_instance (ScenarioRunner): The instance of the ScenarioRunner.
+
+    Returns:
+        bool: True if execution was successful, False otherwise.
+    """
+    try:
+        region = data.get("region")
+        if region:
+            region = (region["x"], region["y"], region["width"], region["height"])
+        image = screen_capture.grab_image(region)
+
+        path = data.get("path")
+        if path:
+            path = runner_instance._substitute_variables(path)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            image.save(path, format="PNG")
+            print(f"Action 'Screenshot' saved {image.width}x{image.height} image to '{path}'.")
+
+        variable_name = data.get("variable")
+        if variable_name:
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG")
+            variables[variable_name] = base64.b64encode(buffer.getvalue()).decode("ascii")
+            print(f"Action 'Screenshot' stored {image.width}x{image.height} image in variable '{variable_name}'.")
+        return True
+    except Exception as e:
+        error_message = f"Error executing 'Screenshot': {e}"
+        print(error_message)
+        runner_instance.display_message("Action Error", error_message, error=True)
+        return False
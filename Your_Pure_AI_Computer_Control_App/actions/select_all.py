@@ -1,6 +1,5 @@
 # actions/select_all.py
-import pyautogui
-import time
+from input_backend import get_input_backend
 import platform # To determine the correct modifier key
 
 def execute(data, variables, runner_instance):
@@ -26,16 +25,11 @@ def execute(data, variables, runner_instance):
 
     try:
         print(f"Select All: Simulating '{modifier_key}+a'")
-        # Use pyautogui's hotkey function to press the combination
-        pyautogui.hotkey(modifier_key, 'a')
-
-        # Add a small delay to allow the application to process the selection
-        time.sleep(0.15) # Slightly longer might be useful for select all
-
+        get_input_backend().hotkey(modifier_key, 'a')
         return True
 
     except Exception as e:
-        # Catch potential errors from pyautogui or unexpected issues
+        # Catch potential errors from the input backend or unexpected issues
         error_message = f"Error executing 'Select All': {e}"
         import traceback
         print(error_message)
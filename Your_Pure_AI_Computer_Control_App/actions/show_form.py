@@ -4,6 +4,16 @@ import tkinter as tk # Need tkinter for the FormDialog if defined here
 # If FormDialog stays in scenario_executor.py, we call it via runner_instance.
 # If you move FormDialog here, you need to import ttk etc.
 
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    fields = data.get("fields", [])
+    if not isinstance(fields, list):
+        raise ValueError("'fields' must be a list.")
+    for field in fields:
+        if not isinstance(field, dict) or not field.get("name"):
+            raise ValueError("Every form field must be an object with a 'name'.")
+
+
 def execute(data, variables, runner_instance):
     """
     Displays a form to the user and collects input into variables.
@@ -1,5 +1,15 @@
 # actions/store_variable.py
-import pyperclip # To access clipboard content
+import pyperclip # For PyperclipException raised by the fallback backend
+from clipboard_service import get_clipboard_service
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    if not data.get("name"):
+        raise ValueError("Missing 'name' for the variable.")
+    source = str(data.get("source", "")).lower()
+    if source not in ["value", "clipboard"]:
+        raise ValueError(f"Invalid 'source' ('{source}'). Must be 'value' or 'clipboard'.")
+
 
 def execute(data, variables, runner_instance):
     """
@@ -52,7 +62,7 @@ def execute(data, variables, runner_instance):
         elif source == "clipboard":
             # Get value from clipboard
             try:
-                 final_value = pyperclip.paste()
+                 final_value = get_clipboard_service().paste()
                  if final_value is None: # pyperclip might return None on error
                      final_value = "" # Treat as empty string if paste fails slightly
                  log_source_detail = "from clipboard"
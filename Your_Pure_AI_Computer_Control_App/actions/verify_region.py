@@ -0,0 +1,105 @@
+# actions/verify_region.py
+import functools
+import os
+import numpy as np
+import screen_capture
+from actions._validation import validate_position
+
+DEFAULT_PIXEL_TOLERANCE = 24        # Largest per-channel difference (0-255) of a matching pixel
+DEFAULT_MAX_MISMATCH_RATIO = 0.01   # Share of pixels allowed to differ by more than that
+ON_MISMATCH_MODES = ("abort", "continue")
+REFERENCE_CACHE_SIZE = 64
+
+
+@functools.lru_cache(maxsize=REFERENCE_CACHE_SIZE)
+def _load_reference(path, signature):
+    from PIL import Image
+    with Image.open(path) as image:
+        return np.asarray(image.convert("RGB"))
+
+
+def load_reference(path):
+    """Reference image as an RGB array; kept in memory across runs until the file changes."""
+    stat = os.stat(path)
+    return _load_reference(os.path.abspath(path), (stat.st_mtime_ns, stat.st_size))
+
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    reference = data.get("reference")
+    if not isinstance(reference, str) or not reference:
+        raise ValueError("Missing 'reference' (path of the expected image).")
+    if not os.path.isfile(reference):
+        raise ValueError(f"Reference image '{reference}' not found.")
+    validate_position(data.get("position"), "position", integer=True)  # Top-left corner of the region
+    tolerance = data.get("pixel_tolerance", DEFAULT_PIXEL_TOLERANCE)
+    if isinstance(tolerance, bool) or not isinstance(tolerance, int) or not 0 <= tolerance <= 255:
+        raise ValueError("'pixel_tolerance' must be an integer between 0 and 255.")
+    ratio = data.get("max_mismatch_ratio", DEFAULT_MAX_MISMATCH_RATIO)
+    if isinstance(ratio, bool) or not isinstance(ratio, (int, float)) or not 0 <= ratio <= 1:
+        raise ValueError("'max_mismatch_ratio' must be a number between 0 and 1.")
+    on_mismatch = data.get("on_mismatch", "abort")
+    if on_mismatch not in ON_MISMATCH_MODES:
+        raise ValueError(f"'on_mismatch' must be one of {list(ON_MISMATCH_MODES)}.")
+    if on_mismatch == "continue" and not data.get("result_variable"):
+        raise ValueError("'on_mismatch': 'continue' needs a 'result_variable' to store the outcome in.")
+
+
+def mismatch_ratio(actual, expected, pixel_tolerance):
+    """Share of pixels where any channel differs by more than 'pixel_tolerance'."""
+    # |a - b| in uint8 without widening: max(a, b) - min(a, b)
+    difference = np.maximum(actual, expected) - np.minimum(actual, expected)
+    return float((difference.max(axis=2) > pixel_tolerance).mean())
+
+
+def execute(data, variables, runner_instance):
+    """
+    Compares the screen region at 'position' (the size of the reference image) with the
+    reference image.
+
+    Args:
+        data (dict): The action's data dictionary from the scenario.
+                     Expected keys: 'reference' (image path), 'position' (dict with 'x', 'y').
+                     Optional: 'pixel_tolerance', 'max_mismatch_ratio', 'on_mismatch'
+                     ('abort' or 'continue'), 'result_variable' (receives "true" on a match
+                     and an empty string on a mismatch, so 'Wait' until variable_set and
+                     ${variable} checks can tell them apart).
+        variables (dict): The dictionary of current scenario variables.
+        runner_instance (ScenarioRunner): The instance of the ScenarioRunner.
+
+    Returns:
+        bool: False on a mismatch with 'on_mismatch' = 'abort' (stops the scenario), else True.
+    """
+    try:
+        expected = load_reference(data["reference"])
+        height, width = expected.shape[:2]
+        position = data["position"]
+        try:
+            actual = screen_capture.grab((position["x"], position["y"], width, height))
+        except ValueError as e:
+            # Region (partly) off the screen, e.g. a smaller display - a mismatch like any other
+            print(f"Action 'Verify Region': {e}")
+            ratio = 1.0
+        else:
+            ratio = mismatch_ratio(actual, expected, data.get("pixel_tolerance", DEFAULT_PIXEL_TOLERANCE))
+        matches = ratio <= data.get("max_mismatch_ratio", DEFAULT_MAX_MISMATCH_RATIO)
+
+        result_variable = data.get("result_variable")
+        if result_variable:
+            # Empty on a mismatch: "false" would count as set for 'variable_set' checks
+            variables[result_variable] = "true" if matches else ""
+        if matches:
+            print(f"Action 'Verify Region': matches '{data['reference']}' ({ratio:.2%} of pixels differ).")
+            return True
+        message = f"'Verify Region': screen does not match '{data['reference']}' ({ratio:.2%} of pixels differ)."
+        if data.get("on_mismatch", "abort") == "continue":
+            print(f"{message} Continuing.")
+            return True
+        print(message)
+        runner_instance.display_message("Verification Failed", message, error=True)
+        return False
+    except Exception as e:
+        error_message = f"Error executing 'Verify Region': {e}"
+        print(error_message)
+        runner_instance.display_message("Action Error", error_message, error=True)
+        return False
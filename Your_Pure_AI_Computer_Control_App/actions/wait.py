@@ -1,17 +1,113 @@
 # actions/wait.py
+import os
 import time
+import command_runner
+from wait_conditions import wait_until
+
+# Conditional modes ('until' in the step data):
+#   variable_set      - the scenario variable 'name' exists and is not empty. Checked once
+#                       (no 'timeout'): variables only change between steps, never while
+#                       Wait is running
+#   file_exists       - 'path' exists (file or directory)
+#   command_succeeds  - 'command' (run through the system shell) exits with code 0
+# The last two are polled for at most 'timeout' seconds.
+SYSTEM_SHELL = "cmd" if command_runner.IS_WINDOWS else "sh"
+UNTIL_MODES = ("variable_set", "file_exists", "command_succeeds")
+UNTIL_REQUIRED_FIELD = {"variable_set": "name", "file_exists": "path", "command_succeeds": "command"}
+DEFAULT_TIMEOUT_SECONDS = 30.0
+# Commands are expensive to start, so they are re-run less often than the other checks
+POLL_INTERVALS = {"command_succeeds": (0.25, 2.0)}
+DEFAULT_POLL_INTERVALS = (0.01, 0.1)
+
+
+def _positive_number(data, key, default):
+    value = data.get(key, default)
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid '{key}' provided for 'Wait': {value!r}")
+    if value < 0:
+        raise ValueError(f"'{key}' for 'Wait' can't be negative: {value}")
+    return value
+
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    until = data.get("until")
+    if until is None:
+        _positive_number(data, "seconds", 1.0)
+        return
+    if until not in UNTIL_MODES:
+        raise ValueError(f"'until' must be one of {list(UNTIL_MODES)}.")
+    field = UNTIL_REQUIRED_FIELD[until]
+    if not isinstance(data.get(field), str) or not data.get(field):
+        raise ValueError(f"'until': '{until}' needs a '{field}'.")
+    if until == "variable_set":
+        if "timeout" in data:
+            raise ValueError("'until': 'variable_set' is checked once and takes no 'timeout'.")
+        return
+    _positive_number(data, "timeout", DEFAULT_TIMEOUT_SECONDS)
+
+
+def _command_succeeds(command, deadline, stop_flag):
+    # run_command kills the whole process tree on timeout and when the scenario is stopped
+    args = command_runner.shell_args(SYSTEM_SHELL, command)[1]
+    result = command_runner.run_command(args, timeout=max(deadline - time.monotonic(), 0.01),
+                                        stop_event=stop_flag, tail_lines=1, echo=False)
+    return result.returncode == 0
+
+
+def _build_predicate(until, data, variables, runner_instance, deadline):
+    if until == "file_exists":
+        path = os.path.expanduser(runner_instance._substitute_variables(data["path"]))
+        return lambda: os.path.exists(path)
+    command = runner_instance._substitute_variables(data["command"])
+    return lambda: _command_succeeds(command, deadline, runner_instance.stop_execution_flag)
+
 
 def execute(data, variables, runner_instance):
     """
-    Pauses execution for a specified duration.
+    Pauses execution for a specified duration, or until a condition holds.
+    Stopping the scenario ends the wait immediately.
     """
+    stop_flag = runner_instance.stop_execution_flag
+    until = data.get("until")
     try:
-        seconds = data.get("seconds", 1.0)
-        time.sleep(float(seconds))
-        print(f"Action 'Wait' executed for {seconds} seconds.")
-        return True
+        if until is None:
+            seconds = float(data.get("seconds", 1.0))
+            if stop_flag.wait(seconds):
+                print("Action 'Wait' cancelled.")
+                return False
+            print(f"Action 'Wait' executed for {seconds} seconds.")
+            return True
+
+        if until == "variable_set":
+            # Nothing else runs while this step does, so waiting could never change the outcome
+            name = data["name"]
+            if variables.get(name) not in (None, ""):
+                print(f"Action 'Wait' until variable_set: '{name}' is set.")
+                return True
+            error_message = f"'Wait' until variable_set: variable '{name}' is not set."
+            print(error_message)
+            runner_instance.display_message("Action Error", error_message, error=True)
+            return False
+
+        timeout = float(data.get("timeout", DEFAULT_TIMEOUT_SECONDS))
+        poll_interval, max_poll_interval = POLL_INTERVALS.get(until, DEFAULT_POLL_INTERVALS)
+        predicate = _build_predicate(until, data, variables, runner_instance, time.monotonic() + timeout)
+        started = time.monotonic()
+        if wait_until(predicate, timeout, poll_interval, max_poll_interval, stop_flag):
+            print(f"Action 'Wait' until {until}: condition met after {time.monotonic() - started:.2f} seconds.")
+            return True
+        if stop_flag.is_set():
+            print("Action 'Wait' cancelled.")
+            return False
+        error_message = f"'Wait' until {until}: condition not met within {timeout} seconds."
+        print(error_message)
+        runner_instance.display_message("Action Error", error_message, error=True)
+        return False
     except ValueError:
-         error_message = f"Invalid number of seconds provided for 'Wait': {data.get('seconds')}"
+         error_message = f"Invalid number of seconds provided for 'Wait': {data.get('seconds', data.get('timeout'))}"
          print(error_message)
          runner_instance.display_message("Action Error", error_message, error=True)
          return False
@@ -19,4 +115,4 @@ def execute(data, variables, runner_instance):
         error_message = f"Error executing 'Wait': {e}"
         print(error_message)
         runner_instance.display_message("Action Error", error_message, error=True)
-        return False
\ No newline at end of file
+        return False
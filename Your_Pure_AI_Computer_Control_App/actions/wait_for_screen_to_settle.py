@@ -0,0 +1,91 @@
+# actions/wait_for_screen_to_settle.py
+import time
+import numpy as np
+import screen_capture
+from image_matcher import downsample, to_gray
+from actions._validation import validate_region
+
+DEFAULT_INTERVAL_SECONDS = 0.05  # Time between two samples
+DEFAULT_STABLE_FRAMES = 3        # Consecutive unchanged samples required
+DEFAULT_THRESHOLD = 1.0          # Mean absolute difference (0-255 gray levels) still "unchanged"
+DEFAULT_TIMEOUT_SECONDS = 10.0
+DOWNSCALE_STEPS = 2              # Each step halves the sampled frame (2 -> 1/16 of the pixels)
+
+
+def _number(data, key, default, minimum=0.0):
+    value = data.get(key, default)
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or value < minimum:
+        raise ValueError(f"'{key}' must be a number >= {minimum} (received {value!r}).")
+    return value
+
+
+def validate(data):
+    """Checked once when the scenario is compiled. Raises ValueError if 'data' is malformed."""
+    _number(data, "interval", DEFAULT_INTERVAL_SECONDS, 0.001)
+    _number(data, "threshold", DEFAULT_THRESHOLD)
+    _number(data, "timeout", DEFAULT_TIMEOUT_SECONDS, 0.001)
+    stable_frames = data.get("stable_frames", DEFAULT_STABLE_FRAMES)
+    if isinstance(stable_frames, bool) or not isinstance(stable_frames, int) or stable_frames < 1:
+        raise ValueError("'stable_frames' must be a positive integer.")
+    validate_region(data.get("region"))
+
+
+def _sample(region):
+    """Downscaled grayscale frame of the region (a new array - safe to keep)."""
+    frame = to_gray(screen_capture.grab(region))
+    for _ in range(DOWNSCALE_STEPS):
+        if min(frame.shape) < 2:
+            break
+        frame = downsample(frame)
+    return frame
+
+
+def execute(data, variables, runner_instance):
+    """
+    Waits until the screen (or 'region') stops changing: 'stable_frames' consecutive samples,
+    taken every 'interval' seconds, differ from the previous one by at most 'threshold'
+    (mean absolute gray level difference). Fails if that doesn't happen within 'timeout'.
+
+    Returns:
+        bool: True once the screen is stable, False on timeout or cancellation.
+    """
+    stop_flag = runner_instance.stop_execution_flag
+    try:
+        region = data.get("region")
+        if region:
+            region = (region["x"], region["y"], region["width"], region["height"])
+        interval = data.get("interval", DEFAULT_INTERVAL_SECONDS)
+        threshold = data.get("threshold", DEFAULT_THRESHOLD)
+        stable_frames = data.get("stable_frames", DEFAULT_STABLE_FRAMES)
+        timeout = data.get("timeout", DEFAULT_TIMEOUT_SECONDS)
+
+        started = time.monotonic()
+        deadline = started + timeout
+        previous = _sample(region)
+        stable = 0
+        next_sample = started + interval
+        while True:
+            # Sample at a fixed rate, independent of how long capturing takes
+            if stop_flag.wait(max(next_sample - time.monotonic(), 0)):
+                print("Action 'Wait for Screen to Settle' cancelled.")
+                return False
+            next_sample += interval
+            frame = _sample(region)
+            difference = float(np.abs(frame - previous).mean())
+            previous = frame
+            stable = stable + 1 if difference <= threshold else 0
+            if stable >= stable_frames:
+                print(f"Action 'Wait for Screen to Settle': stable after {time.monotonic() - started:.2f} seconds.")
+                return True
+            if time.monotonic() >= deadline:
+                break
+
+        error_message = f"'Wait for Screen to Settle': screen still changing after {timeout} seconds."
+        print(error_message)
+        runner_instance.display_message("Action Error", error_message, error=True)
+        return False
+    except Exception as e:
+        error_message = f"Error executing 'Wait for Screen to Settle': {e}"
+        print(error_message)
+        runner_instance.display_message("Action Error", error_message, error=True)
+        return False
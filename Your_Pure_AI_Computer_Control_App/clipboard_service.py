@@ -0,0 +1,271 @@
+# clipboard_service.py
+# Persistent clipboard access shared by the executor and the action modules.
+#
+# On Linux, pyperclip.paste()/copy() fork an 'xclip' or 'xsel' process on every call.
+# The X11 service below keeps one X connection open for the lifetime of the executor
+# and talks to the CLIPBOARD selection directly (ConvertSelection for reading,
+# SetSelectionOwner + serving SelectionRequest events for writing).
+# On other platforms, or if anything about the X path fails, pyperclip is used.
+import os
+import platform
+import select
+import threading
+import time
+import pyperclip
+
+# python-xlib is optional - only needed for the in-process backend on Linux
+try:
+    import Xlib.threaded  # Must be imported first: makes the connection thread-safe
+    from Xlib import X, Xatom
+    from Xlib import display as xdisplay
+    from Xlib.protocol import event as xevent
+except ImportError:
+    xdisplay = None
+
+# Clipboard text starting with this is a scenario trigger (see scenario_executor.monitor_clipboard)
+CLIPBOARD_TRIGGER_PREFIX = "Execute_Computer_Command_Your_Pure_AI-"
+SELECTION_REPLY_TIMEOUT_SECONDS = 1.0  # How long to wait for the owner to answer a read
+EVENT_LOOP_IDLE_TIMEOUT_SECONDS = 0.5  # Wake-up interval of the X event thread when idle
+
+_service = None
+_service_lock = threading.Lock()
+
+
+class PyperclipClipboardService:
+    """Clipboard access through pyperclip (default on Windows/macOS and the Linux fallback)."""
+
+    name = "pyperclip"
+    request_count = 0  # Number of times other applications fetched our clipboard content
+
+    def wait_for_request(self, after_count, timeout):
+        """
+        Waits until another application has fetched the clipboard content we set
+        (request_count > after_count). pyperclip can't tell, so this just waits 'timeout'.
+
+        Returns:
+            bool: True if a request was observed, False if the timeout expired.
+        """
+        time.sleep(timeout)
+        return False
+
+    def paste(self):
+        text = pyperclip.paste()
+        return text if text is not None else ""
+
+    def copy(self, text):
+        pyperclip.copy(text)
+
+    def close(self):
+        pass
+
+
+class XSelectionClipboardService(PyperclipClipboardService):
+    """
+    In-process X11 clipboard. Reads and writes the CLIPBOARD selection over a single
+    persistent connection; a daemon thread handles the X events (conversion replies and
+    requests from other applications while we own the clipboard).
+    Anything this backend can't handle (INCR transfers, unresponsive owners, oversized
+    data) is passed on to pyperclip.
+    """
+
+    name = "x11"
+
+    def __init__(self):
+        self.display = xdisplay.Display()  # Uses $DISPLAY
+        root = self.display.screen().root
+        # Unmapped helper window: receives converted data and owns the selection after copy()
+        self.window = root.create_window(0, 0, 1, 1, 0, X.CopyFromParent)
+
+        self.atom_clipboard = self.display.get_atom("CLIPBOARD")
+        self.atom_utf8 = self.display.get_atom("UTF8_STRING")
+        self.atom_text = self.display.get_atom("TEXT")
+        self.atom_targets = self.display.get_atom("TARGETS")
+        self.atom_incr = self.display.get_atom("INCR")
+        self.atom_property = self.display.get_atom("YOUR_PURE_AI_CLIPBOARD")
+        # Largest property we can write in one request (max_request_length is in 4-byte units)
+        self.max_property_bytes = self.display.display.info.max_request_length * 4 - 64
+
+        self._owned_text = None  # Text we serve while we own the selection
+        self.request_count = 0
+        self._request_condition = threading.Condition()
+        self._paste_lock = threading.Lock()  # One conversion at a time
+        self._reply_condition = threading.Condition()
+        self._reply = None
+        self._running = True
+        # Self-pipe used to wake the event thread when another thread pulled events off the socket
+        self._wake_read, self._wake_write = os.pipe()
+
+        self.display.flush()
+        self._thread = threading.Thread(target=self._event_loop, name="XClipboardService", daemon=True)
+        self._thread.start()
+
+    # --- Event handling (runs in the service thread) ---
+
+    def _wake(self):
+        os.write(self._wake_write, b"\0")
+
+    def _event_loop(self):
+        while self._running:
+            try:
+                readable, _, _ = select.select([self.display.fileno(), self._wake_read], [], [],
+                                               EVENT_LOOP_IDLE_TIMEOUT_SECONDS)
+                if self._wake_read in readable:
+                    os.read(self._wake_read, 64)
+                while self.display.pending_events():
+                    self._handle_event(self.display.next_event())
+            except Exception as e:
+                if self._running:
+                    print(f"Clipboard service: X event loop stopped: {e}")
+                self._running = False
+
+    def _handle_event(self, event):
+        if event.type == X.SelectionNotify:
+            with self._reply_condition:
+                self._reply = event
+                self._reply_condition.notify_all()
+        elif event.type == X.SelectionRequest:
+            self._serve_request(event)
+        elif event.type == X.SelectionClear:
+            self._owned_text = None
+
+    def _serve_request(self, request):
+        """Answers another application's request for our clipboard content."""
+        text = self._owned_text
+        target = request.target
+        # Obsolete clients may pass None as property; the ICCCM says to use the target then
+        prop = request.property if request.property != X.NONE else target
+
+        if text is None:
+            prop = X.NONE
+        elif target == self.atom_targets:
+            request.requestor.change_property(
+                prop, Xatom.ATOM, 32,
+                [self.atom_targets, self.atom_utf8, self.atom_text, Xatom.STRING])
+        elif target in (self.atom_utf8, self.atom_text):
+            request.requestor.change_property(prop, self.atom_utf8, 8, text.encode("utf-8"))
+        elif target == Xatom.STRING:
+            request.requestor.change_property(prop, Xatom.STRING, 8,
+                                              text.encode("latin-1", errors="replace"))
+        else:
+            prop = X.NONE  # Unsupported target
+
+        reply = xevent.SelectionNotify(time=request.time, requestor=request.requestor,
+                                       selection=request.selection, target=target, property=prop)
+        request.requestor.send_event(reply, event_mask=0)
+        self.display.flush()
+
+        if prop != X.NONE and target != self.atom_targets:
+            with self._request_condition:
+                self.request_count += 1
+                self._request_condition.notify_all()
+
+    # --- Public API ---
+
+    def wait_for_request(self, after_count, timeout):
+        if not self._running:
+            return super().wait_for_request(after_count, timeout)
+        with self._request_condition:
+            return self._request_condition.wait_for(lambda: self.request_count > after_count, timeout)
+
+    def _convert(self, target):
+        """Asks the selection owner for 'target'. Returns the reply event or None on timeout."""
+        with self._reply_condition:
+            self._reply = None
+        self.window.convert_selection(self.atom_clipboard, target, self.atom_property, X.CurrentTime)
+        self.display.flush()
+
+        deadline = time.monotonic() + SELECTION_REPLY_TIMEOUT_SECONDS
+        with self._reply_condition:
+            while self._reply is None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self._reply_condition.wait(remaining)
+            return self._reply
+
+    def paste(self):
+        if not self._running:
+            return super().paste()
+
+        with self._paste_lock:
+            try:
+                owner = self.display.get_selection_owner(self.atom_clipboard)
+                if owner == X.NONE:
+                    return ""
+                # _owned_text is only cleared when the event thread handles SelectionClear, which
+                # can lag behind another application's copy - ask the server who owns it now
+                text = self._owned_text
+                if text is not None and owner == self.window:
+                    return text  # We are the owner - no conversion round trip needed
+
+                for target, encoding in ((self.atom_utf8, "utf-8"), (Xatom.STRING, "latin-1")):
+                    reply = self._convert(target)
+                    if reply is None:
+                        raise TimeoutError("Clipboard owner did not answer the conversion request.")
+                    if reply.property == X.NONE:
+                        continue  # Owner can't provide this target, try the next one
+
+                    prop = self.window.get_full_property(self.atom_property, X.AnyPropertyType)
+                    self.window.delete_property(self.atom_property)
+                    self.display.flush()
+                    if prop is None:
+                        return ""
+                    if prop.property_type == self.atom_incr:
+                        # Large transfer in chunks - let xclip/xsel deal with it
+                        return super().paste()
+                    value = prop.value
+                    if isinstance(value, bytes):
+                        return value.decode(encoding, errors="replace")
+                    return "".join(chr(c) for c in value)
+                return ""
+            except Exception as e:
+                print(f"Clipboard service: in-process read failed ({e}). Using pyperclip.")
+                return super().paste()
+            finally:
+                self._wake()  # Round trips above may have queued events for the event thread
+
+    def copy(self, text):
+        text = "" if text is None else str(text)
+        if not self._running or len(text.encode("utf-8")) > self.max_property_bytes:
+            # Oversized text would need an INCR transfer - let xclip/xsel hold it
+            self._owned_text = None
+            return super().copy(text)
+
+        try:
+            self._owned_text = text
+            self.window.set_selection_owner(self.atom_clipboard, X.CurrentTime)
+            if self.display.get_selection_owner(self.atom_clipboard) != self.window:
+                raise RuntimeError("Could not become the clipboard owner.")
+        except Exception as e:
+            print(f"Clipboard service: in-process write failed ({e}). Using pyperclip.")
+            self._owned_text = None
+            super().copy(text)
+        finally:
+            self._wake()
+
+    def close(self):
+        self._running = False
+        self._wake()
+        try:
+            self.display.close()
+        except Exception:
+            pass  # Connection may already be gone
+
+
+def get_clipboard_service():
+    """
+    Returns the process-wide clipboard service, creating it on first use.
+    Uses the in-process X11 backend on Linux when python-xlib and $DISPLAY are available.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            if platform.system() == "Linux" and os.environ.get("DISPLAY") and xdisplay is not None:
+                try:
+                    _service = XSelectionClipboardService()
+                    print("Clipboard service: using in-process X11 selection access.")
+                except Exception as e:
+                    print(f"Warning: Could not start X11 clipboard service: {e}. Using pyperclip.")
+            if _service is None:
+                _service = PyperclipClipboardService()
+        return _service
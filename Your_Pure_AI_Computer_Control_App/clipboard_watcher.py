@@ -0,0 +1,139 @@
+# clipboard_watcher.py
+# Change-notification backends used by scenario_executor.monitor_clipboard().
+#
+# Instead of re-reading the clipboard every POLLING_INTERVAL_SECONDS, the monitor
+# blocks in wait_for_change() until the clipboard actually changes. On Linux/X11 this
+# uses XFixes selection-owner events (every copy makes the copying application the new
+# owner of the CLIPBOARD selection, which XFixes reports to us immediately). Everywhere
+# else, or if python-xlib / the XFIXES extension is unavailable, the original polling
+# behaviour is kept as the fallback.
+import os
+import platform
+import select
+import time
+
+# python-xlib is optional - only needed for the event-driven backend on Linux
+try:
+    from Xlib import display as xdisplay
+    from Xlib import error as xerror
+    from Xlib.ext import xfixes
+except ImportError:
+    xdisplay = None
+    xerror = None
+    xfixes = None
+
+CLIPBOARD_SELECTION_NAME = "CLIPBOARD"  # The selection pyperclip reads on Linux
+
+
+class PollingClipboardWatcher:
+    """
+    Fallback watcher: simply sleeps for the polling interval.
+    The caller re-reads the clipboard after every wait, exactly like the original loop.
+    """
+
+    name = "polling"
+
+    def __init__(self, interval_seconds):
+        self.interval_seconds = interval_seconds
+
+    def wait_for_change(self, timeout=None):
+        """
+        Waits for one polling interval.
+
+        Returns:
+            bool: Always True - with polling we can't know, so the caller must check.
+        """
+        time.sleep(self.interval_seconds)
+        return True
+
+    def close(self):
+        pass
+
+
+class XFixesClipboardWatcher:
+    """
+    Event-driven watcher for X11 using the XFIXES SelectSelectionInput request.
+    Blocks in select() on the X connection, so it uses no CPU while idle and wakes
+    up within milliseconds of the clipboard owner changing.
+    """
+
+    name = "xfixes"
+
+    def __init__(self, selection_name=CLIPBOARD_SELECTION_NAME):
+        self.display = xdisplay.Display()  # Uses $DISPLAY
+        try:
+            if not self.display.has_extension("XFIXES"):
+                raise RuntimeError("X server does not support the XFIXES extension.")
+            self.display.xfixes_query_version()
+
+            # Event type numbers of extensions are assigned by the server at runtime
+            extension_info = self.display.query_extension("XFIXES")
+            self._selection_event_type = extension_info.first_event + xfixes.XFixesSelectionNotify
+
+            root = self.display.screen().root
+            selection_atom = self.display.get_atom(selection_name)
+            mask = (xfixes.XFixesSetSelectionOwnerNotifyMask |
+                    xfixes.XFixesSelectionWindowDestroyNotifyMask |
+                    xfixes.XFixesSelectionClientCloseNotifyMask)
+            self.display.xfixes_select_selection_input(root, selection_atom, mask)
+            self.display.flush()
+        except Exception:
+            self.display.close()
+            raise
+
+    def _drain_events(self):
+        """Reads all queued X events. Returns True if any of them was a selection change."""
+        changed = False
+        while self.display.pending_events():
+            event = self.display.next_event()
+            if event.type == self._selection_event_type:
+                changed = True
+        return changed
+
+    def wait_for_change(self, timeout=None):
+        """
+        Blocks until the clipboard owner changes or the timeout expires.
+
+        Args:
+            timeout (float, optional): Maximum seconds to wait. None waits forever.
+
+        Returns:
+            bool: True if the clipboard changed, False on timeout.
+        """
+        # Events may already have been read off the socket by a previous call
+        if self._drain_events():
+            return True
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            readable, _, _ = select.select([self.display.fileno()], [], [], remaining)
+            if readable and self._drain_events():
+                return True
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+    def close(self):
+        try:
+            self.display.close()
+        except Exception:
+            pass  # Connection may already be gone
+
+
+def create_clipboard_watcher(polling_interval_seconds):
+    """
+    Returns the best available clipboard watcher for this platform.
+    Falls back to polling if the event-driven backend cannot be set up.
+    """
+    if platform.system() == "Linux" and os.environ.get("DISPLAY"):
+        if xdisplay is None:
+            print("Info: python-xlib not installed. Falling back to clipboard polling.")
+        else:
+            try:
+                watcher = XFixesClipboardWatcher()
+                print("Clipboard watcher: using X11 XFixes selection events.")
+                return watcher
+            except Exception as e:
+                print(f"Warning: Could not start XFixes clipboard watcher: {e}. Falling back to polling.")
+
+    return PollingClipboardWatcher(polling_interval_seconds)
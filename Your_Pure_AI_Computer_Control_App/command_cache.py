@@ -0,0 +1,146 @@
+# command_cache.py
+# Remembers the results of Execute Command steps with a "cache" setting, so lookups that
+# give the same answer every run (hostnames, config values, tokens from local CLIs) don't
+# start a process each time.
+#
+# Entries are keyed by the shell type and the command text after variable substitution, and
+# expire after their TTL. At most MAX_ENTRIES are kept in memory (least recently used are
+# dropped first). Entries of steps with "persist": true are also written to the cache file and
+# survive a restart. The file is readable by the current user only (it may hold tokens) and
+# lives in a per-user directory, not in the working directory. Only runs that exited with
+# code 0 are cached.
+import hashlib
+import json
+import os
+import platform
+import threading
+import time
+from collections import OrderedDict
+from command_runner import CommandResult
+
+DEFAULT_TTL_SECONDS = 300.0
+MAX_ENTRIES = 256
+CACHE_FILE_NAME = "command_cache.json"
+
+_entries = OrderedDict()  # key -> (expires_at, persist, stdout, stderr)
+_lock = threading.Lock()
+_loaded = False
+
+
+def cache_file_path():
+    """Per-user location of the persisted cache (%LOCALAPPDATA% / $XDG_CACHE_HOME / ~/.cache)."""
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "YourPureAI", CACHE_FILE_NAME)
+
+
+def settings(data):
+    """(ttl, persist) from a step's "cache" setting, or None if caching is off."""
+    cache = data.get("cache")
+    if cache is None or cache is False:
+        return None
+    if cache is True:
+        return DEFAULT_TTL_SECONDS, False
+    return cache.get("ttl", DEFAULT_TTL_SECONDS), cache.get("persist", False)
+
+
+def validate(cache):
+    """Raises ValueError if a "cache" setting is malformed."""
+    if cache is None or isinstance(cache, bool):
+        return
+    if not isinstance(cache, dict):
+        raise ValueError("'cache' must be true/false or an object with 'ttl' and 'persist'.")
+    ttl = cache.get("ttl", DEFAULT_TTL_SECONDS)
+    if isinstance(ttl, bool) or not isinstance(ttl, (int, float)) or ttl <= 0:
+        raise ValueError("'cache' 'ttl' must be a positive number of seconds.")
+    if not isinstance(cache.get("persist", False), bool):
+        raise ValueError("'cache' 'persist' must be true or false.")
+
+
+def _key(command_type, commands, tail_lines):
+    # Hashed - the file doesn't need to contain the command text
+    text = json.dumps([command_type, commands, tail_lines])
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _load():
+    """Reads the persisted entries on first use (called with the lock held)."""
+    global _loaded
+    if _loaded:
+        return
+    _loaded = True
+    path = cache_file_path()
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        now = time.time()
+        loaded = {}
+        for key, (expires_at, stdout, stderr) in stored.items():
+            if expires_at > now:
+                loaded[key] = (expires_at, True, list(stdout), list(stderr))
+    except FileNotFoundError:
+        return
+    except (OSError, ValueError, TypeError, KeyError, AttributeError) as e:
+        # Unreadable or not the expected structure - start over instead of failing every step
+        print(f"Warning: Discarding unreadable command cache '{path}': {e}")
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        return
+    _entries.update(loaded)
+
+
+def _save():
+    """Writes the persisted entries (called with the lock held)."""
+    now = time.time()
+    stored = {key: (expires_at, stdout, stderr)
+              for key, (expires_at, persist, stdout, stderr) in _entries.items()
+              if persist and expires_at > now}
+    path = cache_file_path()
+    temporary_file = f"{path}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        # Created private from the start - the output may contain tokens
+        fd = os.open(temporary_file, os.O_CREAT | os.O_WRONLY | os.O_TRUNC, 0o600)
+        if hasattr(os, "fchmod"):
+            os.fchmod(fd, 0o600)  # In case the file was left behind with other permissions
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump(stored, f)
+        os.replace(temporary_file, path)
+    except OSError as e:
+        print(f"Warning: Could not write command cache '{path}': {e}")
+
+
+def get(command_type, commands, tail_lines):
+    """Cached CommandResult for the command, or None."""
+    key = _key(command_type, commands, tail_lines)
+    with _lock:
+        _load()
+        entry = _entries.get(key)
+        if entry is None:
+            return None
+        expires_at, persist, stdout, stderr = entry
+        if expires_at <= time.time():
+            del _entries[key]
+            return None
+        _entries.move_to_end(key)
+    return CommandResult(0, list(stdout), list(stderr), False, False, 0.0)
+
+
+def put(command_type, commands, tail_lines, result, ttl, persist=False):
+    """Caches a successful result for 'ttl' seconds."""
+    if result.returncode != 0:
+        return
+    key = _key(command_type, commands, tail_lines)
+    with _lock:
+        _load()
+        _entries[key] = (time.time() + ttl, persist, list(result.stdout), list(result.stderr))
+        _entries.move_to_end(key)
+        evicted_persisted = False
+        while len(_entries) > MAX_ENTRIES:
+            evicted_persisted |= _entries.popitem(last=False)[1][1]
+        if persist or evicted_persisted:
+            _save()
@@ -0,0 +1,163 @@
+# command_runner.py
+# Runs shell commands for the Execute Command action.
+#
+# stdout and stderr are read line by line while the command runs: every line is printed as it
+# arrives and the last 'tail_lines' lines of each stream are kept in a ring buffer, so a
+# chatty command neither piles up in memory nor delays the log until it exits. Lines longer
+# than MAX_LINE_CHARS are split.
+#
+# On POSIX the command runs in its own session (= process group). On timeout or when the
+# scenario is stopped the whole group is sent SIGTERM, then SIGKILL if it is still running
+# after KILL_GRACE_SECONDS, so processes started by the script die with it. On Windows the
+# process tree is ended with taskkill /T.
+import os
+import platform
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+
+IS_WINDOWS = platform.system() == "Windows"
+
+# command_type -> (display name, arguments that precede the command text)
+SHELLS = {
+    "cmd": ("Command Prompt (cmd.exe)", ["cmd", "/d", "/c"]),
+    "powershell": ("PowerShell", ["powershell" if IS_WINDOWS else "pwsh",
+                                  "-NoProfile", "-ExecutionPolicy", "Bypass", "-Command"]),
+    "bash": ("bash", ["bash", "-c"]),
+    "sh": ("sh", ["sh", "-c"]),
+}
+WINDOWS_ONLY_SHELLS = ("cmd",)
+
+OUTPUT_TAIL_LINES = 200      # Lines kept per stream
+MAX_LINE_CHARS = 4096        # Longer lines are split (bounds the memory of a single line)
+STOP_POLL_SECONDS = 0.1      # How often the stop flag is checked while the command runs
+KILL_GRACE_SECONDS = 2.0     # Time between SIGTERM and SIGKILL
+READER_JOIN_SECONDS = 2.0    # Time allowed to drain the pipes after the process exited
+
+
+def available_shells():
+    """Command types that can run on this platform."""
+    return [name for name in SHELLS if IS_WINDOWS or name not in WINDOWS_ONLY_SHELLS]
+
+
+def shell_args(command_type, commands):
+    """(display name, argument list) that runs 'commands' with the given shell."""
+    display_name, prefix = SHELLS[command_type]
+    return display_name, prefix + [commands]
+
+
+class CommandResult:
+    """Outcome of run_command(). 'stdout'/'stderr' hold the last lines of each stream."""
+    __slots__ = ("returncode", "stdout", "stderr", "timed_out", "cancelled", "duration")
+
+    def __init__(self, returncode, stdout, stderr, timed_out, cancelled, duration):
+        self.returncode = returncode
+        self.stdout = stdout
+        self.stderr = stderr
+        self.timed_out = timed_out
+        self.cancelled = cancelled
+        self.duration = duration
+
+    @property
+    def stdout_text(self):
+        return "\n".join(self.stdout)
+
+    @property
+    def stderr_text(self):
+        return "\n".join(self.stderr)
+
+
+def _pump(stream, buffer, prefix, echo):
+    with stream:
+        for line in iter(lambda: stream.readline(MAX_LINE_CHARS), ""):
+            line = line.rstrip("\r\n")
+            buffer.append(line)
+            if echo:
+                print(f"{prefix}{line}")
+
+
+def _startupinfo():
+    """Keeps the console window of the shell hidden on Windows."""
+    if not IS_WINDOWS:
+        return None
+    startupinfo = subprocess.STARTUPINFO()
+    startupinfo.dwFlags |= subprocess.STARTF_USESHOWWINDOW
+    return startupinfo
+
+
+def terminate_process_tree(process):
+    """Ends 'process' and everything it started, waiting until it has exited."""
+    try:
+        if IS_WINDOWS:
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, startupinfo=_startupinfo())
+        else:
+            os.killpg(process.pid, signal.SIGTERM)
+            try:
+                process.wait(KILL_GRACE_SECONDS)
+                return
+            except subprocess.TimeoutExpired:
+                os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass  # Already gone
+    process.wait()
+
+
+def run_command(args, timeout=None, stop_event=None, tail_lines=OUTPUT_TAIL_LINES, echo=True,
+                echo_prefix=""):
+    """
+    Runs 'args' and streams its output until it exits, 'timeout' seconds pass or
+    'stop_event' is set. Echoed lines start with 'echo_prefix'.
+    Raises OSError (e.g. FileNotFoundError) if it can't be started.
+
+    Returns:
+        CommandResult: returncode is None if the command was killed.
+    """
+    started = time.monotonic()
+    process = subprocess.Popen(
+        args,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding='utf-8',
+        errors='replace',
+        startupinfo=_startupinfo(),
+        start_new_session=not IS_WINDOWS,
+    )
+    stdout, stderr = deque(maxlen=tail_lines), deque(maxlen=tail_lines)
+    readers = [threading.Thread(target=_pump, args=(process.stdout, stdout, echo_prefix, echo), daemon=True),
+               threading.Thread(target=_pump, args=(process.stderr, stderr, f"{echo_prefix}[stderr] ", echo),
+                                daemon=True)]
+    for reader in readers:
+        reader.start()
+
+    # A helper thread waits for the exit so it is noticed at once; the stop flag and the
+    # deadline are checked in between
+    exited = threading.Event()
+    threading.Thread(target=lambda: (process.wait(), exited.set()), daemon=True).start()
+    deadline = None if timeout is None else started + timeout
+    timed_out = cancelled = False
+    while True:
+        wait_seconds = STOP_POLL_SECONDS
+        if deadline is not None:
+            wait_seconds = max(0.0, min(wait_seconds, deadline - time.monotonic()))
+        if exited.wait(wait_seconds):
+            break
+        if stop_event is not None and stop_event.is_set():
+            cancelled = True
+            break
+        if deadline is not None and time.monotonic() >= deadline:
+            timed_out = True
+            break
+
+    if timed_out or cancelled:
+        terminate_process_tree(process)
+    for reader in readers:
+        # A background process started by the command may keep the pipes open - don't wait for it
+        reader.join(READER_JOIN_SECONDS)
+    returncode = None if timed_out or cancelled else process.returncode
+    return CommandResult(returncode, list(stdout), list(stderr), timed_out, cancelled,
+                         time.monotonic() - started)
@@ -0,0 +1,413 @@
+# image_matcher.py
+# Locates a template image on the screen (used by the "Click Image" action).
+#
+# Matching uses zero-mean normalized cross-correlation (ZNCC), which is insensitive to
+# brightness/contrast changes. Scores range from -1 to 1; 1 is a perfect match.
+# The correlation is computed with FFTs and the per-window normalisation with integral
+# images, so one full search costs a few FFTs instead of width*height template comparisons.
+#
+# The search is coarse-to-fine: screen and template are halved repeatedly (image pyramid)
+# until the template is about MIN_PYRAMID_TEMPLATE_SIDE pixels, the whole coarsest level is
+# searched, and the best candidates are then refined level by level in a small window.
+#
+# Searches larger than POOL_MIN_PIXELS run in a worker process that captures the screen
+# itself, so neither the screenshot nor the number crunching holds the executor's GIL.
+#
+# Windows rarely move between runs, so locate_on_screen() remembers where each template
+# was found (LocationCache). The next lookup captures just that template-sized area and
+# compares its average hash and ZNCC score; only if that fails is the full search run.
+#
+# Run this file directly for a benchmark on synthetic 4K frames.
+import functools
+import os
+import threading
+from collections import OrderedDict
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from concurrent.futures.process import BrokenProcessPool
+import multiprocessing
+
+MIN_PYRAMID_TEMPLATE_SIDE = 8   # Smallest template side (px) at the coarsest level
+MAX_PYRAMID_LEVELS = 4
+COARSE_CANDIDATES = 5           # Best coarse positions refined at full resolution
+REFINE_RADIUS = 2               # Search radius (px) around a candidate on each finer level
+POOL_MIN_PIXELS = 1_000_000     # Search areas above this run in the worker process
+SEARCH_TIMEOUT_SECONDS = 30
+TEMPLATE_CACHE_SIZE = 64
+LOCATION_CACHE_SIZE = 128       # Remembered template locations (least recently used are dropped)
+HASH_SIZE = 8                   # Average hash of HASH_SIZE x HASH_SIZE cells
+HASH_MAX_DISTANCE = 4           # Differing hash bits still accepted as "unchanged"
+
+_EPSILON = 1e-6
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class Match:
+    """Location of a template on the screen (screen coordinates)."""
+
+    __slots__ = ("x", "y", "width", "height", "score")
+
+    def __init__(self, x, y, width, height, score):
+        self.x = x
+        self.y = y
+        self.width = width
+        self.height = height
+        self.score = score
+
+    @property
+    def center(self):
+        return self.x + self.width // 2, self.y + self.height // 2
+
+    def __repr__(self):
+        return f"Match(x={self.x}, y={self.y}, width={self.width}, height={self.height}, score={self.score:.3f})"
+
+
+def to_gray(image):
+    """Converts a PIL image or an HxW / HxWx3 / HxWx4 (RGB[A]) array to a float32 grayscale array."""
+    array = np.asarray(image)
+    if array.ndim == 2:
+        return array.astype(np.float32)
+    rgb = array[..., :3].astype(np.float32)
+    return rgb @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def downsample(gray):
+    """Halves both dimensions by averaging 2x2 blocks."""
+    even = gray[:gray.shape[0] // 2 * 2, :gray.shape[1] // 2 * 2]
+    # Four strided views added together - much faster than reshape().mean() on large frames
+    return (even[0::2, 0::2] + even[1::2, 0::2] + even[0::2, 1::2] + even[1::2, 1::2]) * 0.25
+
+
+def _fast_fft_size(n):
+    """Smallest 2^a * 3^b * 5^c >= n (FFTs are much faster at these sizes)."""
+    best = 1 << (n - 1).bit_length()
+    power3 = 1
+    while power3 < best:
+        power35 = power3
+        while power35 < best:
+            size = power35
+            while size < n:
+                size *= 2
+            best = min(best, size)
+            power35 *= 5
+        power3 *= 3
+    return best
+
+
+def _window_sums(values, height, width):
+    """Sum over every height x width window (valid positions only) using an integral image."""
+    integral = np.zeros((values.shape[0] + 1, values.shape[1] + 1), dtype=np.float64)
+    np.cumsum(np.cumsum(values, axis=0), axis=1, out=integral[1:, 1:])
+    return (integral[height:, width:] - integral[:-height, width:]
+            - integral[height:, :-width] + integral[:-height, :-width])
+
+
+def zncc_map(image, template):
+    """
+    ZNCC score for every position where 'template' fits completely inside 'image'.
+
+    Returns:
+        np.ndarray: (H - h + 1) x (W - w + 1) float32 scores; flat image windows score 0.
+
+    Raises:
+        ValueError: If the template is larger than the image or has no contrast.
+    """
+    image_height, image_width = image.shape
+    height, width = template.shape
+    if height > image_height or width > image_width:
+        raise ValueError("Template is larger than the search area.")
+    zero_mean = template.astype(np.float64) - template.mean()
+    template_norm = np.sqrt((zero_mean * zero_mean).sum())
+    if template_norm < _EPSILON:
+        raise ValueError("Template has no contrast (single colour) and can't be matched.")
+
+    image = image.astype(np.float64)
+    shape = (_fast_fft_size(image_height), _fast_fft_size(image_width))
+    spectrum = np.fft.rfft2(image, shape) * np.fft.rfft2(zero_mean[::-1, ::-1], shape)
+    correlation = np.fft.irfft2(spectrum, shape)[height - 1:image_height, width - 1:image_width]
+
+    count = height * width
+    sums = _window_sums(image, height, width)
+    variance = _window_sums(image * image, height, width) - sums * sums / count
+    denominator = np.sqrt(np.maximum(variance, 0)) * template_norm
+    scores = np.zeros_like(correlation)
+    np.divide(correlation, denominator, out=scores, where=denominator > _EPSILON * count)
+    return scores.astype(np.float32)
+
+
+def _top_candidates(scores, count, height, width):
+    """Positions of the 'count' best scores, at least half a template apart."""
+    scores = scores.copy()
+    candidates = []
+    for _ in range(count):
+        y, x = np.unravel_index(np.argmax(scores), scores.shape)
+        if scores[y, x] <= -1:
+            break
+        candidates.append((int(y), int(x)))
+        scores[max(y - height // 2, 0):y + height // 2 + 1, max(x - width // 2, 0):x + width // 2 + 1] = -1
+    return candidates
+
+
+def _refine(image, template, y, x):
+    """Best (score, y, x) within REFINE_RADIUS of (y, x)."""
+    height, width = template.shape
+    top = min(max(y - REFINE_RADIUS, 0), image.shape[0] - height)
+    left = min(max(x - REFINE_RADIUS, 0), image.shape[1] - width)
+    bottom = min(y + REFINE_RADIUS + height, image.shape[0])
+    right = min(x + REFINE_RADIUS + width, image.shape[1])
+    scores = zncc_map(image[top:bottom, left:right], template)
+    best_y, best_x = np.unravel_index(np.argmax(scores), scores.shape)
+    return float(scores[best_y, best_x]), top + int(best_y), left + int(best_x)
+
+
+def pyramid_levels(template_shape, image_shape):
+    levels = 0
+    side = min(template_shape)
+    while (levels < MAX_PYRAMID_LEVELS and side // 2 >= MIN_PYRAMID_TEMPLATE_SIDE
+           and min(image_shape) >> (levels + 1) >= side // 2):
+        side //= 2
+        levels += 1
+    return levels
+
+
+def find_template(screen, template, confidence=0.9, region=None):
+    """
+    Finds the best match of 'template' in 'screen'.
+
+    Args:
+        screen: Screen image (PIL image or array, RGB[A] or grayscale).
+        template: Template image (same formats).
+        confidence (float): Minimum ZNCC score (0..1) for a match.
+        region (tuple, optional): (x, y, width, height) of the screen area to search.
+
+    Returns:
+        Match or None: Best match in screen coordinates, or None if below 'confidence'.
+    """
+    image = np.asarray(screen)
+    left, top = 0, 0
+    if region is not None:
+        left, top, width, height = region
+        image = image[top:top + height, left:left + width]  # Crop before converting
+    image = to_gray(image)
+    template = to_gray(template)
+
+    levels = pyramid_levels(template.shape, image.shape)
+    images, templates = [image], [template]
+    for _ in range(levels):
+        images.append(downsample(images[-1]))
+        templates.append(downsample(templates[-1]))
+
+    coarse_template = templates[-1]
+    coarse_scores = zncc_map(images[-1], coarse_template)
+    candidates = [(float(coarse_scores[y, x]), y, x) for y, x in
+                  _top_candidates(coarse_scores, COARSE_CANDIDATES, *coarse_template.shape)]
+
+    for level in range(levels - 1, -1, -1):
+        candidates = [_refine(images[level], templates[level], y * 2, x * 2) for _, y, x in candidates]
+
+    if not candidates:
+        return None
+    score, y, x = max(candidates)
+    if score < confidence:
+        return None
+    return Match(left + x, top + y, template.shape[1], template.shape[0], score)
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def _load_template(path, signature):
+    from PIL import Image
+    with Image.open(path) as image:
+        return to_gray(image.convert("RGB"))
+
+
+def load_template(path):
+    """Grayscale template array for an image file, cached until the file changes."""
+    stat = os.stat(path)
+    return _load_template(os.path.abspath(path), (stat.st_mtime_ns, stat.st_size))
+
+
+def average_hash(gray, size=HASH_SIZE):
+    """Perceptual hash: one bit per cell of a size x size grid, set if the cell is brighter than average."""
+    rows = np.linspace(0, gray.shape[0], size + 1).astype(int)[:-1]
+    columns = np.linspace(0, gray.shape[1], size + 1).astype(int)[:-1]
+    cells = np.add.reduceat(np.add.reduceat(gray, rows, axis=0), columns, axis=1)
+    cells /= np.outer(np.diff(np.append(rows, gray.shape[0])), np.diff(np.append(columns, gray.shape[1])))
+    return int.from_bytes(np.packbits(cells > cells.mean()).tobytes(), "big")
+
+
+class LocationCache:
+    """Last known match per (template, search region), verified with a template-sized capture."""
+
+    def __init__(self, max_entries=LOCATION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # key -> (Match, average hash of the matched area)
+        self._lock = threading.Lock()
+
+    def verify(self, key, template, confidence):
+        """Returns the cached match if the screen still shows the template there, else None."""
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        match, stored_hash = entry
+        crop = to_gray(_capture_screen((match.x, match.y, match.width, match.height)))
+        if crop.shape != template.shape or bin(average_hash(crop) ^ stored_hash).count("1") > HASH_MAX_DISTANCE:
+            return None
+        score = float(zncc_map(crop, template)[0, 0])
+        if score < confidence:
+            return None
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+        return Match(match.x, match.y, match.width, match.height, score)
+
+    def store(self, key, match):
+        crop = to_gray(_capture_screen((match.x, match.y, match.width, match.height)))
+        with self._lock:
+            self._entries[key] = (match, average_hash(crop))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+
+location_cache = LocationCache()
+
+
+def _capture_screen(region=None):
+    import screen_capture
+    return screen_capture.grab(region)  # View into a reused buffer - converted to gray right away
+
+
+def _screen_pixels(region):
+    if region is not None:
+        return region[2] * region[3]
+    import pyautogui
+    width, height = pyautogui.size()
+    return width * height
+
+
+def _locate_in_this_process(template_path, confidence, region):
+    screen = _capture_screen(region)
+    # The screenshot already covers only the region - shift the result back to the screen
+    match = find_template(screen, load_template(template_path), confidence)
+    if match is not None and region is not None:
+        match.x += region[0]
+        match.y += region[1]
+    return match
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # 'spawn': forking a process that holds X connections and threads is not safe
+            _pool = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        return _pool
+
+
+def locate_on_screen(template_path, confidence=0.9, region=None, use_cache=True):
+    """
+    Captures the screen (or 'region' (x, y, width, height)) and searches it for the template.
+    With 'use_cache', the last known location is checked first (see LocationCache).
+
+    Returns:
+        Match or None
+    """
+    if not use_cache:
+        return _search(template_path, confidence, region)
+
+    stat = os.stat(template_path)
+    key = (os.path.abspath(template_path), stat.st_mtime_ns, stat.st_size, region)
+    match = location_cache.verify(key, load_template(template_path), confidence)
+    if match is not None:
+        return match
+    match = _search(template_path, confidence, region)
+    if match is not None:
+        location_cache.store(key, match)
+    else:
+        location_cache.discard(key)
+    return match
+
+
+def _discard_pool(pool):
+    """Shuts a broken worker pool down; the next search starts a new one."""
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _search(template_path, confidence, region):
+    """Full search, in the worker process for large areas."""
+    if _screen_pixels(region) >= POOL_MIN_PIXELS:
+        pool = _get_pool()
+        try:
+            future = pool.submit(_locate_in_this_process, template_path, confidence, region)
+        except (OSError, RuntimeError) as e:
+            # Worker could not be started, or the pool was shut down (BrokenProcessPool too)
+            future = None
+            print(f"Image matcher: worker process unavailable ({e}). Searching in-process.")
+            _discard_pool(pool)
+        if future is not None:
+            try:
+                return future.result(timeout=SEARCH_TIMEOUT_SECONDS)
+            except FutureTimeoutError:
+                # A slow search, not a broken pool - searching again in-process wouldn't be faster
+                future.cancel()
+                print(f"Image matcher: search took longer than {SEARCH_TIMEOUT_SECONDS} s. No match.")
+                return None
+            except BrokenProcessPool as e:
+                # The worker died; search in this process instead. Errors raised by the
+                # search itself (e.g. an unreadable template) propagate.
+                print(f"Image matcher: worker process died ({e}). Searching in-process.")
+                _discard_pool(pool)
+    return _locate_in_this_process(template_path, confidence, region)
+
+
+if __name__ == "__main__":
+    import time
+
+    rng = np.random.default_rng(42)
+    frame_height, frame_width = 2160, 3840
+    # Smooth random "desktop": blurred noise plus some flat rectangles (windows, toolbars)
+    frame = rng.integers(0, 256, (frame_height // 8, frame_width // 8), dtype=np.uint8)
+    frame = np.kron(frame, np.ones((8, 8), dtype=np.uint8)).astype(np.float32)
+    for _ in range(40):
+        y, x = rng.integers(0, frame_height - 200), rng.integers(0, frame_width - 300)
+        frame[y:y + rng.integers(20, 200), x:x + rng.integers(30, 300)] = rng.integers(0, 256)
+    frame += rng.normal(0, 4, frame.shape).astype(np.float32)
+
+    for template_height, template_width in ((32, 48), (64, 160), (120, 240)):
+        true_y, true_x = 1333, 2777
+        template = frame[true_y:true_y + template_height, true_x:true_x + template_width].copy()
+        # The on-screen copy is slightly brighter and noisier than the stored template
+        noisy = frame * 1.05 + 3 + rng.normal(0, 2, frame.shape).astype(np.float32)
+
+        runs = []
+        for _ in range(5):
+            start = time.perf_counter()
+            match = find_template(noisy, template, confidence=0.8)
+            runs.append(time.perf_counter() - start)
+        assert match is not None and (match.x, match.y) == (true_x, true_y), match
+
+        start = time.perf_counter()
+        full = zncc_map(to_gray(noisy), template)
+        single_level = time.perf_counter() - start
+        best = np.unravel_index(np.argmax(full), full.shape)
+        assert (int(best[1]), int(best[0])) == (true_x, true_y)
+
+        start = time.perf_counter()
+        roi_match = find_template(noisy, template, 0.8, region=(true_x - 200, true_y - 150, 600, 400))
+        roi_time = time.perf_counter() - start
+        assert roi_match is not None and (roi_match.x, roi_match.y) == (true_x, true_y)
+
+        print(f"4K frame, template {template_width}x{template_height}: "
+              f"pyramid {min(runs) * 1000:7.1f} ms ({pyramid_levels(template.shape, frame.shape)} levels, "
+              f"score {match.score:.3f}) | full-resolution FFT {single_level * 1000:7.1f} ms | "
+              f"600x400 ROI {roi_time * 1000:6.1f} ms")
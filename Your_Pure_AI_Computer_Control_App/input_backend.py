@@ -0,0 +1,198 @@
+# input_backend.py
+# Pluggable mouse/keyboard input used by the action modules.
+#
+# pyautogui sleeps for pyautogui.PAUSE (0.1 s by default) after every click, press, hotkey
+# and write call. Both backends below inject input without any implicit pause; timing
+# comes only from explicit scenario steps (e.g. "Wait") or readiness checks.
+#
+#   XTestBackend     - Linux/X11: injects events directly with the XTEST extension over
+#                      one persistent connection (requires python-xlib).
+#   PyAutoGUIBackend - Everywhere else: pyautogui with its implicit pause disabled.
+import os
+import platform
+import threading
+import time
+import pyautogui
+
+# python-xlib is optional - only needed for the XTest backend on Linux
+try:
+    import Xlib.threaded  # Must be imported first: makes the connection thread-safe
+    from Xlib import X, XK
+    from Xlib import display as xdisplay
+    from Xlib.ext import xtest
+    from keyboard_layout import KeyboardLayout
+except ImportError:
+    xdisplay = None
+
+INPUT_BACKEND = "auto"  # "auto", "xtest" or "pyautogui"
+
+MOUSE_BUTTONS = {"left": 1, "middle": 2, "right": 3}
+
+# pyautogui key names (as used in scenarios) -> X keysym names
+KEY_NAME_TO_KEYSYM_NAME = {
+    'enter': 'Return', 'return': 'Return', 'tab': 'Tab', 'backspace': 'BackSpace',
+    'delete': 'Delete', 'del': 'Delete', 'esc': 'Escape', 'escape': 'Escape',
+    'up': 'Up', 'down': 'Down', 'left': 'Left', 'right': 'Right',
+    'pageup': 'Prior', 'pgup': 'Prior', 'pagedown': 'Next', 'pgdn': 'Next',
+    'home': 'Home', 'end': 'End', 'space': 'space', 'insert': 'Insert',
+    'printscreen': 'Print', 'prntscrn': 'Print', 'prtsc': 'Print',
+    'ctrl': 'Control_L', 'ctrlleft': 'Control_L', 'ctrlright': 'Control_R',
+    'alt': 'Alt_L', 'altleft': 'Alt_L', 'altright': 'Alt_R',
+    'shift': 'Shift_L', 'shiftleft': 'Shift_L', 'shiftright': 'Shift_R',
+    'win': 'Super_L', 'winleft': 'Super_L', 'winright': 'Super_R',
+    'command': 'Super_L', 'capslock': 'Caps_Lock',
+}
+KEY_NAME_TO_KEYSYM_NAME.update({f"f{n}": f"F{n}" for n in range(1, 13)})
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class PyAutoGUIBackend:
+    name = "pyautogui"
+
+    def click(self, x, y, button='left'):
+        pyautogui.click(x=x, y=y, button=button, _pause=False)
+
+    def press(self, key):
+        pyautogui.press(key, _pause=False)
+
+    def hotkey(self, *keys):
+        pyautogui.hotkey(*keys, _pause=False)
+
+    def write(self, text, interval=0.0):
+        pyautogui.write(text, interval=interval, _pause=False)
+
+
+class XTestBackend:
+    name = "xtest"
+
+    def __init__(self):
+        self.display = xdisplay.Display()  # Uses $DISPLAY
+        if not self.display.has_extension("XTEST"):
+            self.display.close()
+            raise RuntimeError("X server does not support the XTEST extension.")
+        self._lock = threading.Lock()
+        # Built once and kept for the lifetime of the process (rebuilt if the layout changes)
+        self.layout = KeyboardLayout(self.display)
+
+    def _key_codes(self, key):
+        """
+        (keycode, modifier_keycodes) for a pyautogui-style key name ('enter', 'ctrl', 'a', ...).
+        Single characters come with the modifiers that produce them, e.g. Shift for 'A' or '!'.
+        Call _process_mapping_events() first so the current layout is used.
+        """
+        key = str(key)
+        keysym_name = KEY_NAME_TO_KEYSYM_NAME.get(key.lower())
+        if not keysym_name and len(key) == 1:
+            codes = self.layout.lookup(key)
+            if codes is None:
+                raise ValueError(f"Key '{key}' is not available on the current keyboard layout.")
+            return codes
+        keysym = XK.string_to_keysym(keysym_name or key)  # Or a raw X keysym name, e.g. 'KP_Enter'
+        keycode = self.display.keysym_to_keycode(keysym) if keysym != X.NoSymbol else 0
+        if not keycode:
+            raise ValueError(f"Key '{key}' is not available on the current keyboard layout.")
+        return keycode, ()
+
+    def _process_mapping_events(self):
+        """Applies keyboard layout changes (MappingNotify is sent to every client)."""
+        while self.display.pending_events():
+            event = self.display.next_event()
+            if event.type == X.MappingNotify:
+                self.layout.handle_mapping_notify(event)
+
+    def _tap(self, keycode, modifiers=()):
+        for modifier in modifiers:
+            xtest.fake_input(self.display, X.KeyPress, modifier)
+        xtest.fake_input(self.display, X.KeyPress, keycode)
+        xtest.fake_input(self.display, X.KeyRelease, keycode)
+        for modifier in reversed(modifiers):
+            xtest.fake_input(self.display, X.KeyRelease, modifier)
+
+    def click(self, x, y, button='left'):
+        button_number = MOUSE_BUTTONS.get(button)
+        if button_number is None:
+            raise ValueError(f"Unknown mouse button '{button}'.")
+        with self._lock:
+            xtest.fake_input(self.display, X.MotionNotify, x=int(x), y=int(y))
+            xtest.fake_input(self.display, X.ButtonPress, button_number)
+            xtest.fake_input(self.display, X.ButtonRelease, button_number)
+            self.display.sync()
+
+    def press(self, key):
+        with self._lock:
+            self._process_mapping_events()
+            self._tap(*self._key_codes(key))
+            self.display.sync()
+
+    def hotkey(self, *keys):
+        with self._lock:
+            self._process_mapping_events()
+            keycodes = []  # In press order; a modifier needed by several keys is pressed once
+            for key in keys:
+                keycode, modifiers = self._key_codes(key)
+                keycodes.extend(code for code in modifiers + (keycode,) if code not in keycodes)
+            for keycode in keycodes:
+                xtest.fake_input(self.display, X.KeyPress, keycode)
+            for keycode in reversed(keycodes):
+                xtest.fake_input(self.display, X.KeyRelease, keycode)
+            self.display.sync()
+
+    def _type_keys(self, keys, interval):
+        for key in keys:
+            self._tap(*key)
+            if interval:
+                self.display.sync()
+                time.sleep(interval)
+        self.display.sync()
+
+    def _type_segment(self, segment, missing, interval):
+        """Types 'segment'; characters in 'missing' are bound to spare keycodes meanwhile."""
+        if not missing:
+            self._type_keys([self.layout.lookup(char) for char in segment], interval)
+            return
+        with self.layout.temporary_keys(missing) as bindings:
+            self._type_keys([bindings.get(char) or self.layout.lookup(char) for char in segment], interval)
+
+    def write(self, text, interval=0.0):
+        with self._lock:
+            self._process_mapping_events()
+            capacity = len(self.layout.spare_keycodes)
+            segment, missing = [], []
+            for char in text:
+                if self.layout.lookup(char) is None and char not in missing:
+                    if not capacity:
+                        print(f"Warning: Character {char!r} is not on the current keyboard layout. Skipped.")
+                        continue
+                    if len(missing) == capacity:
+                        # Out of spare keycodes: type what we have, then bind the next batch
+                        self._type_segment(segment, missing, interval)
+                        segment, missing = [], []
+                    missing.append(char)
+                segment.append(char)
+            if segment:
+                self._type_segment(segment, missing, interval)
+
+
+def get_input_backend():
+    """
+    Returns the process-wide input backend, creating it on first use.
+    With INPUT_BACKEND = "auto", XTest is used on Linux/X11 when python-xlib is installed.
+    """
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            want_xtest = INPUT_BACKEND == "xtest" or (
+                INPUT_BACKEND == "auto" and platform.system() == "Linux" and os.environ.get("DISPLAY"))
+            if want_xtest and xdisplay is not None:
+                try:
+                    _backend = XTestBackend()
+                    print("Input backend: using X11 XTEST event injection.")
+                except Exception as e:
+                    print(f"Warning: Could not start XTest input backend: {e}. Using pyautogui.")
+            elif want_xtest:
+                print("Info: python-xlib not installed. Using pyautogui for input.")
+            if _backend is None:
+                _backend = PyAutoGUIBackend()
+        return _backend
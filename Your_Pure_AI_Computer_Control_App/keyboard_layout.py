@@ -0,0 +1,129 @@
+# keyboard_layout.py
+# Character -> key lookup for the active X keyboard layout, used by the XTest input backend.
+#
+# The keyboard mapping is fetched from the X server once and turned into a keysym table;
+# lookups per character are cached as well, so typing needs no round trips. The table is
+# rebuilt only when the layout changes (MappingNotify). Characters the layout can't
+# produce are typed by temporarily binding their keysym to an unused keycode.
+import time
+from contextlib import contextmanager
+from Xlib import X, XK
+
+# Keysym list positions of the core keyboard mapping we can reach, in order of preference:
+# 0 = plain, 1 = Shift, 4 = AltGr (ISO_Level3_Shift), 5 = AltGr+Shift.
+# Positions 2 and 3 belong to the second layout group and are not used.
+LEVEL_INDEXES = (0, 1, 4, 5)
+# Time given to applications to pick up a temporary mapping change before and after use
+REMAP_SETTLE_SECONDS = 0.05
+
+
+def char_to_keysym(char):
+    """Returns the X keysym for a single character."""
+    if char == "\n":
+        return XK.string_to_keysym("Return")
+    if char == "\t":
+        return XK.string_to_keysym("Tab")
+    codepoint = ord(char)
+    if 0x20 <= codepoint <= 0x7E or 0xA0 <= codepoint <= 0xFF:
+        return codepoint  # Latin-1 keysyms equal their code points
+    return 0x01000000 | codepoint  # Unicode keysym
+
+
+class KeyboardLayout:
+    """Cached keysym table of the current keyboard mapping of an X display."""
+
+    def __init__(self, display):
+        self.display = display
+        self.min_keycode = display.display.info.min_keycode
+        self.max_keycode = display.display.info.max_keycode
+        self._own_changes = 0  # MappingNotify events caused by our temporary bindings
+        self.refresh()
+
+    def refresh(self):
+        """Re-reads the keyboard mapping from the server."""
+        count = self.max_keycode - self.min_keycode + 1
+        mapping = self.display.get_keyboard_mapping(self.min_keycode, count)
+
+        keysym_table = {}  # keysym -> (keycode, index), lowest level wins
+        spare_keycodes = []
+        for offset, keysyms in enumerate(mapping):
+            keycode = self.min_keycode + offset
+            if not any(keysyms):
+                spare_keycodes.append(keycode)
+                continue
+            for index in LEVEL_INDEXES:
+                if index < len(keysyms) and keysyms[index] != X.NoSymbol:
+                    known = keysym_table.get(keysyms[index])
+                    if known is None or LEVEL_INDEXES.index(index) < LEVEL_INDEXES.index(known[1]):
+                        keysym_table[keysyms[index]] = (keycode, index)
+
+        self.keysyms_per_keycode = max(len(mapping[0]), 2) if mapping else 2
+        self.spare_keycodes = spare_keycodes
+        self.shift_keycode = keysym_table.get(XK.string_to_keysym("Shift_L"), (0, 0))[0]
+        self.level3_keycode = keysym_table.get(XK.string_to_keysym("ISO_Level3_Shift"), (0, 0))[0]
+        self._keysym_table = keysym_table
+        self._char_cache = {}
+
+    def handle_mapping_notify(self, event):
+        """Updates the table after a MappingNotify event. Our own temporary bindings are ignored."""
+        self.display.refresh_keyboard_mapping(event)
+        if event.request != X.MappingKeyboard:
+            return
+        if self._own_changes:
+            self._own_changes -= 1
+            return
+        self.refresh()
+
+    def lookup(self, char):
+        """
+        Returns (keycode, modifier_keycodes) for a character, or None if the layout can't
+        produce it.
+        """
+        try:
+            return self._char_cache[char]
+        except KeyError:
+            pass
+        result = None
+        entry = self._keysym_table.get(char_to_keysym(char))
+        if entry is not None:
+            keycode, index = entry
+            modifiers = []
+            if index in (4, 5):
+                modifiers.append(self.level3_keycode)
+            if index in (1, 5):
+                modifiers.append(self.shift_keycode)
+            if all(modifiers):
+                result = (keycode, tuple(modifiers))
+        self._char_cache[char] = result
+        return result
+
+    @contextmanager
+    def temporary_keys(self, chars):
+        """
+        Binds each character to one of the unused keycodes for the duration of the block.
+
+        Yields:
+            dict: char -> (keycode, ()) for the bound characters.
+        """
+        if len(chars) > len(self.spare_keycodes):
+            raise ValueError(f"Only {len(self.spare_keycodes)} unused keycodes available.")
+        bindings = {}
+        empty = [X.NoSymbol] * self.keysyms_per_keycode
+        try:
+            for char, keycode in zip(chars, self.spare_keycodes):
+                keysym = char_to_keysym(char)
+                row = [keysym, keysym] + [X.NoSymbol] * (self.keysyms_per_keycode - 2)
+                self._own_changes += 1
+                self.display.change_keyboard_mapping(keycode, [row])
+                bindings[char] = (keycode, ())
+            self.display.sync()
+            time.sleep(REMAP_SETTLE_SECONDS)
+            yield bindings
+        finally:
+            if bindings:
+                self.display.sync()
+                time.sleep(REMAP_SETTLE_SECONDS)  # Let the application read the keys first
+                for keycode, _ in bindings.values():
+                    self._own_changes += 1
+                    self.display.change_keyboard_mapping(keycode, [empty])
+                self.display.sync()
@@ -0,0 +1,135 @@
+# scenario_compiler.py
+# Turns scenario JSON files into validated, ready-to-run step lists and caches them.
+#
+# Every step is checked once when the scenario is compiled: its action type must be known,
+# the action's 'execute' callable is resolved, the action module's optional
+# validate(data) function is called, an optional 'wait_until' post-condition is parsed
+# (see wait_conditions.py) and all ${variable} templates are parsed. A malformed step
+# therefore fails before step 1 runs instead of halfway through a GUI sequence. Compiled
+# scenarios are kept in memory and only recompiled when the file's modification time or
+# size changes.
+import json
+import os
+import threading
+from template_engine import precompile_templates
+from wait_conditions import parse_post_condition
+
+
+class ScenarioCompileError(ValueError):
+    """Raised when a scenario file or one of its steps is invalid."""
+
+
+class CompiledStep:
+    """One validated scenario step with its action callable already resolved."""
+
+    __slots__ = ("index", "type", "details", "data", "module_name", "execute", "post_condition")
+
+    def __init__(self, index, action_type, details, data, module_name, execute, post_condition=None):
+        self.index = index
+        self.type = action_type
+        self.details = details
+        self.data = data  # Shared between runs - actions must not modify it
+        self.module_name = module_name
+        self.execute = execute
+        self.post_condition = post_condition  # wait_conditions.PostCondition or None
+
+
+class CompiledScenario:
+    __slots__ = ("path", "signature", "steps")
+
+    def __init__(self, path, signature, steps):
+        self.path = path
+        self.signature = signature
+        self.steps = steps
+
+
+def compile_scenario(scenario_path, resolve_action, signature=None):
+    """
+    Reads, validates and compiles a scenario file.
+
+    Args:
+        scenario_path (str): Path to the scenario .json file.
+        resolve_action (callable): action_type -> (module_name, execute, validate or None).
+                                   Raises ValueError for unknown/broken actions.
+        signature: File signature stored with the result (used by ScenarioCache).
+
+    Returns:
+        CompiledScenario
+
+    Raises:
+        ScenarioCompileError: If the file or any step is invalid.
+        IOError: If the file can't be read.
+    """
+    try:
+        with open(scenario_path, 'r') as f:
+            scenario_data = json.load(f)
+    except json.JSONDecodeError:
+        raise ScenarioCompileError(f"Error decoding scenario file '{scenario_path}'.")
+    except Exception as e:
+        # Catch other potential issues like read errors
+        raise IOError(f"Could not read scenario file '{scenario_path}': {e}")
+
+    if not isinstance(scenario_data, dict) or "actions" not in scenario_data:
+        raise ScenarioCompileError("Scenario file is missing the 'actions' list.")
+    if not isinstance(scenario_data["actions"], list):
+        raise ScenarioCompileError(f"'actions' in scenario file '{scenario_path}' must be a list.")
+
+    steps = []
+    for index, action in enumerate(scenario_data["actions"]):
+        step_label = f"Scenario '{scenario_path}', step {index+1}"
+        if not isinstance(action, dict):
+            raise ScenarioCompileError(f"{step_label}: Step must be a JSON object.")
+
+        action_type = action.get("type")
+        data = action.get("data", {})
+        if data is None:
+            data = {}
+        if not isinstance(data, dict):
+            raise ScenarioCompileError(f"{step_label} ('{action_type}'): 'data' must be a JSON object.")
+
+        try:
+            module_name, execute, validate = resolve_action(action_type)
+            if validate:
+                validate(data)
+            post_condition = parse_post_condition(data["wait_until"]) if "wait_until" in data else None
+            precompile_templates(data)
+        except ValueError as e:
+            raise ScenarioCompileError(f"{step_label} ('{action_type}'): {e}")
+
+        steps.append(CompiledStep(index, action_type, action.get("details", ""), data, module_name, execute,
+                                  post_condition))
+
+    return CompiledScenario(scenario_path, signature, steps)
+
+
+class ScenarioCache:
+    """In-memory cache of compiled scenarios, invalidated by file modification time and size."""
+
+    def __init__(self, resolve_action):
+        self.resolve_action = resolve_action
+        self._compiled = {}  # Path -> CompiledScenario
+        self._lock = threading.Lock()
+
+    def get(self, scenario_path):
+        """Returns the compiled scenario, recompiling it only if the file has changed."""
+        try:
+            stat = os.stat(scenario_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Scenario file '{scenario_path}' not found.")
+        signature = (stat.st_mtime_ns, stat.st_size)
+
+        with self._lock:
+            compiled = self._compiled.get(scenario_path)
+            if compiled is not None and compiled.signature == signature:
+                return compiled
+
+        compiled = compile_scenario(scenario_path, self.resolve_action, signature)
+        with self._lock:
+            self._compiled[scenario_path] = compiled
+        print(f"Compiled scenario '{scenario_path}' ({len(compiled.steps)} steps).")
+        return compiled
+
+    def clear(self):
+        """Drops all compiled scenarios (e.g. after the action configuration changed)."""
+        with self._lock:
+            self._compiled.clear()
@@ -2,11 +2,14 @@ import tkinter as tk
 from tkinter import ttk, messagebox, simpledialog
 import json
 import os
+import platform
 import keyboard
 import pyautogui
 import threading
 import time
 
+TEMPLATE_DIR = "templates"  # Images captured for "Click Image" steps
+
 class ScenarioCreator:
     def __init__(self, master):
         self.master = master
@@ -89,7 +92,11 @@ class ScenarioCreator:
             ("Press Key", self.add_press_key),
             ("Show Info Message", self.add_info_message),
             ("Show Form", self.add_show_form),
-            ("Execute Command", self.add_execute_command)
+            ("Execute Command", self.add_execute_command),
+            ("Click Image", self.add_click_image),
+            ("Screenshot", self.add_screenshot),
+            ("Wait for Screen to Settle", self.add_wait_for_settle),
+            ("Verify Region", self.add_verify_region)
         ]
         
         for text, command in actions:
@@ -177,6 +184,14 @@ class ScenarioCreator:
             self.edit_press_key(index)
         elif action["type"] == "Execute Command":
             self.edit_execute_command(index)            
+        elif action["type"] == "Click Image":
+            self.edit_click_image(index)
+        elif action["type"] == "Screenshot":
+            self.edit_screenshot(index)
+        elif action["type"] == "Wait for Screen to Settle":
+            self.edit_wait_for_settle(index)
+        elif action["type"] == "Verify Region":
+            self.edit_verify_region(index)
         
         self.update_action_list()
     
@@ -243,6 +258,13 @@ class ScenarioCreator:
                     self.temp_coordinates['start'] = self.coordinate_start
                     self.temp_coordinates['end'] = current_pos
                     print(f"Recorded end position: {current_pos}")
+                    if 'image' in self.temp_coordinates:
+                        # Click Image: grab the template now, before our windows are restored
+                        left, top = min(self.coordinate_start[0], current_pos[0]), min(self.coordinate_start[1], current_pos[1])
+                        width = abs(current_pos[0] - self.coordinate_start[0])
+                        height = abs(current_pos[1] - self.coordinate_start[1])
+                        if width > 0 and height > 0:
+                            self.temp_coordinates['image'] = pyautogui.screenshot(region=(left, top, width, height))
                     
                     self.recording_coordinates = False
                     self.coordinate_start = None
@@ -668,6 +690,16 @@ class ScenarioCreator:
     
     def edit_wait(self, index):
         action = self.actions[index]
+        if action["data"].get("until") == "variable_set":
+            messagebox.showinfo("Edit Wait", "'variable_set' is checked once and has no timeout to edit.")
+            return
+        if "until" in action["data"]:
+            # Conditional wait (written in the scenario file) - only the deadline is editable here
+            timeout = simpledialog.askfloat("Edit Wait", f"Wait until {action['data']['until']} - timeout in seconds:",
+                                            initialvalue=action["data"].get("timeout", 30), minvalue=0.1, maxvalue=3600)
+            if timeout is not None:
+                action["data"]["timeout"] = timeout
+            return
         seconds = simpledialog.askfloat("Edit Wait", "Enter the number of seconds to wait:", 
                                       initialvalue=action["data"]["seconds"], minvalue=0.1, maxvalue=300)
         if seconds is not None:
@@ -682,7 +714,7 @@ class ScenarioCreator:
     def add_insert_text(self):
         dialog = tk.Toplevel(self.master)
         dialog.title("Insert Text")
-        dialog.geometry("400x200")
+        dialog.geometry("400x320")
         dialog.transient(self.master)
         dialog.grab_set()
         
@@ -693,6 +725,12 @@ class ScenarioCreator:
         
         ttk.Label(dialog, text="Use ${variable_name} to insert variable values").pack(pady=5)
         
+        ttk.Label(dialog, text="Insertion mode:").pack(pady=5)
+        mode_var = tk.StringVar(value="type")
+        ttk.Radiobutton(dialog, text="Type characters (slow, default)", variable=mode_var, value="type").pack(anchor=tk.W, padx=20, pady=2)
+        ttk.Radiobutton(dialog, text="Send keys in one batch (fast)", variable=mode_var, value="keys").pack(anchor=tk.W, padx=20, pady=2)
+        ttk.Radiobutton(dialog, text="Paste via clipboard (fastest, any characters)", variable=mode_var, value="paste").pack(anchor=tk.W, padx=20, pady=2)
+        
         def on_ok():
             text = text_entry.get()
             if not text:
@@ -701,6 +739,9 @@ class ScenarioCreator:
                 
             data = {"text": text}
             details = f"Text: {text}"
+            if mode_var.get() != "type":
+                data["mode"] = mode_var.get()
+                details += f" ({mode_var.get()})"
             self.add_action("Insert Text", details, data)
             dialog.destroy()
         
@@ -716,7 +757,7 @@ class ScenarioCreator:
         action = self.actions[index]
         dialog = tk.Toplevel(self.master)
         dialog.title("Edit Insert Text")
-        dialog.geometry("400x200")
+        dialog.geometry("400x320")
         dialog.transient(self.master)
         dialog.grab_set()
         
@@ -728,6 +769,12 @@ class ScenarioCreator:
         
         ttk.Label(dialog, text="Use ${variable_name} to insert variable values").pack(pady=5)
         
+        ttk.Label(dialog, text="Insertion mode:").pack(pady=5)
+        mode_var = tk.StringVar(value=action["data"].get("mode", "type"))
+        ttk.Radiobutton(dialog, text="Type characters (slow, default)", variable=mode_var, value="type").pack(anchor=tk.W, padx=20, pady=2)
+        ttk.Radiobutton(dialog, text="Send keys in one batch (fast)", variable=mode_var, value="keys").pack(anchor=tk.W, padx=20, pady=2)
+        ttk.Radiobutton(dialog, text="Paste via clipboard (fastest, any characters)", variable=mode_var, value="paste").pack(anchor=tk.W, padx=20, pady=2)
+        
         def on_ok():
             text = text_entry.get()
             if not text:
@@ -736,6 +783,9 @@ class ScenarioCreator:
                 
             data = {"text": text}
             details = f"Text: {text}"
+            if mode_var.get() != "type":
+                data["mode"] = mode_var.get()
+                details += f" ({mode_var.get()})"
             self.actions[index] = {
                 "type": "Insert Text",
                 "details": details,
@@ -1244,24 +1294,69 @@ class ScenarioCreator:
         ttk.Button(buttons_frame, text="Cancel", command=on_cancel, width=10).pack(side=tk.LEFT, padx=10)
 
 
-    def add_execute_command(self):
+    def _execute_command_dialog(self, title, action=None):
+        """Shared dialog for adding and editing an Execute Command step."""
+        data = action["data"] if action else {}
         dialog = tk.Toplevel(self.master)
-        dialog.title("Execute Command")
-        dialog.geometry("500x300")
+        dialog.title(title)
+        dialog.geometry("500x740")
         dialog.transient(self.master)
         dialog.grab_set()
 
         ttk.Label(dialog, text="Select command type:").pack(pady=10)
 
-        command_type_var = tk.StringVar(value="cmd")
-        ttk.Radiobutton(dialog, text="Command Prompt (cmd)", variable=command_type_var, value="cmd").pack(anchor=tk.W, padx=20, pady=5)
-        ttk.Radiobutton(dialog, text="PowerShell", variable=command_type_var, value="powershell").pack(anchor=tk.W, padx=20, pady=5)
+        command_type_var = tk.StringVar(value=data.get("command_type", "cmd" if platform.system() == "Windows" else "bash"))
+        ttk.Radiobutton(dialog, text="Command Prompt (cmd, Windows only)", variable=command_type_var, value="cmd").pack(anchor=tk.W, padx=20, pady=2)
+        ttk.Radiobutton(dialog, text="PowerShell (pwsh outside Windows)", variable=command_type_var, value="powershell").pack(anchor=tk.W, padx=20, pady=2)
+        ttk.Radiobutton(dialog, text="bash", variable=command_type_var, value="bash").pack(anchor=tk.W, padx=20, pady=2)
+        ttk.Radiobutton(dialog, text="sh", variable=command_type_var, value="sh").pack(anchor=tk.W, padx=20, pady=2)
 
         ttk.Label(dialog, text="Enter command(s) to execute (one per line):").pack(pady=10)
 
         command_text = tk.Text(dialog, width=50, height=8)
+        commands = data.get("commands", "")
+        command_text.insert("1.0", "\n".join(commands) if isinstance(commands, list) else commands)
         command_text.pack(pady=5)
 
+        parallel_var = tk.BooleanVar(value=isinstance(commands, list))
+        ttk.Checkbutton(dialog, text="Run each line as a separate command, in parallel", variable=parallel_var).pack(anchor=tk.W, padx=20, pady=5)
+        policy_var = tk.StringVar(value=data.get("policy", "collect_all"))
+        policy_frame = ttk.Frame(dialog)
+        policy_frame.pack(anchor=tk.W, padx=40)
+        ttk.Radiobutton(policy_frame, text="Run all", variable=policy_var, value="collect_all").pack(side=tk.LEFT, padx=5)
+        ttk.Radiobutton(policy_frame, text="Stop all on the first failure", variable=policy_var, value="fail_fast").pack(side=tk.LEFT, padx=5)
+
+        reuse_session_var = tk.BooleanVar(value=data.get("reuse_session", False))
+        ttk.Checkbutton(dialog, text="Reuse a running shell (faster, not for cmd)", variable=reuse_session_var).pack(anchor=tk.W, padx=20, pady=5)
+
+        options_frame = ttk.Frame(dialog)
+        options_frame.pack(pady=10)
+        option_entries = {}
+        options = [
+            ("timeout", "Timeout in seconds (empty = no limit):"),
+            ("exit_code_variable", "Store exit code in variable:"),
+            ("output_variable", "Store output (last lines) in variable:"),
+            ("error_variable", "Store error output in variable:"),
+        ]
+        for row, (key, label) in enumerate(options):
+            ttk.Label(options_frame, text=label).grid(row=row, column=0, sticky=tk.W, padx=5, pady=2)
+            entry = ttk.Entry(options_frame, width=20)
+            if data.get(key) is not None:
+                entry.insert(0, str(data[key]))
+            entry.grid(row=row, column=1, padx=5, pady=2)
+            option_entries[key] = entry
+
+        cache = data.get("cache")
+        if cache is True:
+            cache = {}
+        ttk.Label(options_frame, text="Reuse result for seconds (empty = always run):").grid(row=len(options), column=0, sticky=tk.W, padx=5, pady=2)
+        cache_ttl_entry = ttk.Entry(options_frame, width=20)
+        if isinstance(cache, dict):
+            cache_ttl_entry.insert(0, str(cache.get("ttl", 300)))
+        cache_ttl_entry.grid(row=len(options), column=1, padx=5, pady=2)
+        cache_persist_var = tk.BooleanVar(value=isinstance(cache, dict) and cache.get("persist", False))
+        ttk.Checkbutton(options_frame, text="Keep cached result across restarts (stored on disk)", variable=cache_persist_var).grid(row=len(options) + 1, column=0, columnspan=2, sticky=tk.W, padx=5, pady=2)
+
         def on_ok():
             command_type = command_type_var.get()
             commands = command_text.get("1.0", tk.END).strip()
@@ -1269,14 +1364,52 @@ class ScenarioCreator:
                 messagebox.showwarning("Warning", "Commands cannot be empty")
                 return
 
-            data = {
+            if reuse_session_var.get() and command_type == "cmd":
+                messagebox.showwarning("Warning", "Reusing a running shell is not supported for cmd")
+                return
+
+            new_data = {key: value for key, value in data.items() if key not in option_entries and key not in ("reuse_session", "policy", "cache")}
+            new_data.update({
                 "command_type": command_type,
-                "commands": commands
-            }
-            replaced_commands = commands.replace('\n', '; ')
-            details = f"Execute {command_type}: {replaced_commands}"
+                "commands": [line.strip() for line in commands.splitlines() if line.strip()] if parallel_var.get() else commands
+            })
+            if parallel_var.get() and policy_var.get() != "collect_all":
+                new_data["policy"] = policy_var.get()
+            if reuse_session_var.get():
+                new_data["reuse_session"] = True
+            timeout = option_entries["timeout"].get().strip()
+            if timeout:
+                try:
+                    new_data["timeout"] = float(timeout)
+                    if new_data["timeout"] <= 0:
+                        raise ValueError
+                except ValueError:
+                    messagebox.showwarning("Warning", "Timeout must be a positive number of seconds")
+                    return
+            for key in ("exit_code_variable", "output_variable", "error_variable"):
+                value = option_entries[key].get().strip()
+                if value:
+                    new_data[key] = value
+            cache_ttl = cache_ttl_entry.get().strip()
+            if cache_ttl:
+                try:
+                    new_data["cache"] = {"ttl": float(cache_ttl)}
+                    if new_data["cache"]["ttl"] <= 0:
+                        raise ValueError
+                except ValueError:
+                    messagebox.showwarning("Warning", "The cache time must be a positive number of seconds")
+                    return
+                if cache_persist_var.get():
+                    new_data["cache"]["persist"] = True
+
+            replaced_commands = commands.replace('\n', ' | ' if parallel_var.get() else '; ')
+            details = f"Execute {command_type}{' (parallel)' if parallel_var.get() else ''}: {replaced_commands}"
 
-            self.add_action("Execute Command", details, data)
+            if action:
+                action.update({"details": details, "data": new_data})
+                self.update_action_list()
+            else:
+                self.add_action("Execute Command", details, new_data)
             dialog.destroy()
 
         def on_cancel():
@@ -1285,49 +1418,180 @@ class ScenarioCreator:
         buttons_frame = ttk.Frame(dialog)
         buttons_frame.pack(side=tk.BOTTOM, pady=15)
         ttk.Button(buttons_frame, text="OK", command=on_ok, width=10).pack(side=tk.LEFT, padx=10)
-        ttk.Button(buttons_frame, text="Cancel", command=on_cancel, width=10).pack(side=tk.LEFT, padx=10)        
+        ttk.Button(buttons_frame, text="Cancel", command=on_cancel, width=10).pack(side=tk.LEFT, padx=10)
+
+    def add_execute_command(self):
+        self._execute_command_dialog("Execute Command")
 
     def edit_execute_command(self, index):
-        action = self.actions[index]
+        self._execute_command_dialog("Edit Execute Command", self.actions[index])
+
+    def _image_capture_status(self, dialog, initial_text, noun):
+        """
+        Resets the hotkey capture and shows its result in 'dialog' (refreshed every 500 ms).
+        Returns the function that closes the dialog and stops the refresh.
+        """
+        # The image is captured by the hotkey handler when the second corner is recorded
+        self.temp_coordinates = {"start": (0, 0), "end": (0, 0), "image": None}
+
+        image_label = ttk.Label(dialog, text=initial_text)
+        image_label.pack(pady=5)
+
+        label_update = None  # Pending 'after' of update_image_label
+
+        def update_image_label():
+            nonlocal label_update
+            if not dialog.winfo_exists():
+                return  # Closed by the window manager
+            image = self.temp_coordinates.get("image") if isinstance(self.temp_coordinates, dict) else None
+            if image is not None:
+                image_label.config(text=f"Captured {noun}: {image.width}x{image.height} px")
+            label_update = dialog.after(500, update_image_label)
+
+        update_image_label()
+
+        def close_dialog():
+            dialog.after_cancel(label_update)
+            dialog.destroy()
+
+        return close_dialog
+
+    def _save_captured_image(self, name, current_path, noun, file_noun):
+        """
+        Saves the image captured with the hotkey as TEMPLATE_DIR/<name>.png. Without a new
+        capture, the step's current file ('current_path') is kept if the name is unchanged.
+
+        Returns:
+            (path, captured) or None if there is nothing to save or saving failed (the user
+            has been told).
+        """
+        image = self.temp_coordinates.get("image")
+        path = f"{TEMPLATE_DIR}/{name}.png"
+        if image is None:
+            if current_path != path:
+                messagebox.showwarning("Warning", f"Capture the {noun} with the hotkey first")
+                return None
+            return path, False
+        try:
+            os.makedirs(TEMPLATE_DIR, exist_ok=True)
+            image.save(path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save {file_noun} image: {str(e)}")
+            return None
+        return path, True
+
+    def _click_image_dialog(self, title, action=None):
+        """Shared dialog for adding and editing a Click Image step."""
+        data = action["data"] if action else {}
         dialog = tk.Toplevel(self.master)
-        dialog.title("Edit Execute Command")
-        dialog.geometry("500x300")
+        dialog.title(title)
+        dialog.geometry("450x420")
         dialog.transient(self.master)
         dialog.grab_set()
 
-        ttk.Label(dialog, text="Select command type:").pack(pady=10)
+        ttk.Label(dialog, text="Use Ctrl+Shift to select the top-left and bottom-right\ncorners of the image to click").pack(pady=10)
 
-        command_type_var = tk.StringVar(value=action["data"]["command_type"])
-        ttk.Radiobutton(dialog, text="Command Prompt (cmd)", variable=command_type_var, value="cmd").pack(anchor=tk.W, padx=20, pady=5)
-        ttk.Radiobutton(dialog, text="PowerShell", variable=command_type_var, value="powershell").pack(anchor=tk.W, padx=20, pady=5)
+        ttk.Label(dialog, text="Template name:").pack(pady=5)
+        name_entry = ttk.Entry(dialog, width=40)
+        name_entry.insert(0, os.path.splitext(os.path.basename(data.get("template", "")))[0])
+        name_entry.pack(pady=5)
 
-        ttk.Label(dialog, text="Enter command(s) to execute (one per line):").pack(pady=10)
+        ttk.Label(dialog, text="Minimum match confidence (0.5 - 1.0):").pack(pady=5)
+        confidence_var = tk.DoubleVar(value=data.get("confidence", 0.9))
+        ttk.Spinbox(dialog, from_=0.5, to=1.0, increment=0.05, textvariable=confidence_var).pack(pady=5)
 
-        command_text = tk.Text(dialog, width=50, height=8)
-        command_text.insert("1.0", action["data"]["commands"])
-        command_text.pack(pady=5)
+        ttk.Label(dialog, text="Keep searching for (seconds, 0 = search once):").pack(pady=5)
+        timeout_var = tk.DoubleVar(value=data.get("timeout", 0))
+        ttk.Spinbox(dialog, from_=0, to=300, increment=1, textvariable=timeout_var).pack(pady=5)
+
+        button_var = tk.StringVar(value=data.get("button", "left"))
+        ttk.Radiobutton(dialog, text="Left click", variable=button_var, value="left").pack(anchor=tk.W, padx=20, pady=2)
+        ttk.Radiobutton(dialog, text="Right click", variable=button_var, value="right").pack(anchor=tk.W, padx=20, pady=2)
+
+        close_dialog = self._image_capture_status(
+            dialog, f"Current image: {data['template']}" if action else "No image captured yet", "image")
 
         def on_ok():
-            command_type = command_type_var.get()
-            commands = command_text.get("1.0", tk.END).strip()
-            if not commands:
-                messagebox.showwarning("Warning", "Commands cannot be empty")
+            name = name_entry.get().strip()
+            if not name:
+                messagebox.showwarning("Warning", "Template name cannot be empty")
+                return
+            try:
+                confidence = confidence_var.get()
+                timeout = timeout_var.get()
+            except tk.TclError:
+                messagebox.showwarning("Warning", "Confidence and search time must be numbers")
+                return
+            saved = self._save_captured_image(name, data.get("template"), "image", "template")
+            if saved is None:
                 return
+            template_path = saved[0]
 
-            data = {
-                "command_type": command_type,
-                "commands": commands
-            }
+            new_data = dict(data)  # Keeps options set in the scenario file (region, offset)
+            new_data.update({"template": template_path, "confidence": round(confidence, 2),
+                             "button": button_var.get()})
+            if timeout > 0:
+                new_data["timeout"] = timeout
+            else:
+                new_data.pop("timeout", None)
+            details = f"Image: {template_path}, {button_var.get()} click"
+            if action:
+                action.update({"details": details, "data": new_data})
+                self.update_action_list()
+            else:
+                self.add_action("Click Image", details, new_data)
+            close_dialog()
 
-            replaced_commands = commands.replace('\n', '; ')
-            details = f"Execute {command_type}: {replaced_commands}"
+        def on_cancel():
+            close_dialog()
 
-            self.actions[index] = {
-                "type": "Execute Command",
-                "details": details,
-                "data": data
-            }
-            self.update_action_list()
+        buttons_frame = ttk.Frame(dialog)
+        buttons_frame.pack(side=tk.BOTTOM, pady=15)
+        ttk.Button(buttons_frame, text="OK", command=on_ok, width=10).pack(side=tk.LEFT, padx=10)
+        ttk.Button(buttons_frame, text="Cancel", command=on_cancel, width=10).pack(side=tk.LEFT, padx=10)
+
+    def add_click_image(self):
+        self._click_image_dialog("Click Image")
+
+    def edit_click_image(self, index):
+        self._click_image_dialog("Edit Click Image", self.actions[index])
+
+    def _screenshot_dialog(self, title, action=None):
+        """Shared dialog for adding and editing a Screenshot step."""
+        data = action["data"] if action else {}
+        dialog = tk.Toplevel(self.master)
+        dialog.title(title)
+        dialog.geometry("400x250")
+        dialog.transient(self.master)
+        dialog.grab_set()
+
+        ttk.Label(dialog, text="Save to file (optional, e.g. screenshots/${name}.png):").pack(pady=5)
+        path_entry = ttk.Entry(dialog, width=40)
+        path_entry.insert(0, data.get("path", ""))
+        path_entry.pack(pady=5)
+
+        ttk.Label(dialog, text="Store as base64 PNG in variable (optional):").pack(pady=5)
+        variable_entry = ttk.Entry(dialog, width=40)
+        variable_entry.insert(0, data.get("variable", ""))
+        variable_entry.pack(pady=5)
+
+        def on_ok():
+            path, variable = path_entry.get().strip(), variable_entry.get().strip()
+            if not path and not variable:
+                messagebox.showwarning("Warning", "Enter a file path and/or a variable name")
+                return
+            new_data = {key: value for key, value in data.items() if key not in ("path", "variable")}
+            if path:
+                new_data["path"] = path
+            if variable:
+                new_data["variable"] = variable
+            details = ", ".join(part for part in (f"File: {path}" if path else "",
+                                                  f"Variable: {variable}" if variable else "") if part)
+            if action:
+                action.update({"details": details, "data": new_data})
+                self.update_action_list()
+            else:
+                self.add_action("Screenshot", details, new_data)
             dialog.destroy()
 
         def on_cancel():
@@ -1336,7 +1600,101 @@ class ScenarioCreator:
         buttons_frame = ttk.Frame(dialog)
         buttons_frame.pack(side=tk.BOTTOM, pady=15)
         ttk.Button(buttons_frame, text="OK", command=on_ok, width=10).pack(side=tk.LEFT, padx=10)
-        ttk.Button(buttons_frame, text="Cancel", command=on_cancel, width=10).pack(side=tk.LEFT, padx=10)        
+        ttk.Button(buttons_frame, text="Cancel", command=on_cancel, width=10).pack(side=tk.LEFT, padx=10)
+
+    def add_screenshot(self):
+        self._screenshot_dialog("Screenshot")
+
+    def edit_screenshot(self, index):
+        self._screenshot_dialog("Edit Screenshot", self.actions[index])
+
+    def add_wait_for_settle(self):
+        timeout = simpledialog.askfloat("Wait for Screen to Settle",
+                                        "Fail if the screen is still changing after (seconds):",
+                                        initialvalue=10, minvalue=0.1, maxvalue=300)
+        if timeout is not None:
+            self.add_action("Wait for Screen to Settle", f"Until stable, max {timeout} seconds", {"timeout": timeout})
+
+    def edit_wait_for_settle(self, index):
+        action = self.actions[index]
+        timeout = simpledialog.askfloat("Edit Wait for Screen to Settle",
+                                        "Fail if the screen is still changing after (seconds):",
+                                        initialvalue=action["data"].get("timeout", 10), minvalue=0.1, maxvalue=300)
+        if timeout is not None:
+            action["data"]["timeout"] = timeout
+            action["details"] = f"Until stable, max {timeout} seconds"
+
+    def _verify_region_dialog(self, title, action=None):
+        """Shared dialog for adding and editing a Verify Region step."""
+        data = action["data"] if action else {}
+        dialog = tk.Toplevel(self.master)
+        dialog.title(title)
+        dialog.geometry("450x380")
+        dialog.transient(self.master)
+        dialog.grab_set()
+
+        ttk.Label(dialog, text="Use Ctrl+Shift to select the top-left and bottom-right\ncorners of the region as it should look").pack(pady=10)
+
+        ttk.Label(dialog, text="Reference name:").pack(pady=5)
+        name_entry = ttk.Entry(dialog, width=40)
+        name_entry.insert(0, os.path.splitext(os.path.basename(data.get("reference", "")))[0])
+        name_entry.pack(pady=5)
+
+        on_mismatch_var = tk.StringVar(value=data.get("on_mismatch", "abort"))
+        ttk.Radiobutton(dialog, text="Stop the scenario on mismatch", variable=on_mismatch_var, value="abort").pack(anchor=tk.W, padx=20, pady=2)
+        ttk.Radiobutton(dialog, text="Continue and store the result in a variable", variable=on_mismatch_var, value="continue").pack(anchor=tk.W, padx=20, pady=2)
+
+        ttk.Label(dialog, text="Result variable (\"true\" on match, empty on mismatch; optional when stopping):").pack(pady=5)
+        variable_entry = ttk.Entry(dialog, width=40)
+        variable_entry.insert(0, data.get("result_variable", ""))
+        variable_entry.pack(pady=5)
+
+        close_dialog = self._image_capture_status(
+            dialog, f"Current reference: {data['reference']}" if action else "No region captured yet", "region")
+
+        def on_ok():
+            name = name_entry.get().strip()
+            variable = variable_entry.get().strip()
+            if not name:
+                messagebox.showwarning("Warning", "Reference name cannot be empty")
+                return
+            if on_mismatch_var.get() == "continue" and not variable:
+                messagebox.showwarning("Warning", "Enter a result variable to continue on mismatch")
+                return
+            saved = self._save_captured_image(name, data.get("reference"), "region", "reference")
+            if saved is None:
+                return
+            reference_path, captured = saved
+
+            new_data = {key: value for key, value in data.items() if key != "result_variable"}
+            if captured:
+                start, end = self.temp_coordinates["start"], self.temp_coordinates["end"]
+                new_data["position"] = {"x": min(start[0], end[0]), "y": min(start[1], end[1])}
+            new_data.update({"reference": reference_path, "on_mismatch": on_mismatch_var.get()})
+            if variable:
+                new_data["result_variable"] = variable
+            position = new_data.get("position") or {}
+            details = f"Reference: {reference_path} at ({position.get('x', '?')}, {position.get('y', '?')}), on mismatch: {on_mismatch_var.get()}"
+            if action:
+                action.update({"details": details, "data": new_data})
+                self.update_action_list()
+            else:
+                self.add_action("Verify Region", details, new_data)
+            close_dialog()
+
+        def on_cancel():
+            close_dialog()
+
+        buttons_frame = ttk.Frame(dialog)
+        buttons_frame.pack(side=tk.BOTTOM, pady=15)
+        ttk.Button(buttons_frame, text="OK", command=on_ok, width=10).pack(side=tk.LEFT, padx=10)
+        ttk.Button(buttons_frame, text="Cancel", command=on_cancel, width=10).pack(side=tk.LEFT, padx=10)
+
+    def add_verify_region(self):
+        self._verify_region_dialog("Verify Region")
+
+    def edit_verify_region(self, index):
+        self._verify_region_dialog("Edit Verify Region", self.actions[index])
 
 def main():
     root = tk.Tk()
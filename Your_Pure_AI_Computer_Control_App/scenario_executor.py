@@ -8,22 +8,34 @@ import threading
 import pyperclip
 import pyautogui
 import keyboard # Still potentially needed for wait('enter') etc. if used
-import re
-import importlib # <-- Add this import
 import pyttsx3
+from clipboard_watcher import create_clipboard_watcher, PollingClipboardWatcher
+from clipboard_service import get_clipboard_service, CLIPBOARD_TRIGGER_PREFIX
+from trigger_server import start_trigger_server
+from trigger_queue import TriggerQueue, QueueFullError
+from scenario_compiler import ScenarioCache
+from scenario_registry import ScenarioRegistry
+from action_registry import ActionRegistry
+from template_engine import compile_template
 
 # --- Configuration ---
 SCENARIO_DIR = "scenarios"
 ALLOWED_SCENARIOS_FILE = "allowed_scenarios.json"
 ACTIONS_CONFIG_FILE = "actions_config.json" # <-- New config file
 ACTIONS_DIR = "actions" # <-- Directory containing action modules
-CLIPBOARD_TRIGGER_PREFIX = "Execute_Computer_Command_Your_Pure_AI-"
-POLLING_INTERVAL_SECONDS = 1
+POLLING_INTERVAL_SECONDS = 1 # Used only when event-driven clipboard watching is unavailable
+CLIPBOARD_WATCH_RESYNC_SECONDS = 30 # Safety re-read interval for the event-driven watcher
+# Optional local trigger endpoint (replies with the run result), e.g.
+# "unix:/tmp/your_pure_ai_executor.sock" or "tcp:127.0.0.1:8765". None disables it.
+TRIGGER_SERVER_ADDRESS = None
+# Shared secret that "tcp:" triggers must send in a "token" field (required for TCP)
+TRIGGER_SERVER_TOKEN = None
+TRIGGER_QUEUE_MAX_DEPTH = 16 # Pending triggers beyond this are rejected
 
 # --- Global Variables ---
 last_clipboard_content = ""
-execution_lock = threading.Lock()
-actions_config = {} # <-- Store loaded action mappings
+execution_lock = threading.Lock() # Held by the queue worker while a scenario runs
+trigger_queue = TriggerQueue(TRIGGER_QUEUE_MAX_DEPTH)
 
 # --- Text-to-Speech Engine ---
 tts_engine = None
@@ -91,48 +103,35 @@ def load_allowed_scenarios():
 
 def load_actions_config():
     """Loads the action type to module mapping."""
-    global actions_config
-    try:
-        actions_config = load_config_file(ACTIONS_CONFIG_FILE, "Actions config")
-        print("Actions configuration loaded.")
-    except Exception:
-        # Error already displayed by load_config_file
-        actions_config = {} # Ensure it's an empty dict on error
-        print("Failed to load actions configuration. Executor may not function correctly.")
-        # Decide if you want to exit here or try to continue
-        # exit(1) # Or handle more gracefully
+    return load_config_file(ACTIONS_CONFIG_FILE, "Actions config")
+
+
+scenario_registry = ScenarioRegistry(ALLOWED_SCENARIOS_FILE, SCENARIO_DIR, load_allowed_scenarios)
+
 
+def get_scenario_details(requested_name, scenario_index=None):
+    """
+    Resolves a logical scenario name to its file path using the indexed allowed scenarios.
+    The existence of the file is checked when the scenario is loaded from the cache.
+    """
+    if scenario_index is None:
+        scenario_index = scenario_registry.current() # Re-reads the file only if it changed
+    return scenario_index.resolve(requested_name)
 
-def get_scenario_details(requested_name, allowed_scenarios):
-    # ... (keep this function as it is) ...
-    for scenario_info in allowed_scenarios:
-        if scenario_info.get("name") == requested_name:
-            if not scenario_info.get("allowed", False):
-                raise PermissionError(f"Scenario '{requested_name}' is not allowed.")
 
-            scenario_filename = scenario_info.get("alias") or requested_name
-            scenario_path = os.path.join(SCENARIO_DIR, f"{scenario_filename}.json")
+action_registry = ActionRegistry(ACTIONS_CONFIG_FILE, ACTIONS_DIR, load_actions_config)
+scenario_cache = ScenarioCache(action_registry.resolve)
 
-            if not os.path.exists(scenario_path):
-                 raise FileNotFoundError(f"Scenario file '{scenario_path}' not found (resolved from name/alias '{requested_name}').")
 
-            return scenario_path
-    raise ValueError(f"Scenario '{requested_name}' not found in '{ALLOWED_SCENARIOS_FILE}'.")
+def refresh_actions():
+    """Reloads the action registry if actions_config.json changed, invalidating compiled scenarios."""
+    if action_registry.reload_if_changed():
+        scenario_cache.clear()
 
 
 def load_scenario(scenario_path):
-    # ... (keep this function as it is) ...
-    try:
-        with open(scenario_path, 'r') as f:
-            scenario_data = json.load(f)
-            if "actions" not in scenario_data:
-                raise ValueError("Scenario file is missing the 'actions' list.")
-            return scenario_data["actions"]
-    except json.JSONDecodeError:
-        raise ValueError(f"Error decoding scenario file '{scenario_path}'.")
-    except Exception as e:
-        # Catch other potential issues like read errors
-        raise IOError(f"Could not read scenario file '{scenario_path}': {e}")
+    """Returns the compiled steps of a scenario (compiled and validated once, then cached)."""
+    return scenario_cache.get(scenario_path).steps
 
 
 # --- Overlay and Form Dialog Classes (Keep them here for now) ---
@@ -308,67 +307,38 @@ class ScenarioRunner:
         self.FormDialog = FormDialog
         self.tts_engine = tts_engine # Pass engine instance
         self.stop_execution_flag = threading.Event() # Flag for cancellation
+        self.step_results = [] # Per-step outcome and timing of the last run
 
-    def _substitute_variables(self, text):
-        # ... (keep this function as it is) ...
+    def _substitute_variables(self, text, prefix_filters=None):
+        """
+        Replaces ${variable} (optionally ${variable|filter}) placeholders with variable values.
+        Template strings are parsed once and cached, see template_engine.py.
+        """
         if not isinstance(text, str):
             return text # Only substitute in strings
+        return compile_template(text).render(self.variables, prefix_filters)
 
-        def replace_match(match):
-            var_name = match.group(1)
-            # Return the variable value as a string, or the original match if not found
-            return str(self.variables.get(var_name, match.group(0)))
-
-        pattern = re.compile(r'\$\{(\w+)\}')
-        return pattern.sub(replace_match, text)
-
-    def _run_action(self, action):
-        """Loads and executes a single action from its module."""
-        action_type = action.get("type")
-        data = action.get("data", {})
-        print(f"Attempting action: {action_type}")
+    def _run_action(self, step):
+        """Executes a single compiled step through its pre-resolved action callable."""
+        print(f"Attempting action: {step.type}")
 
         if self.stop_execution_flag.is_set():
             print("Execution cancelled.")
             return False # Stop processing further actions
 
-        module_name = actions_config.get(action_type)
-        if not module_name:
-            error_msg = f"Unknown action type '{action_type}'. Check scenario and actions_config.json."
-            print(f"Error: {error_msg}")
-            self.display_message("Scenario Error", error_msg, error=True, parent=self.root)
-            return False # Stop scenario on unknown action
-
         try:
-            # Construct the full module path (e.g., 'actions.left_mouse_click')
-            module_path = f"{ACTIONS_DIR}.{module_name}"
-            # Dynamically import the module
-            action_module = importlib.import_module(module_path)
-
-            # Get the 'execute' function from the module
-            if not hasattr(action_module, 'execute'):
-                 raise AttributeError(f"Module '{module_path}' does not have an 'execute' function.")
-
-            execute_func = getattr(action_module, 'execute')
-
+            # Arm the post-condition first, so it sees the state from before the action
+            predicate = step.post_condition.arm(self) if step.post_condition else None
             # Call the action's execute function, passing necessary context
             # The action's execute function should return True/False
-            success = execute_func(data, self.variables, self)
+            success = step.execute(step.data, self.variables, self)
+            if success and predicate is not None:
+                success = self._wait_for_post_condition(step, predicate)
             return success
 
-        except ModuleNotFoundError:
-            error_msg = f"Action module not found: '{module_path}.py'. Ensure file exists in '{ACTIONS_DIR}' and is listed correctly in actions_config.json."
-            print(f"Error: {error_msg}")
-            self.display_message("Scenario Error", error_msg, error=True, parent=self.root)
-            return False
-        except AttributeError as e: # Catch missing 'execute' function
-             error_msg = f"Error in action module '{module_path}': {e}"
-             print(f"Error: {error_msg}")
-             self.display_message("Scenario Error", error_msg, error=True, parent=self.root)
-             return False
         except Exception as e:
             # Catch errors *during* the execution of the action's code
-            error_message = f"Error executing action '{action_type}' (module: {module_name}): {e}"
+            error_message = f"Error executing action '{step.type}' (module: {step.module_name}): {e}"
             import traceback
             print(f"Error: {error_message}")
             traceback.print_exc() # Print full traceback for debugging
@@ -379,10 +349,40 @@ class ScenarioRunner:
                 print(f"Failed to display error message box: {display_e}")
             return False # Stop scenario on action error
 
-    def run(self):
-        """Runs all actions in the scenario."""
+    def _wait_for_post_condition(self, step, predicate):
+        """Waits for the step's 'wait_until' condition. Returns False if the scenario must stop."""
+        condition = step.post_condition
+        wait_start = time.perf_counter()
+        if condition.wait(predicate, self.stop_execution_flag):
+            print(f"Condition '{condition.name}' met after {(time.perf_counter() - wait_start) * 1000:.0f} ms.")
+            return True
+        if self.stop_execution_flag.is_set():
+            print("Execution cancelled while waiting for a condition.")
+            return False
+        if not condition.required:
+            print(f"Warning: Condition '{condition.name}' not met within {condition.timeout} s. Continuing.")
+            return True
+        error_message = f"Step '{step.type}': condition '{condition.name}' was not met within {condition.timeout} s."
+        print(f"Error: {error_message}")
+        self.display_message("Scenario Execution Error", error_message, error=True, parent=self.root)
+        return False
+
+    def load(self, actions, initial_variables):
+        """Prepares the runner for another scenario, reusing its hidden root window (batch triggers)."""
+        self.actions = actions
+        self.variables = initial_variables if initial_variables else {}
+
+    def run(self, close=True):
+        """
+        Runs all actions in the scenario.
+
+        Args:
+            close (bool): Destroy the hidden root window afterwards. Batch runs pass False
+                          and call close() once after the last scenario.
+        """
         print("--- Starting Scenario Execution ---")
         self.stop_execution_flag.clear() # Reset cancellation flag for this run
+        self.step_results = []
 
         success = True
         for i, action in enumerate(self.actions):
@@ -391,7 +391,15 @@ class ScenarioRunner:
                 print("--- Scenario Execution Cancelled Mid-Run ---")
                 success = False
                 break
-            if not self._run_action(action):
+            step_start = time.perf_counter()
+            step_success = self._run_action(action)
+            self.step_results.append({
+                "step": i + 1,
+                "type": action.type,
+                "success": bool(step_success),
+                "duration_ms": round((time.perf_counter() - step_start) * 1000, 3)
+            })
+            if not step_success:
                 print(f"--- Scenario Execution Stopped After Step {i+1} Due to Failure or Cancellation ---")
                 success = False
                 break # Stop if an action returns False
@@ -399,7 +407,14 @@ class ScenarioRunner:
         if success and not self.stop_execution_flag.is_set():
             print("\n--- Scenario Execution Finished Successfully ---")
 
-        # Clean up the hidden root window
+        if close:
+            self.close()
+
+        print("------------------------------------")
+        return success # Return overall success/failure
+
+    def close(self):
+        """Cleans up the hidden root window."""
         try:
             # Check if root exists and is valid before destroying
             if self.root and self.root.winfo_exists():
@@ -410,94 +425,207 @@ class ScenarioRunner:
         except Exception as e:
             print(f"Unexpected error during Tkinter cleanup: {e}")
 
-        print("------------------------------------")
-        return success # Return overall success/failure
+
+# --- Trigger Execution ---
+def parse_invocation(invocation):
+    """Validates one {"actionName", "dataForExecution"} object. Returns (action_name, initial_vars)."""
+    if not isinstance(invocation, dict):
+        raise ValueError("Each invocation must be a JSON object.")
+    action_name = invocation.get("actionName")
+    initial_vars = invocation.get("dataForExecution")
+
+    if not action_name:
+        raise ValueError("Missing 'actionName' in trigger JSON.")
+    if initial_vars and not isinstance(initial_vars, dict):
+         raise ValueError("'dataForExecution' must be a dictionary (JSON object).")
+    return action_name, initial_vars
+
+
+def run_trigger(command_data):
+    """
+    Runs the scenario requested by a trigger payload.
+
+    Args:
+        command_data (dict): Parsed trigger JSON with 'actionName' and optional 'dataForExecution',
+                             or a 'batch' list of such invocations (see run_batch()).
+
+    Returns:
+        dict: 'actionName', 'success', final 'variables' and per-step 'steps' timings
+              (for batches: overall 'success' and per-invocation 'results').
+
+    Raises:
+        PermissionError, FileNotFoundError, ValueError, IOError: If the scenario can't be set up.
+    """
+    if not isinstance(command_data, dict):
+        raise ValueError("Trigger JSON must be an object.")
+    if "batch" in command_data:
+        return run_batch(command_data)
+
+    action_name, initial_vars = parse_invocation(command_data)
+    refresh_actions()
+
+    scenario_path = get_scenario_details(action_name)
+    scenario_actions = load_scenario(scenario_path)
+
+    # Create runner and run the scenario
+    runner = ScenarioRunner(scenario_actions, initial_vars)
+    success = runner.run() # This blocks the calling thread
+
+    return {
+        "actionName": action_name,
+        "success": success,
+        "variables": runner.variables,
+        "steps": runner.step_results
+    }
+
+
+def run_batch(command_data):
+    """
+    Runs several scenario invocations from one trigger, sequentially and with a single
+    runner (one hidden root window) and a single read of the allowed scenarios.
+
+    Args:
+        command_data (dict): {"batch": [{"actionName", "dataForExecution"}, ...], "continueOnError": bool}
+
+    Returns:
+        dict: Overall 'success' and one result dict per executed invocation in 'results'.
+    """
+    invocations = command_data.get("batch")
+    if not isinstance(invocations, list) or not invocations:
+        raise ValueError("'batch' must be a non-empty list of invocations.")
+    continue_on_error = bool(command_data.get("continueOnError", False))
+
+    # Validate every invocation up front so a malformed entry fails before anything runs
+    parsed_invocations = [parse_invocation(invocation) for invocation in invocations]
+    scenario_index = scenario_registry.current() # One consistent view for the whole batch
+    refresh_actions()
+
+    results = []
+    runner = ScenarioRunner([], None)
+    try:
+        for index, (action_name, initial_vars) in enumerate(parsed_invocations):
+            print(f"\n=== Batch invocation {index+1}/{len(parsed_invocations)}: '{action_name}' ===")
+            try:
+                scenario_path = get_scenario_details(action_name, scenario_index)
+                scenario_actions = load_scenario(scenario_path)
+            except (PermissionError, FileNotFoundError, ValueError, IOError) as e:
+                print(f"Error processing batch invocation '{action_name}': {e}")
+                results.append({"actionName": action_name, "success": False, "error": str(e)})
+            else:
+                runner.load(scenario_actions, initial_vars)
+                success = runner.run(close=False)
+                results.append({
+                    "actionName": action_name,
+                    "success": success,
+                    "variables": runner.variables,
+                    "steps": runner.step_results
+                })
+
+            if not results[-1]["success"] and not continue_on_error:
+                print("Batch stopped after failed invocation ('continueOnError' is not set).")
+                break
+    finally:
+        runner.close()
+
+    return {
+        "success": len(results) == len(parsed_invocations) and all(r["success"] for r in results),
+        "results": results
+    }
+
+
+def execute_trigger_request(request):
+    """
+    Runs one queued trigger and returns its result dict.
+    Errors of clipboard triggers are shown to the user (there's no one to reply to);
+    errors of server triggers are only returned in the result.
+    """
+    try:
+        return run_trigger(request.command_data)
+
+    except (PermissionError, FileNotFoundError, ValueError, IOError, RuntimeError) as e:
+        print(f"Error processing command: {e}")
+        if request.source == "clipboard":
+            display_message("Scenario Error", str(e), error=True)
+        return {"success": False, "error": str(e)}
+    except Exception as e:
+        error_msg = f"An unexpected error occurred during execution setup: {e}"
+        import traceback
+        print(error_msg)
+        traceback.print_exc()
+        if request.source == "clipboard":
+            display_message("Critical Error", error_msg, error=True)
+        return {"success": False, "error": error_msg}
+
+
+def process_trigger_queue():
+    """Worker thread: executes queued triggers one after another."""
+    while True:
+        request = trigger_queue.get()
+        with execution_lock:
+            print(f"Executing queued trigger ({len(trigger_queue)} more pending).")
+            result = execute_trigger_request(request)
+        request.set_result(result)
+
+
+def report_rejected_trigger(message):
+    """
+    Logs a rejected clipboard trigger. No dialog: Tk may only be used from the thread that
+    created it, and a modal message box would block the monitor.
+    """
+    print(f"Trigger rejected: {message}")
+
+
+def handle_server_trigger(command_data):
+    """
+    Queues a trigger received by the trigger server and waits for its result.
+    A full queue is reported back to the caller immediately.
+    """
+    try:
+        request, queued = trigger_queue.put(command_data, source="server")
+    except (QueueFullError, ValueError) as e:
+        return {"success": False, "error": str(e)}
+    if not queued:
+        print("Identical trigger already pending. Waiting for its result.")
+    return request.wait()
 
 
 # --- Clipboard Monitoring ---
 def monitor_clipboard():
-    """Monitors clipboard for trigger phrase and executes scenarios."""
+    """Monitors clipboard for trigger phrase and queues the triggers for execution."""
     global last_clipboard_content
+    watcher = create_clipboard_watcher(POLLING_INTERVAL_SECONDS)
+    clipboard = get_clipboard_service() # Persistent, no xclip/xsel process per read on Linux
     print("Clipboard monitor started. Waiting for trigger...")
 
     while True:
         try:
-            # Use execution lock to prevent processing while a scenario is running
-            if not execution_lock.locked():
-                current_clipboard_content = pyperclip.paste()
-
-                if current_clipboard_content != last_clipboard_content and \
-                   current_clipboard_content and \
-                   current_clipboard_content.startswith(CLIPBOARD_TRIGGER_PREFIX):
-
-                    print(f"\nTrigger detected in clipboard!")
-                    command_json_str = current_clipboard_content[len(CLIPBOARD_TRIGGER_PREFIX):]
-                    # Update last content *immediately* after detecting trigger to prevent re-triggering
-                    last_clipboard_content = current_clipboard_content
-
-                    # Acquire lock before starting execution
-                    # Use a timeout to prevent waiting forever if something goes wrong
-                    if execution_lock.acquire(blocking=True, timeout=1):
-                        print("Execution lock acquired.")
-                        # --- Execution Thread ---
-                        # Define a target function for the thread
-                        def execution_target(json_str):
-                            try:
-                                command_data = json.loads(json_str)
-                                action_name = command_data.get("actionName")
-                                initial_vars = command_data.get("dataForExecution")
-
-                                if not action_name:
-                                    raise ValueError("Missing 'actionName' in clipboard JSON.")
-                                if initial_vars and not isinstance(initial_vars, dict):
-                                     raise ValueError("'dataForExecution' must be a dictionary (JSON object).")
-
-                                allowed_scenarios = load_allowed_scenarios() # Reload allowed list each time
-
-                                scenario_path = get_scenario_details(action_name, allowed_scenarios)
-                                scenario_actions = load_scenario(scenario_path)
-
-                                # Create runner and run the scenario
-                                runner = ScenarioRunner(scenario_actions, initial_vars)
-                                runner.run() # This blocks the execution thread
-
-                            except (PermissionError, FileNotFoundError, ValueError, IOError, RuntimeError, json.JSONDecodeError) as e:
-                                print(f"Error processing command: {e}")
-                                # Display error in the main thread if possible, or just log
-                                display_message("Scenario Error", str(e), error=True)
-                            except Exception as e:
-                                error_msg = f"An unexpected error occurred during execution setup: {e}"
-                                import traceback
-                                print(error_msg)
-                                traceback.print_exc()
-                                display_message("Critical Error", error_msg, error=True)
-                            finally:
-                                # VERY IMPORTANT: Release the lock from the execution thread
-                                if execution_lock.locked():
-                                    execution_lock.release()
-                                    print("Execution finished, lock released.")
-                                else:
-                                    # This shouldn't happen if acquired correctly, but log if it does
-                                    print("Warning: Tried to release lock, but it wasn't held by this thread.")
-
-                        # Start execution in a separate thread
-                        exec_thread = threading.Thread(target=execution_target, args=(command_json_str,))
-                        exec_thread.start()
-                        # The monitor loop continues almost immediately
-
+            # Keep reading while a scenario runs - new triggers are queued, not dropped
+            current_clipboard_content = clipboard.paste()
+
+            if current_clipboard_content != last_clipboard_content and \
+               current_clipboard_content and \
+               current_clipboard_content.startswith(CLIPBOARD_TRIGGER_PREFIX):
+
+                print(f"\nTrigger detected in clipboard!")
+                command_json_str = current_clipboard_content[len(CLIPBOARD_TRIGGER_PREFIX):]
+                # Update last content *immediately* after detecting trigger to prevent re-triggering
+                last_clipboard_content = current_clipboard_content
+
+                try:
+                    command_data = json.loads(command_json_str)
+                    _, queued = trigger_queue.put(command_data, source="clipboard")
+                    if queued:
+                        print(f"Trigger queued ({len(trigger_queue)} pending).")
                     else:
-                        # Failed to acquire lock (should be rare with blocking=True unless timeout occurs)
-                        print("Failed to acquire execution lock (timeout or already locked by unexpected thread?). Skipping trigger.")
-                        # Reset clipboard content to potentially allow re-triggering later if needed
-                        last_clipboard_content = ""
-
+                        print("Identical trigger already pending. Ignoring duplicate.")
+                except json.JSONDecodeError as e:
+                    report_rejected_trigger(f"Error decoding trigger JSON: {e}")
+                except (QueueFullError, ValueError) as e:
+                    report_rejected_trigger(str(e))
 
-                # Update last content if it changed but wasn't a trigger
-                elif current_clipboard_content != last_clipboard_content:
-                    last_clipboard_content = current_clipboard_content
-
-            # Brief pause even if lock is held, prevents tight loop
-            time.sleep(0.1)
+            # Update last content if it changed but wasn't a trigger
+            elif current_clipboard_content != last_clipboard_content:
+                last_clipboard_content = current_clipboard_content
 
         except pyperclip.PyperclipException as e:
              print(f"Clipboard access error: {e}. Retrying...")
@@ -508,8 +636,13 @@ def monitor_clipboard():
             traceback.print_exc()
             time.sleep(POLLING_INTERVAL_SECONDS * 2)
 
-        # Wait before the next check
-        time.sleep(POLLING_INTERVAL_SECONDS)
+        # Wait for the next clipboard change (event-driven) or polling interval (fallback)
+        try:
+            watcher.wait_for_change(timeout=CLIPBOARD_WATCH_RESYNC_SECONDS)
+        except Exception as e:
+            print(f"Clipboard watcher '{watcher.name}' failed: {e}. Falling back to polling.")
+            watcher.close()
+            watcher = PollingClipboardWatcher(POLLING_INTERVAL_SECONDS)
 
 
 # --- Main Execution ---
@@ -553,7 +686,12 @@ if __name__ == "__main__":
              "Select All": "select_all",
              "Press Key": "press_key",
              "Info Message": "info_message",
-             "Show Form": "show_form"
+             "Show Form": "show_form",
+             "Execute Command": "execute_command",
+             "Click Image": "click_image",
+             "Screenshot": "screenshot",
+             "Wait for Screen to Settle": "wait_for_screen_to_settle",
+             "Verify Region": "verify_region"
          }
     }
     for filepath, default_content in default_files.items():
@@ -571,8 +709,8 @@ if __name__ == "__main__":
 
     # --- Load Initial Configs ---
     try:
-        load_actions_config() # Load action mappings into global 'actions_config'
-        _ = load_allowed_scenarios() # Load allowed scenarios once initially to check file
+        action_registry.load() # Resolve every action module once; fails fast on missing modules
+        scenario_registry.current() # Load and index allowed scenarios once initially to check file
         print("Initial configuration loaded successfully.")
     except Exception as e:
         print(f"Failed during initial configuration loading: {e}. Exiting.")
@@ -580,11 +718,23 @@ if __name__ == "__main__":
 
 
     # --- Start Monitoring ---
+    worker_thread = threading.Thread(target=process_trigger_queue, daemon=True)
+    worker_thread.start()
+
     monitor_thread = threading.Thread(target=monitor_clipboard, daemon=True)
     monitor_thread.start()
 
+    trigger_server = None
+    if TRIGGER_SERVER_ADDRESS:
+        try:
+            trigger_server = start_trigger_server(TRIGGER_SERVER_ADDRESS, handle_server_trigger,
+                                                  TRIGGER_SERVER_TOKEN)
+            print(f"Trigger server listening on '{TRIGGER_SERVER_ADDRESS}'.")
+        except (OSError, ValueError) as e:
+            print(f"Error starting trigger server on '{TRIGGER_SERVER_ADDRESS}': {e}. Continuing with clipboard triggers only.")
+
     print("\nScenario Executor is running in the background.")
-    print(f"Monitoring clipboard every {POLLING_INTERVAL_SECONDS} second(s).")
+    print(f"Watching clipboard for changes (X11 events where available, otherwise polling every {POLLING_INTERVAL_SECONDS} second(s)).")
     print(f"Trigger: Copy text starting with '{CLIPBOARD_TRIGGER_PREFIX}' followed by JSON.")
     print("Press Ctrl+C in the console to stop the executor.")
 
@@ -599,4 +749,8 @@ if __name__ == "__main__":
     except Exception as e:
         print(f"Main loop exited unexpectedly: {e}")
 
+    if trigger_server:
+        trigger_server.shutdown()
+        trigger_server.server_close()
+
     print("Scenario Executor stopped.")
\ No newline at end of file
@@ -0,0 +1,87 @@
+# scenario_registry.py
+# Indexed view of allowed_scenarios.json.
+#
+# Instead of re-reading the file and scanning the list on every trigger, the registry keeps
+# a name -> (allowed, resolved path) dictionary. The file is only parsed again when its
+# modification time or size changes; the new index is built completely and then swapped
+# in with a single assignment, so concurrent lookups always see either the old or the new
+# index, never a half-built one.
+import os
+import threading
+
+
+class ScenarioIndex:
+    """Immutable snapshot of allowed_scenarios.json."""
+
+    __slots__ = ("entries", "config_path")
+
+    def __init__(self, allowed_scenarios, scenario_dir, config_path):
+        if not isinstance(allowed_scenarios, list):
+            raise ValueError(f"'{config_path}' must contain a JSON list of scenarios.")
+        self.config_path = config_path
+        self.entries = {}
+        for scenario_info in allowed_scenarios:
+            if not isinstance(scenario_info, dict):
+                continue
+            name = scenario_info.get("name")
+            if name is None or name in self.entries:
+                continue  # The first entry for a name wins, as with the original linear scan
+            scenario_filename = scenario_info.get("alias") or name
+            self.entries[name] = (bool(scenario_info.get("allowed", False)),
+                                  os.path.join(scenario_dir, f"{scenario_filename}.json"))
+
+    def resolve(self, requested_name):
+        """
+        Returns the scenario file path for a logical scenario name.
+
+        Raises:
+            PermissionError: If the scenario is listed but not allowed.
+            ValueError: If the scenario is not listed.
+        """
+        entry = self.entries.get(requested_name)
+        if entry is None:
+            raise ValueError(f"Scenario '{requested_name}' not found in '{self.config_path}'.")
+        allowed, scenario_path = entry
+        if not allowed:
+            raise PermissionError(f"Scenario '{requested_name}' is not allowed.")
+        return scenario_path
+
+
+class ScenarioRegistry:
+    def __init__(self, config_path, scenario_dir, load_config):
+        """
+        Args:
+            config_path (str): Path of allowed_scenarios.json.
+            scenario_dir (str): Directory holding the scenario files.
+            load_config (callable): Reads and returns the parsed config file (raises on errors).
+        """
+        self.config_path = config_path
+        self.scenario_dir = scenario_dir
+        self.load_config = load_config
+        self._index = None
+        self._signature = None
+        self._reload_lock = threading.Lock()
+
+    def _config_signature(self):
+        try:
+            stat = os.stat(self.config_path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            return None  # Let load_config report the missing file
+
+    def current(self):
+        """Returns the current ScenarioIndex, reloading the file first if it has changed."""
+        signature = self._config_signature()
+        index = self._index
+        if index is not None and signature is not None and signature == self._signature:
+            return index
+
+        with self._reload_lock:
+            # Checked again under the lock: the stored signature must describe the loaded file
+            signature = self._config_signature()
+            if self._index is not None and signature is not None and signature == self._signature:
+                return self._index  # Another thread reloaded it meanwhile
+            new_index = ScenarioIndex(self.load_config(), self.scenario_dir, self.config_path)
+            self._index, self._signature = new_index, signature
+            print(f"Allowed scenarios loaded ({len(new_index.entries)} entries).")
+            return new_index
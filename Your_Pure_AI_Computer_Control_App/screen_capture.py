@@ -0,0 +1,299 @@
+# screen_capture.py
+# Screen capture shared by the image actions, wait conditions and the Screenshot action.
+#
+# On Linux/X11 the screen is read with the MIT-SHM extension (XShmGetImage): the X server
+# writes the pixels straight into a shared memory segment that is mapped as a NumPy array,
+# so a capture costs one round trip and no copies. Segments are kept per capture size and
+# reused. The libX11/libXext calls are made through ctypes, no extra package is needed.
+# Everywhere else (or if MIT-SHM is unavailable) pyautogui.screenshot() is used.
+#
+# grab() returns an H x W x 3 RGB array whose top left pixel is the requested corner; a
+# region that doesn't lie completely on the screen is rejected. With MIT-SHM the array is a
+# view into the shared buffer and is overwritten by the next capture of the same size - the
+# caller must copy it to keep it.
+import ctypes
+import ctypes.util
+import os
+import platform
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+import numpy as np
+
+SHM_BUFFER_CACHE_SIZE = 4  # Shared memory segments kept for different capture sizes
+
+_Z_PIXMAP = 2
+_ALL_PLANES = ctypes.c_ulong(-1).value
+_IPC_PRIVATE = 0
+_IPC_CREAT = 0o1000
+_IPC_RMID = 0
+_SHMAT_FAILED = ctypes.c_void_p(-1).value
+
+_capturer = None
+_capturer_lock = threading.Lock()
+
+
+def check_region(region, screen_width, screen_height):
+    """
+    Returns 'region' (x, y, width, height), or the whole screen for None.
+    Raises ValueError if the region doesn't lie completely on the screen - a clipped capture
+    would no longer start at the requested corner.
+    """
+    if region is None:
+        return 0, 0, screen_width, screen_height
+    x, y, width, height = region
+    if x < 0 or y < 0 or width <= 0 or height <= 0 or x + width > screen_width or y + height > screen_height:
+        raise ValueError(f"Capture region {tuple(region)} is not on the {screen_width}x{screen_height} screen.")
+    return x, y, width, height
+
+
+class _XImage(ctypes.Structure):
+    # Leading fields of Xlib's XImage (the function table that follows is not needed)
+    _fields_ = [
+        ("width", ctypes.c_int), ("height", ctypes.c_int), ("xoffset", ctypes.c_int),
+        ("format", ctypes.c_int), ("data", ctypes.c_void_p), ("byte_order", ctypes.c_int),
+        ("bitmap_unit", ctypes.c_int), ("bitmap_bit_order", ctypes.c_int), ("bitmap_pad", ctypes.c_int),
+        ("depth", ctypes.c_int), ("bytes_per_line", ctypes.c_int), ("bits_per_pixel", ctypes.c_int),
+        ("red_mask", ctypes.c_ulong), ("green_mask", ctypes.c_ulong), ("blue_mask", ctypes.c_ulong),
+    ]
+
+
+class _XShmSegmentInfo(ctypes.Structure):
+    _fields_ = [("shmseg", ctypes.c_ulong), ("shmid", ctypes.c_int),
+                ("shmaddr", ctypes.c_void_p), ("readOnly", ctypes.c_int)]
+
+
+_X_ERROR_HANDLER = ctypes.CFUNCTYPE(ctypes.c_int, ctypes.c_void_p, ctypes.c_void_p)
+
+
+class _ShmBuffer:
+    """One shared memory XImage and the NumPy view of its pixels."""
+
+    def __init__(self, capturer, width, height):
+        x11, xext, libc = capturer.x11, capturer.xext, capturer.libc
+        self.capturer = capturer
+        self.info = _XShmSegmentInfo()
+        self.image = xext.XShmCreateImage(capturer.display, capturer.visual, capturer.depth, _Z_PIXMAP,
+                                          None, ctypes.byref(self.info), width, height)
+        if not self.image:
+            raise RuntimeError("XShmCreateImage failed.")
+        image = self.image.contents
+        if image.bits_per_pixel != 32:
+            x11.XDestroyImage(self.image)
+            raise RuntimeError(f"Unsupported pixel format ({image.bits_per_pixel} bits per pixel).")
+
+        size = image.bytes_per_line * height
+        self.info.shmid = libc.shmget(_IPC_PRIVATE, size, _IPC_CREAT | 0o600)
+        if self.info.shmid < 0:
+            x11.XDestroyImage(self.image)
+            raise RuntimeError("shmget failed.")
+        self.info.shmaddr = libc.shmat(self.info.shmid, None, 0)
+        if self.info.shmaddr in (None, _SHMAT_FAILED):
+            libc.shmctl(self.info.shmid, _IPC_RMID, None)
+            x11.XDestroyImage(self.image)
+            raise RuntimeError(f"shmat failed: {os.strerror(ctypes.get_errno())}.")
+        self.info.readOnly = 0
+        image.data = self.info.shmaddr
+        with capturer.trap_errors() as errors:
+            attached = xext.XShmAttach(capturer.display, ctypes.byref(self.info))
+        # Marked for removal now; the segment disappears once both sides have detached
+        libc.shmctl(self.info.shmid, _IPC_RMID, None)
+        if not attached or errors:
+            self._release(detach=False)
+            raise RuntimeError("XShmAttach failed (X server on another host?).")
+
+        raw = (ctypes.c_ubyte * size).from_address(self.info.shmaddr)
+        pixels = np.ctypeslib.as_array(raw).reshape(height, image.bytes_per_line // 4, 4)
+        # Pixels are stored B, G, R, X - reverse the first three channels (still a view)
+        self.rgb = pixels[:, :width, 2::-1]
+
+    def _release(self, detach=True):
+        x11, xext, libc = self.capturer.x11, self.capturer.xext, self.capturer.libc
+        if detach:
+            xext.XShmDetach(self.capturer.display, ctypes.byref(self.info))
+            x11.XSync(self.capturer.display, 0)
+        self.image.contents.data = None  # Not malloc'ed - XDestroyImage must not free it
+        x11.XDestroyImage(self.image)
+        libc.shmdt(ctypes.c_void_p(self.info.shmaddr))
+
+    def close(self):
+        self._release()
+
+
+class ShmScreenCapture:
+    """MIT-SHM capture of the X11 root window."""
+
+    name = "mit-shm"
+
+    def __init__(self):
+        self.x11 = ctypes.CDLL(ctypes.util.find_library("X11") or "libX11.so.6")
+        self.xext = ctypes.CDLL(ctypes.util.find_library("Xext") or "libXext.so.6")
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._declare_functions()
+
+        self.display = self.x11.XOpenDisplay(None)
+        if not self.display:
+            raise RuntimeError("Cannot open the X display.")
+        if not self.xext.XShmQueryExtension(self.display):
+            self.x11.XCloseDisplay(self.display)
+            raise RuntimeError("X server does not support MIT-SHM.")
+
+        self._errors = []
+        self._previous_handler = None
+        self._error_handler = _X_ERROR_HANDLER(self._on_x_error)
+
+        screen = self.x11.XDefaultScreen(self.display)
+        self.root = self.x11.XRootWindow(self.display, screen)
+        self.visual = self.x11.XDefaultVisual(self.display, screen)
+        self.depth = self.x11.XDefaultDepth(self.display, screen)
+        self.width = self.x11.XDisplayWidth(self.display, screen)
+        self.height = self.x11.XDisplayHeight(self.display, screen)
+        self._buffers = OrderedDict()  # (width, height) -> _ShmBuffer
+        self._lock = threading.Lock()
+
+    def _declare_functions(self):
+        x11, xext, libc = self.x11, self.xext, self.libc
+        x11.XOpenDisplay.restype = ctypes.c_void_p
+        x11.XOpenDisplay.argtypes = [ctypes.c_char_p]
+        for name in ("XDefaultScreen", "XCloseDisplay"):
+            getattr(x11, name).argtypes = [ctypes.c_void_p]
+        for name, restype in (("XRootWindow", ctypes.c_ulong), ("XDefaultVisual", ctypes.c_void_p),
+                              ("XDefaultDepth", ctypes.c_int), ("XDisplayWidth", ctypes.c_int),
+                              ("XDisplayHeight", ctypes.c_int)):
+            getattr(x11, name).restype = restype
+            getattr(x11, name).argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XSync.argtypes = [ctypes.c_void_p, ctypes.c_int]
+        x11.XDestroyImage.argtypes = [ctypes.POINTER(_XImage)]
+        x11.XSetErrorHandler.argtypes = [_X_ERROR_HANDLER]
+        x11.XSetErrorHandler.restype = ctypes.c_void_p
+
+        xext.XShmQueryExtension.argtypes = [ctypes.c_void_p]
+        xext.XShmCreateImage.restype = ctypes.POINTER(_XImage)
+        xext.XShmCreateImage.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_int,
+                                         ctypes.c_char_p, ctypes.POINTER(_XShmSegmentInfo),
+                                         ctypes.c_uint, ctypes.c_uint]
+        xext.XShmAttach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmDetach.argtypes = [ctypes.c_void_p, ctypes.POINTER(_XShmSegmentInfo)]
+        xext.XShmGetImage.argtypes = [ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(_XImage),
+                                      ctypes.c_int, ctypes.c_int, ctypes.c_ulong]
+
+        libc.shmget.argtypes = [ctypes.c_int, ctypes.c_size_t, ctypes.c_int]
+        libc.shmat.restype = ctypes.c_void_p
+        libc.shmat.argtypes = [ctypes.c_int, ctypes.c_void_p, ctypes.c_int]
+        libc.shmdt.argtypes = [ctypes.c_void_p]
+        libc.shmctl.argtypes = [ctypes.c_int, ctypes.c_int, ctypes.c_void_p]
+
+    def _on_x_error(self, display, event):
+        if display == self.display:
+            self._errors.append(event)
+        elif self._previous_handler:
+            # Error of another connection in this process (e.g. Tk) - pass it on
+            return _X_ERROR_HANDLER(self._previous_handler)(display, event)
+        return 0
+
+    @contextmanager
+    def trap_errors(self):
+        """
+        Collects X errors of the calls made in the block (yields the list). Xlib's default
+        handler would exit the process; the handler is global, so it is only swapped in briefly.
+        """
+        self._errors = []
+        self._previous_handler = self.x11.XSetErrorHandler(self._error_handler)
+        try:
+            yield self._errors
+        finally:
+            self.x11.XSync(self.display, 0)
+            self.x11.XSetErrorHandler(ctypes.cast(self._previous_handler, _X_ERROR_HANDLER))
+
+    def _buffer(self, width, height):
+        key = (width, height)
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = _ShmBuffer(self, width, height)
+            self._buffers[key] = buffer
+            while len(self._buffers) > SHM_BUFFER_CACHE_SIZE:
+                self._buffers.popitem(last=False)[1].close()
+        self._buffers.move_to_end(key)
+        return buffer
+
+    def grab(self, region=None):
+        x, y, width, height = check_region(region, self.width, self.height)
+        with self._lock:
+            buffer = self._buffer(width, height)
+            with self.trap_errors() as errors:
+                captured = self.xext.XShmGetImage(self.display, self.root, buffer.image, x, y, _ALL_PLANES)
+            if not captured or errors:
+                raise RuntimeError("XShmGetImage failed.")
+            return buffer.rgb
+
+    def close(self):
+        with self._lock:
+            for buffer in self._buffers.values():
+                buffer.close()
+            self._buffers.clear()
+            self.x11.XCloseDisplay(self.display)
+
+
+class PyAutoGUIScreenCapture:
+    name = "pyautogui"
+
+    def grab(self, region=None):
+        import pyautogui
+        if region is not None:
+            region = check_region(region, *pyautogui.size())
+        # RGBA on macOS - always hand out 3 channels
+        return np.asarray(pyautogui.screenshot(region=region).convert("RGB"))
+
+    def close(self):
+        pass
+
+
+def get_screen_capture():
+    """
+    Returns the capture backend of this process, creating it on first use.
+    Uses MIT-SHM on Linux/X11 when available.
+    """
+    global _capturer
+    with _capturer_lock:
+        if _capturer is None:
+            if platform.system() == "Linux" and os.environ.get("DISPLAY"):
+                try:
+                    _capturer = ShmScreenCapture()
+                except Exception as e:
+                    print(f"Warning: MIT-SHM screen capture unavailable: {e}. Using pyautogui.")
+            if _capturer is None:
+                _capturer = PyAutoGUIScreenCapture()
+        return _capturer
+
+
+def grab(region=None):
+    """
+    Captures the screen or 'region' (x, y, width, height).
+    Raises ValueError if the region is not completely on the screen.
+
+    Returns:
+        np.ndarray: H x W x 3 RGB array starting at the region's corner. It may be a view
+                    that the next capture of the same size overwrites - copy() it to keep it.
+    """
+    return get_screen_capture().grab(region)
+
+
+def grab_image(region=None):
+    """Captures the screen or 'region' as a PIL image (an independent copy)."""
+    from PIL import Image
+    return Image.fromarray(np.ascontiguousarray(grab(region)))
+
+
+if __name__ == "__main__":
+    import time
+
+    capture = get_screen_capture()
+    print(f"Backend: {capture.name}")
+    for label, region in (("full screen", None), ("400x300 region", (100, 100, 400, 300))):
+        grab(region)  # Allocates the buffer
+        runs = []
+        for _ in range(20):
+            start = time.perf_counter()
+            frame = grab(region)
+            runs.append(time.perf_counter() - start)
+        print(f"{label:15s} {frame.shape[1]}x{frame.shape[0]}: {min(runs) * 1000:6.2f} ms per capture")
@@ -0,0 +1,252 @@
+# shell_sessions.py
+# Pool of long-lived shell processes for Execute Command steps with "reuse_session": true.
+#
+# Starting a shell per step costs a process launch each time (hundreds of milliseconds for
+# PowerShell). A session keeps one shell running that reads commands from its stdin. Each
+# command is wrapped so that, when it is done, the shell prints a line with a random
+# per-session sentinel and the exit status to stdout and the sentinel alone to stderr. The
+# result is complete once both sentinels have been read.
+#
+# bash/sh run every command in a subshell: 'cd', variables and 'exit' don't leak into the next
+# step, just like with a fresh process. If a command ends the shell anyway (e.g. 'exit' in
+# PowerShell), the shell's exit code is the result and the session is replaced.
+#
+# Sessions are recycled after MAX_COMMANDS_PER_SESSION commands. They are also recycled on a
+# timeout or cancellation, when the whole process group is killed. A session that was idle
+# for HEALTH_CHECK_IDLE_SECONDS must answer an empty command before it is reused.
+import atexit
+import base64
+import queue
+import subprocess
+import threading
+import time
+import uuid
+from collections import deque
+from command_runner import (CommandResult, IS_WINDOWS, MAX_LINE_CHARS, OUTPUT_TAIL_LINES,
+                            STOP_POLL_SECONDS, _startupinfo, terminate_process_tree)
+
+# command_type -> arguments of a shell that reads commands from stdin
+SESSION_SHELLS = {
+    "bash": ["bash", "-s"],
+    "sh": ["sh", "-s"],
+    "powershell": ["powershell" if IS_WINDOWS else "pwsh",
+                   "-NoProfile", "-NonInteractive", "-ExecutionPolicy", "Bypass", "-Command", "-"],
+}
+
+MAX_COMMANDS_PER_SESSION = 100
+MAX_IDLE_SESSIONS_PER_SHELL = 4
+HEALTH_CHECK_IDLE_SECONDS = 60.0
+HEALTH_CHECK_TIMEOUT_SECONDS = 5.0
+
+_idle_sessions = {}  # command_type -> [ShellSession]
+_pool_lock = threading.Lock()
+
+
+def _posix_wrapper(commands, sentinel):
+    # The command text is passed through a quoted here-document (no expansion, the random
+    # sentinel can't occur in it) and evaluated in a subshell with stdin detached from the
+    # session's command stream. The leading '\n' ends a last output line that has no newline.
+    return (f"__ypai_cmd=$(cat <<'{sentinel}'\n{commands}\n{sentinel}\n)\n"
+            "( eval \"$__ypai_cmd\" ) </dev/null\n"
+            f"printf '\\n%s %s\\n' '{sentinel}' \"$?\"\n"
+            f"printf '\\n%s\\n' '{sentinel}' >&2\n")
+
+
+def _powershell_wrapper(commands, sentinel):
+    # One line (PowerShell runs stdin line by line); the script is passed base64 encoded.
+    # Failure = non-zero $LASTEXITCODE, a terminating error or a new entry in $Error.
+    encoded = base64.b64encode(commands.encode("utf-8")).decode("ascii")
+    return ("$global:LASTEXITCODE = 0; $__ypai_errors = $Error.Count; $__ypai_ok = $true; "
+            "try { & ([scriptblock]::Create([Text.Encoding]::UTF8.GetString("
+            f"[Convert]::FromBase64String('{encoded}')))) | Out-Default }} "
+            "catch { [Console]::Error.WriteLine($_.ToString()); $__ypai_ok = $false }; "
+            "$__ypai_code = if ($LASTEXITCODE) { $LASTEXITCODE } "
+            "elseif ($__ypai_ok -and $Error.Count -eq $__ypai_errors) { 0 } else { 1 }; "
+            f"[Console]::Out.WriteLine(\"`n{sentinel} $__ypai_code\"); [Console]::Out.Flush(); "
+            f"[Console]::Error.WriteLine(\"`n{sentinel}\"); [Console]::Error.Flush()\n")
+
+
+class ShellSession:
+    """One running shell. Not thread-safe - the pool hands a session to one caller at a time."""
+
+    def __init__(self, command_type):
+        self.command_type = command_type
+        self.sentinel = f"__ypai_{uuid.uuid4().hex}__"
+        self.commands_run = 0
+        self.last_used = time.monotonic()
+        self.broken = False
+        self._wrap = _powershell_wrapper if command_type == "powershell" else _posix_wrapper
+        self.process = subprocess.Popen(
+            SESSION_SHELLS[command_type],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=True,
+            encoding='utf-8',
+            errors='replace',
+            startupinfo=_startupinfo(),
+            start_new_session=not IS_WINDOWS,
+        )
+        self._lines = queue.Queue()
+        for name, stream in (("stdout", self.process.stdout), ("stderr", self.process.stderr)):
+            threading.Thread(target=self._pump, args=(name, stream), daemon=True).start()
+
+    def _pump(self, name, stream):
+        try:
+            for line in iter(lambda: stream.readline(MAX_LINE_CHARS), ""):
+                self._lines.put((name, line))
+        except (OSError, ValueError):
+            pass  # Stream closed by close()
+        self._lines.put((name, None))
+
+    def alive(self):
+        return not self.broken and self.process.poll() is None
+
+    def run(self, commands, timeout=None, stop_event=None, tail_lines=OUTPUT_TAIL_LINES, echo=True,
+            echo_prefix=""):
+        """Runs 'commands' in this shell; same semantics as command_runner.run_command()."""
+        started = self.last_used = time.monotonic()
+        self.commands_run += 1
+        try:
+            self.process.stdin.write(self._wrap(commands, self.sentinel))
+            self.process.stdin.flush()
+        except OSError:
+            self.broken = True
+            raise
+
+        buffers = {"stdout": deque(maxlen=tail_lines), "stderr": deque(maxlen=tail_lines)}
+        prefixes = {"stdout": echo_prefix, "stderr": f"{echo_prefix}[stderr] "}
+        # Empty lines are held back: the one right before the sentinel is the wrapper's '\n'
+        held_empty = {"stdout": 0, "stderr": 0}
+        done = {"stdout": False, "stderr": False}
+
+        def emit(name, text):
+            buffers[name].append(text)
+            if echo:
+                print(f"{prefixes[name]}{text}")
+
+        deadline = None if timeout is None else started + timeout
+        returncode = None
+        timed_out = cancelled = False
+        while not all(done.values()):
+            if stop_event is not None and stop_event.is_set():
+                cancelled = True
+                break
+            wait_seconds = STOP_POLL_SECONDS
+            if deadline is not None:
+                wait_seconds = deadline - time.monotonic()
+                if wait_seconds <= 0:
+                    timed_out = True
+                    break
+                wait_seconds = min(wait_seconds, STOP_POLL_SECONDS)
+            try:
+                name, line = self._lines.get(timeout=wait_seconds)
+            except queue.Empty:
+                continue
+            if line is None:
+                # The shell exited (e.g. the command called 'exit') - keep everything it printed
+                self.broken = True
+                done[name] = True
+                for _ in range(held_empty[name]):
+                    emit(name, "")
+                held_empty[name] = 0
+                continue
+            text = line.rstrip("\r\n")
+            if text.startswith(self.sentinel):
+                for _ in range(held_empty[name] - 1):
+                    emit(name, "")
+                held_empty[name] = 0
+                if name == "stdout":
+                    try:
+                        returncode = int(text[len(self.sentinel):].strip())
+                    except ValueError:
+                        self.broken = True
+                        returncode = 1
+                done[name] = True
+            elif not text:
+                held_empty[name] += 1
+            else:
+                for _ in range(held_empty[name]):
+                    emit(name, "")
+                held_empty[name] = 0
+                emit(name, text)
+
+        if timed_out or cancelled:
+            self.close()
+            returncode = None
+        elif self.broken and returncode is None:
+            returncode = self.process.wait()
+        return CommandResult(returncode, list(buffers["stdout"]), list(buffers["stderr"]),
+                             timed_out, cancelled, time.monotonic() - started)
+
+    def health_check(self):
+        """True if the shell still answers an empty command."""
+        try:
+            result = self.run(":" if self.command_type != "powershell" else "$null",
+                              timeout=HEALTH_CHECK_TIMEOUT_SECONDS, echo=False)
+        except OSError:
+            return False
+        return result.returncode == 0 and self.alive()
+
+    def close(self):
+        self.broken = True
+        if self.process.poll() is None:
+            try:
+                self.process.stdin.close()
+            except OSError:
+                pass
+            terminate_process_tree(self.process)
+
+
+def _acquire(command_type):
+    while True:
+        with _pool_lock:
+            idle = _idle_sessions.get(command_type)
+            session = idle.pop() if idle else None
+        if session is None:
+            return ShellSession(command_type)
+        if not session.alive():
+            session.close()
+        elif time.monotonic() - session.last_used >= HEALTH_CHECK_IDLE_SECONDS and not session.health_check():
+            session.close()
+        else:
+            return session
+
+
+def _release(session):
+    if session.alive() and session.commands_run < MAX_COMMANDS_PER_SESSION:
+        with _pool_lock:
+            idle = _idle_sessions.setdefault(session.command_type, [])
+            if len(idle) < MAX_IDLE_SESSIONS_PER_SHELL:
+                idle.append(session)
+                return
+    session.close()
+
+
+def run(command_type, commands, timeout=None, stop_event=None, tail_lines=OUTPUT_TAIL_LINES, echo=True,
+        echo_prefix=""):
+    """
+    Runs 'commands' in a pooled session of the given shell (see SESSION_SHELLS).
+    Raises OSError (e.g. FileNotFoundError) if the shell can't be started.
+
+    Returns:
+        CommandResult: returncode is None if the command was killed.
+    """
+    session = _acquire(command_type)
+    try:
+        return session.run(commands, timeout, stop_event, tail_lines, echo, echo_prefix)
+    except BaseException:
+        session.close()
+        raise
+    finally:
+        _release(session)
+
+
+@atexit.register
+def close_all():
+    """Terminates all idle sessions."""
+    with _pool_lock:
+        sessions = [session for idle in _idle_sessions.values() for session in idle]
+        _idle_sessions.clear()
+    for session in sessions:
+        session.close()
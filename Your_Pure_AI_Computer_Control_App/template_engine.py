@@ -0,0 +1,130 @@
+# template_engine.py
+# Variable templates used by ScenarioRunner._substitute_variables().
+#
+# A template string such as "Hello ${user_name}, see ${page|urlencode}" is parsed once into
+# literal and variable segments and cached; rendering just joins the segments. Variables may
+# be followed by one or more filters separated by '|':
+#   urlencode - percent-encodes the value (no characters are considered safe)
+#   json      - escapes the value for use inside a JSON string literal
+#   shell     - quotes the value for use as a single POSIX shell argument
+# Unknown variables are left in the text unchanged, e.g. "${missing}".
+#
+# Run this file directly for a micro-benchmark against the previous regex-based substitution.
+import functools
+import json
+import re
+import shlex
+import urllib.parse
+
+VARIABLE_PATTERN = re.compile(r'\$\{(\w+)((?:\|\w+)*)\}')
+TEMPLATE_CACHE_SIZE = 4096
+
+FILTERS = {
+    "urlencode": lambda value: urllib.parse.quote(value, safe=''),
+    "json": lambda value: json.dumps(value)[1:-1],  # Without the surrounding quotes
+    "shell": shlex.quote,
+}
+
+
+class Template:
+    """A parsed template: literal strings and (name, filters, original text) variable segments."""
+
+    __slots__ = ("source", "segments")
+
+    def __init__(self, source):
+        self.source = source
+        self.segments = []
+        position = 0
+        for match in VARIABLE_PATTERN.finditer(source):
+            if match.start() > position:
+                self.segments.append(source[position:match.start()])
+            filter_names = [name for name in match.group(2).split("|") if name]
+            try:
+                filters = tuple(FILTERS[name] for name in filter_names)
+            except KeyError as e:
+                raise ValueError(f"Unknown template filter {e} in '{match.group(0)}'. Available filters: {sorted(FILTERS)}")
+            self.segments.append((match.group(1), filters, match.group(0)))
+            position = match.end()
+        if position < len(source):
+            self.segments.append(source[position:])
+
+    def render(self, variables, prefix_filters=None):
+        """
+        Substitutes variables into the template.
+
+        Args:
+            variables (dict): Current scenario variables.
+            prefix_filters (dict, optional): Filter name applied to variables whose name starts
+                with the given prefix and that have no explicit filter, e.g. {"enc_": "urlencode"}.
+
+        Returns:
+            str: The rendered text.
+        """
+        parts = []
+        for segment in self.segments:
+            if segment.__class__ is str:
+                parts.append(segment)
+                continue
+            name, filters, original = segment
+            if name not in variables:
+                parts.append(original)
+                continue
+            value = str(variables[name])
+            if not filters and prefix_filters:
+                for prefix, filter_name in prefix_filters.items():
+                    if name.startswith(prefix):
+                        filters = (FILTERS[filter_name],)
+                        break
+            for apply_filter in filters:
+                value = apply_filter(value)
+            parts.append(value)
+        return "".join(parts)
+
+
+@functools.lru_cache(maxsize=TEMPLATE_CACHE_SIZE)
+def compile_template(text):
+    """Returns the parsed Template for a string (parsed once, then served from the cache)."""
+    return Template(text)
+
+
+def precompile_templates(value):
+    """
+    Parses every template string found in step data (nested dicts/lists included).
+    Called when a scenario is compiled, so invalid filters are reported before step 1.
+    """
+    if isinstance(value, str):
+        if "${" in value:
+            compile_template(value)
+    elif isinstance(value, dict):
+        for item in value.values():
+            precompile_templates(item)
+    elif isinstance(value, list):
+        for item in value:
+            precompile_templates(item)
+
+
+if __name__ == "__main__":
+    import timeit
+
+    template_text = "Dear ${first_name} ${last_name}, your order ${order_id} ships to ${city} on ${date}."
+    variables = {"first_name": "Ada", "last_name": "Lovelace", "order_id": "A-1042",
+                 "city": "London", "date": "2024-05-01"}
+
+    def legacy_substitute(text):
+        # The previous implementation: compiles the pattern and builds a closure per call
+        def replace_match(match):
+            var_name = match.group(1)
+            return str(variables.get(var_name, match.group(0)))
+        pattern = re.compile(r'\$\{(\w+)\}')
+        return pattern.sub(replace_match, text)
+
+    def compiled_substitute(text):
+        return compile_template(text).render(variables)
+
+    assert legacy_substitute(template_text) == compiled_substitute(template_text)
+
+    iterations = 200000
+    for label, func in (("regex per call (before)", legacy_substitute),
+                        ("compiled template (after)", compiled_substitute)):
+        seconds = min(timeit.repeat(lambda: func(template_text), number=iterations, repeat=5))
+        print(f"{label:28s} {seconds / iterations * 1e6:6.2f} us per substitution")
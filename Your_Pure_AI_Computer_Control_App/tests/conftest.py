@@ -0,0 +1,5 @@
+# The application modules are imported by their top-level names (as scenario_executor does)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,97 @@
+# Tests of the Execute Command result cache (TTL, LRU eviction, private persisted file).
+import json
+import os
+import stat
+import pytest
+import command_cache
+from command_runner import CommandResult, IS_WINDOWS
+
+
+@pytest.fixture(autouse=True)
+def fresh_cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    monkeypatch.setenv("LOCALAPPDATA", str(tmp_path / "cache"))
+    monkeypatch.setattr(command_cache, "_entries", command_cache.OrderedDict())
+    monkeypatch.setattr(command_cache, "_loaded", False)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(command_cache.time, "time", lambda: now[0])
+    return now
+
+
+def result(stdout="value", returncode=0):
+    return CommandResult(returncode, [stdout], [], False, False, 0.5)
+
+
+def test_settings():
+    assert command_cache.settings({}) is None
+    assert command_cache.settings({"cache": False}) is None
+    assert command_cache.settings({"cache": True}) == (command_cache.DEFAULT_TTL_SECONDS, False)
+    assert command_cache.settings({"cache": {}}) == (command_cache.DEFAULT_TTL_SECONDS, False)
+    assert command_cache.settings({"cache": {"ttl": 5, "persist": True}}) == (5, True)
+
+
+@pytest.mark.parametrize("cache", ["yes", {"ttl": 0}, {"ttl": True}, {"persist": "no"}])
+def test_invalid_settings_are_rejected(cache):
+    with pytest.raises(ValueError):
+        command_cache.validate(cache)
+
+
+def test_cached_result_expires_after_ttl(clock):
+    command_cache.put("sh", "hostname", 200, result(), ttl=10)
+    cached = command_cache.get("sh", "hostname", 200)
+    assert cached.stdout == ["value"] and cached.returncode == 0
+    assert command_cache.get("sh", "other", 200) is None
+    assert command_cache.get("bash", "hostname", 200) is None  # Keyed by shell type too
+    clock[0] += 10
+    assert command_cache.get("sh", "hostname", 200) is None
+
+
+def test_failed_runs_are_not_cached(clock):
+    command_cache.put("sh", "false", 200, result(returncode=1), ttl=10)
+    assert command_cache.get("sh", "false", 200) is None
+
+
+def test_least_recently_used_entry_is_evicted(clock, monkeypatch):
+    monkeypatch.setattr(command_cache, "MAX_ENTRIES", 2)
+    command_cache.put("sh", "a", 200, result("a"), ttl=60)
+    command_cache.put("sh", "b", 200, result("b"), ttl=60)
+    command_cache.get("sh", "a", 200)  # 'b' is now the least recently used
+    command_cache.put("sh", "c", 200, result("c"), ttl=60)
+    assert command_cache.get("sh", "b", 200) is None
+    assert command_cache.get("sh", "a", 200).stdout == ["a"]
+    assert command_cache.get("sh", "c", 200).stdout == ["c"]
+
+
+def test_persisted_entries_survive_a_restart(clock, monkeypatch):
+    command_cache.put("sh", "token", 200, result("secret"), ttl=60, persist=True)
+    command_cache.put("sh", "memory only", 200, result(), ttl=60)
+    path = command_cache.cache_file_path()
+    with open(path) as f:
+        assert len(json.load(f)) == 1  # Only the persisted entry, without the command text
+
+    monkeypatch.setattr(command_cache, "_entries", command_cache.OrderedDict())
+    monkeypatch.setattr(command_cache, "_loaded", False)
+    assert command_cache.get("sh", "token", 200).stdout == ["secret"]
+    assert command_cache.get("sh", "memory only", 200) is None
+
+
+@pytest.mark.skipif(IS_WINDOWS, reason="POSIX permissions.")
+def test_persisted_file_is_private(clock):
+    command_cache.put("sh", "token", 200, result("secret"), ttl=60, persist=True)
+    path = command_cache.cache_file_path()
+    assert stat.S_IMODE(os.stat(path).st_mode) == 0o600
+    assert stat.S_IMODE(os.stat(os.path.dirname(path)).st_mode) == 0o700
+
+
+@pytest.mark.parametrize("content", ["{broken", "[1, 2]", '{"key": 5}'])
+def test_unreadable_cache_file_is_discarded(clock, content):
+    path = command_cache.cache_file_path()
+    os.makedirs(os.path.dirname(path))
+    with open(path, "w") as f:
+        f.write(content)
+    assert command_cache.get("sh", "anything", 200) is None
+    assert not os.path.exists(path)
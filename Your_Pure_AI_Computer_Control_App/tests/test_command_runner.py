@@ -0,0 +1,103 @@
+# Tests of the Execute Command runners: one process per command, and pooled shell sessions.
+import os
+import threading
+import time
+import pytest
+import command_runner
+import shell_sessions
+
+pytestmark = pytest.mark.skipif(command_runner.IS_WINDOWS, reason="Uses POSIX shell commands.")
+
+
+def sh(script):
+    return command_runner.shell_args("sh", script)[1]
+
+
+def _process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def test_output_and_exit_code_are_captured():
+    result = command_runner.run_command(sh("echo out; echo err >&2; exit 3"), echo=False)
+    assert (result.returncode, result.stdout, result.stderr) == (3, ["out"], ["err"])
+    assert not result.timed_out and not result.cancelled
+
+
+def test_only_the_last_lines_are_kept():
+    result = command_runner.run_command(sh("i=1; while [ $i -le 500 ]; do echo $i; i=$((i+1)); done"),
+                                        tail_lines=10, echo=False)
+    assert result.stdout == [str(i) for i in range(491, 501)]
+
+
+def test_long_lines_are_split():
+    length = command_runner.MAX_LINE_CHARS + 10
+    result = command_runner.run_command(sh(f"head -c {length} /dev/zero | tr '\\0' x; echo"), echo=False)
+    assert [len(line) for line in result.stdout] == [command_runner.MAX_LINE_CHARS, 10]
+
+
+def test_timeout_kills_the_whole_process_group():
+    started = time.monotonic()
+    result = command_runner.run_command(sh("sleep 30 & echo $!; wait"), timeout=0.5, echo=False)
+    assert result.timed_out and result.returncode is None
+    assert time.monotonic() - started < 10
+    background_pid = int(result.stdout[0])
+    deadline = time.monotonic() + 5
+    while _process_exists(background_pid) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _process_exists(background_pid)
+
+
+def test_stop_event_cancels_the_command():
+    stop_event = threading.Event()
+    threading.Timer(0.3, stop_event.set).start()
+    result = command_runner.run_command(sh("sleep 30"), stop_event=stop_event, echo=False)
+    assert result.cancelled and result.returncode is None and result.duration < 10
+
+
+def test_missing_executable_raises_oserror():
+    with pytest.raises(OSError):
+        command_runner.run_command(["/nonexistent/your_pure_ai_shell"], echo=False)
+
+
+@pytest.fixture
+def clean_pool():
+    shell_sessions.close_all()
+    yield
+    shell_sessions.close_all()
+
+
+def test_session_is_reused_and_state_does_not_leak(clean_pool, tmp_path):
+    first = shell_sessions.run("sh", f"cd '{tmp_path}'; x=1; pwd", echo=False)
+    assert first.returncode == 0 and first.stdout == [str(tmp_path)]
+    session = shell_sessions._idle_sessions["sh"][0]
+
+    second = shell_sessions.run("sh", 'pwd; echo "x=${x:-unset}"', echo=False)
+    assert second.stdout == [os.getcwd(), "x=unset"]
+    assert shell_sessions._idle_sessions["sh"] == [session]
+
+
+def test_session_reports_exit_codes_and_output(clean_pool):
+    result = shell_sessions.run("sh", "echo out; echo; echo err >&2; exit 4", echo=False)
+    assert (result.returncode, result.stdout, result.stderr) == (4, ["out", ""], ["err"])
+    # 'exit' ended only the subshell - the session is still usable
+    assert shell_sessions.run("sh", "echo again", echo=False).stdout == ["again"]
+
+
+def test_session_is_replaced_after_a_timeout(clean_pool):
+    result = shell_sessions.run("sh", "sleep 30", timeout=0.3, echo=False)
+    assert result.timed_out and result.returncode is None
+    assert not shell_sessions._idle_sessions.get("sh")
+    assert shell_sessions.run("sh", "echo fresh", echo=False).stdout == ["fresh"]
+
+
+def test_session_is_recycled_after_max_commands(clean_pool, monkeypatch):
+    monkeypatch.setattr(shell_sessions, "MAX_COMMANDS_PER_SESSION", 2)
+    shell_sessions.run("sh", ":", echo=False)
+    session = shell_sessions._idle_sessions["sh"][0]
+    shell_sessions.run("sh", ":", echo=False)
+    assert not shell_sessions._idle_sessions.get("sh")
+    assert not session.alive()
@@ -0,0 +1,97 @@
+# Tests of the allowed-scenario index and the action registry (including reloads).
+import json
+import os
+import pytest
+from action_registry import ActionRegistry
+from scenario_registry import ScenarioRegistry
+
+
+def _write_json(path, content, bump=0):
+    path.write_text(json.dumps(content))
+    if bump:
+        # Make the change visible even on file systems with a coarse mtime
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+
+
+def _load_json(path):
+    def load():
+        with open(path) as f:
+            return json.load(f)
+    return load
+
+
+def test_scenario_registry_resolves_names_and_aliases(tmp_path):
+    config = tmp_path / "allowed_scenarios.json"
+    _write_json(config, [{"name": "report", "allowed": True},
+                         {"name": "short", "alias": "long_file_name", "allowed": True},
+                         {"name": "blocked", "allowed": False},
+                         {"name": "report", "allowed": False}])  # First entry wins
+    index = ScenarioRegistry(str(config), "scenarios", _load_json(config)).current()
+    assert index.resolve("report") == os.path.join("scenarios", "report.json")
+    assert index.resolve("short") == os.path.join("scenarios", "long_file_name.json")
+    with pytest.raises(PermissionError):
+        index.resolve("blocked")
+    with pytest.raises(ValueError):
+        index.resolve("unknown")
+
+
+def test_scenario_registry_reloads_only_when_the_file_changes(tmp_path):
+    config = tmp_path / "allowed_scenarios.json"
+    _write_json(config, [{"name": "report", "allowed": True}])
+    loads = []
+    load = _load_json(config)
+    registry = ScenarioRegistry(str(config), "scenarios", lambda: loads.append(1) or load())
+    first = registry.current()
+    assert registry.current() is first and len(loads) == 1
+
+    _write_json(config, [{"name": "report", "allowed": False}], bump=10**9)
+    with pytest.raises(PermissionError):
+        registry.current().resolve("report")
+    assert len(loads) == 2
+
+
+@pytest.fixture
+def action_package(tmp_path, monkeypatch):
+    package = tmp_path / "test_actions_pkg"
+    package.mkdir()
+    (package / "__init__.py").write_text("")
+    (package / "noop.py").write_text(
+        "def validate(data):\n    pass\n\ndef execute(data, variables, runner_instance):\n    return True\n")
+    (package / "no_execute.py").write_text("VALUE = 1\n")
+    monkeypatch.syspath_prepend(str(tmp_path))
+    return package
+
+
+def test_action_registry_reports_every_broken_action(tmp_path, action_package):
+    config = tmp_path / "actions_config.json"
+    _write_json(config, {"Noop": "noop", "Missing": "missing", "Broken": "no_execute"})
+    registry = ActionRegistry(str(config), "test_actions_pkg", _load_json(config))
+    with pytest.raises(ValueError) as error:
+        registry.load()
+    assert "'Missing'" in str(error.value) and "'Broken'" in str(error.value)
+
+
+def test_action_registry_keeps_old_table_when_reload_fails(tmp_path, action_package):
+    config = tmp_path / "actions_config.json"
+    _write_json(config, {"Noop": "noop"})
+    loads = []
+    load = _load_json(config)
+    registry = ActionRegistry(str(config), "test_actions_pkg", lambda: loads.append(1) or load())
+    registry.load()
+    assert registry.reload_if_changed() is False
+
+    config.write_text("{broken")
+    stat = os.stat(config)
+    os.utime(config, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert registry.reload_if_changed() is False
+    assert registry.resolve("Noop")[0] == "noop"
+    # The broken file is not parsed again until it changes
+    assert registry.reload_if_changed() is False
+    assert len(loads) == 2
+
+    _write_json(config, {"Noop": "noop", "Other": "noop"}, bump=2 * 10**9)
+    assert registry.reload_if_changed() is True
+    assert registry.resolve("Other")[0] == "noop"
+    with pytest.raises(ValueError):
+        registry.resolve("Unknown")
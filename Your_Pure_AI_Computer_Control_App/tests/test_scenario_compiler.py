@@ -0,0 +1,88 @@
+# Tests of scenario compilation and caching.
+import json
+import os
+import pytest
+
+pytest.importorskip("pyautogui")  # Imported by wait_conditions (post-conditions)
+pytest.importorskip("pyperclip")
+
+from scenario_compiler import ScenarioCache, ScenarioCompileError, compile_scenario
+
+
+def _write_json(path, content, bump=0):
+    path.write_text(json.dumps(content))
+    if bump:
+        # Make the change visible even on file systems with a coarse mtime
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + bump))
+
+
+def _validate_text(data):
+    if not isinstance(data.get("text"), str):
+        raise ValueError("'text' must be a string.")
+
+
+def _execute(data, variables, runner_instance):
+    return True
+
+
+def resolve_action(action_type):
+    if action_type == "Insert Text":
+        return "insert_text", _execute, _validate_text
+    if action_type == "Select All":
+        return "select_all", _execute, None
+    raise ValueError(f"Unknown action type '{action_type}'.")
+
+
+def test_compiles_steps_with_resolved_actions(tmp_path):
+    path = tmp_path / "scenario.json"
+    _write_json(path, {"actions": [{"type": "Select All", "details": "all"},
+                                   {"type": "Insert Text", "data": {"text": "Hi ${name|json}"}}]})
+    steps = compile_scenario(str(path), resolve_action).steps
+    assert [(step.index, step.type, step.module_name) for step in steps] == \
+        [(0, "Select All", "select_all"), (1, "Insert Text", "insert_text")]
+    assert steps[0].data == {} and steps[0].details == "all"
+    assert steps[1].execute is _execute and steps[1].post_condition is None
+
+
+@pytest.mark.parametrize("action, message", [
+    ({"type": "Insert Text", "data": {"text": 42}}, "'text' must be a string"),
+    ({"type": "Unknown"}, "Unknown action type"),
+    ({"type": "Select All", "data": {"wait_until": {"condition": "nope"}}}, "Unknown wait_until condition"),
+    ({"type": "Insert Text", "data": {"text": "${name|nope}"}}, "Unknown template filter"),
+    ({"type": "Select All", "data": []}, "'data' must be a JSON object"),
+])
+def test_invalid_step_fails_with_its_step_number(tmp_path, action, message):
+    path = tmp_path / "scenario.json"
+    _write_json(path, {"actions": [{"type": "Select All"}, action]})
+    with pytest.raises(ScenarioCompileError, match=message) as error:
+        compile_scenario(str(path), resolve_action)
+    assert "step 2" in str(error.value)
+
+
+@pytest.mark.parametrize("content", ["{not json", json.dumps({"steps": []}), json.dumps({"actions": {}})])
+def test_malformed_scenario_file_is_rejected(tmp_path, content):
+    path = tmp_path / "scenario.json"
+    path.write_text(content)
+    with pytest.raises(ScenarioCompileError):
+        compile_scenario(str(path), resolve_action)
+
+
+def test_cache_recompiles_only_when_the_file_changes(tmp_path):
+    path = tmp_path / "scenario.json"
+    _write_json(path, {"actions": [{"type": "Select All"}]})
+    cache = ScenarioCache(resolve_action)
+    first = cache.get(str(path))
+    assert cache.get(str(path)) is first
+
+    _write_json(path, {"actions": [{"type": "Select All"}, {"type": "Select All"}]}, bump=10**9)
+    second = cache.get(str(path))
+    assert second is not first and len(second.steps) == 2
+
+    cache.clear()
+    assert cache.get(str(path)) is not second
+
+
+def test_cache_reports_missing_scenario_file(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        ScenarioCache(resolve_action).get(str(tmp_path / "missing.json"))
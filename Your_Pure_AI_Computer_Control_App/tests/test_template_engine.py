@@ -0,0 +1,53 @@
+# Tests of the ${variable} templates used for substitution in scenario steps.
+import pytest
+from template_engine import compile_template, precompile_templates
+
+
+def render(text, variables, prefix_filters=None):
+    return compile_template(text).render(variables, prefix_filters)
+
+
+def test_variables_are_substituted_and_unknown_ones_kept():
+    assert render("Hello ${name}, ${missing}!", {"name": "Ada"}) == "Hello Ada, ${missing}!"
+
+
+def test_values_are_converted_to_strings():
+    assert render("${count} items", {"count": 3}) == "3 items"
+
+
+def test_urlencode_filter_treats_no_character_as_safe():
+    assert render("q=${term|urlencode}", {"term": "a b/c&d"}) == "q=a%20b%2Fc%26d"
+
+
+def test_json_filter_escapes_for_a_string_literal():
+    assert render('{"text": "${text|json}"}', {"text": 'say "hi"\n'}) == '{"text": "say \\"hi\\"\\n"}'
+
+
+def test_shell_filter_quotes_a_single_argument():
+    assert render("echo ${arg|shell}", {"arg": "it's; rm -rf /"}) == "echo 'it'\"'\"'s; rm -rf /'"
+
+
+def test_filters_are_applied_in_order():
+    assert render("${v|json|urlencode}", {"v": 'a"b'}) == "a%5C%22b"
+
+
+def test_prefix_filters_apply_only_without_explicit_filter():
+    prefix_filters = {"enc_": "urlencode"}
+    assert render("${enc_q}", {"enc_q": "a b"}, prefix_filters) == "a%20b"
+    assert render("${enc_q|json}", {"enc_q": "a b"}, prefix_filters) == "a b"
+    assert render("${plain}", {"plain": "a b"}, prefix_filters) == "a b"
+
+
+def test_unknown_filter_is_rejected():
+    with pytest.raises(ValueError, match="Unknown template filter"):
+        compile_template("${name|upper}")
+
+
+def test_templates_are_parsed_once():
+    assert compile_template("${a} and ${b}") is compile_template("${a} and ${b}")
+
+
+def test_precompile_finds_templates_in_nested_step_data():
+    precompile_templates({"text": "plain", "items": [{"value": "${ok|json}"}], "count": 3})
+    with pytest.raises(ValueError):
+        precompile_templates({"items": [{"value": "${bad|nope}"}]})
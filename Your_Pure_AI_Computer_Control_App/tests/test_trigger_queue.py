@@ -0,0 +1,63 @@
+# Tests of the bounded priority queue in front of the scenario worker.
+import threading
+import pytest
+from trigger_queue import TriggerQueue, QueueFullError
+
+
+def test_higher_priority_runs_first_and_ties_keep_arrival_order():
+    queue = TriggerQueue(max_depth=8)
+    queue.put({"actionName": "low_1"})
+    queue.put({"actionName": "high", "priority": 5})
+    queue.put({"actionName": "low_2"})
+    queue.put({"actionName": "negative", "priority": -1})
+    order = [queue.get().command_data["actionName"] for _ in range(4)]
+    assert order == ["high", "low_1", "low_2", "negative"]
+    assert len(queue) == 0
+
+
+def test_identical_pending_trigger_is_not_queued_twice():
+    queue = TriggerQueue(max_depth=8)
+    first, queued = queue.put({"actionName": "report", "dataForExecution": {"a": 1, "b": 2}})
+    assert queued
+    # Key order doesn't matter
+    second, queued = queue.put({"dataForExecution": {"b": 2, "a": 1}, "actionName": "report"})
+    assert not queued and second is first
+    assert len(queue) == 1
+
+
+def test_trigger_can_be_queued_again_once_taken():
+    queue = TriggerQueue(max_depth=8)
+    queue.put({"actionName": "report"})
+    queue.get()
+    _, queued = queue.put({"actionName": "report"})
+    assert queued
+
+
+def test_full_queue_rejects_new_triggers_but_returns_duplicates():
+    queue = TriggerQueue(max_depth=2)
+    queue.put({"actionName": "a"})
+    queue.put({"actionName": "b"})
+    with pytest.raises(QueueFullError):
+        queue.put({"actionName": "c"})
+    _, queued = queue.put({"actionName": "a"})
+    assert not queued
+
+
+@pytest.mark.parametrize("priority", ["high", 1.5, True])
+def test_priority_must_be_an_integer(priority):
+    with pytest.raises(ValueError):
+        TriggerQueue(max_depth=2).put({"actionName": "a", "priority": priority})
+
+
+def test_get_blocks_until_a_trigger_arrives_and_result_reaches_waiter():
+    queue = TriggerQueue(max_depth=2)
+    taken = []
+    worker = threading.Thread(target=lambda: taken.append(queue.get()))
+    worker.start()
+    request, _ = queue.put({"actionName": "report"}, source="server")
+    worker.join(5)
+    assert taken == [request] and request.source == "server"
+
+    assert request.wait(timeout=0.01) is None
+    request.set_result({"success": True})
+    assert request.wait(timeout=1) == {"success": True}
@@ -0,0 +1,102 @@
+# Tests of the local trigger endpoint (TCP on the loopback interface and Unix sockets).
+import json
+import os
+import socket
+import pytest
+from trigger_server import start_trigger_server
+
+TOKEN = "s3cret"
+
+
+@pytest.fixture
+def received():
+    return []
+
+
+@pytest.fixture
+def tcp_server(received):
+    def dispatch(command_data):
+        received.append(command_data)
+        return {"success": True, "actionName": command_data.get("actionName")}
+
+    server = start_trigger_server("tcp:127.0.0.1:0", dispatch, TOKEN)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def _exchange(server, payload):
+    with socket.create_connection(server.server_address, timeout=5) as connection:
+        connection.sendall(payload)
+        connection.shutdown(socket.SHUT_WR)
+        replies = connection.makefile("rb").read().splitlines()
+    return [json.loads(reply) for reply in replies]
+
+
+def test_tcp_trigger_with_token_is_dispatched(tcp_server, received):
+    replies = _exchange(tcp_server, b'{"actionName": "report", "token": "s3cret"}\n')
+    assert replies == [{"success": True, "actionName": "report"}]
+    assert received == [{"actionName": "report"}]  # The token is not passed on
+
+
+@pytest.mark.parametrize("payload", [b'{"actionName": "report"}\n',
+                                     b'{"actionName": "report", "token": "wrong"}\n',
+                                     b'{"actionName": "report", "token": 1}\n'])
+def test_tcp_trigger_without_valid_token_is_rejected(tcp_server, received, payload):
+    replies = _exchange(tcp_server, payload)
+    assert replies[0]["success"] is False
+    assert received == []
+
+
+def test_connection_is_closed_after_invalid_json(tcp_server, received):
+    payload = b'not json\n{"actionName": "report", "token": "s3cret"}\n'
+    replies = _exchange(tcp_server, payload)
+    assert len(replies) == 1 and replies[0]["success"] is False
+    assert received == []
+
+
+def test_browser_post_is_not_dispatched(tcp_server, received):
+    # What a web page's fetch()/form POST to the port sends: headers, blank line, JSON body
+    body = b'{"actionName": "report", "token": "s3cret"}\n'
+    request = (b"POST / HTTP/1.1\r\nHost: 127.0.0.1\r\nContent-Type: text/plain\r\n"
+               b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+    assert _exchange(tcp_server, request) == []
+    assert received == []
+
+
+def test_tcp_server_requires_token():
+    with pytest.raises(ValueError):
+        start_trigger_server("tcp:127.0.0.1:0", lambda command_data: {}, None)
+
+
+def test_tcp_server_only_listens_on_loopback():
+    with pytest.raises(ValueError):
+        start_trigger_server("tcp:0.0.0.0:0", lambda command_data: {}, TOKEN)
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="No Unix domain sockets on this platform.")
+def test_unix_socket_is_private_and_needs_no_token(tmp_path, received):
+    path = str(tmp_path / "executor.sock")
+    server = start_trigger_server(f"unix:{path}", lambda command_data: received.append(command_data) or {"success": True})
+    try:
+        assert os.stat(path).st_mode & 0o777 == 0o600
+        with socket.socket(socket.AF_UNIX) as connection:
+            connection.settimeout(5)
+            connection.connect(path)
+            connection.sendall(b'{"actionName": "report"}\n')
+            connection.shutdown(socket.SHUT_WR)
+            replies = connection.makefile("rb").read().splitlines()
+        assert [json.loads(reply) for reply in replies] == [{"success": True}]
+        assert received == [{"actionName": "report"}]
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="No Unix domain sockets on this platform.")
+def test_unix_server_refuses_to_replace_regular_file(tmp_path):
+    path = tmp_path / "not_a_socket"
+    path.write_text("keep me")
+    with pytest.raises(ValueError):
+        start_trigger_server(f"unix:{path}", lambda command_data: {})
+    assert path.read_text() == "keep me"
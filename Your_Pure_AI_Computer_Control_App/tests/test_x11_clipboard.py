@@ -0,0 +1,112 @@
+# Tests of the X11 clipboard backends. They need a running X server (e.g. Xvfb) and
+# python-xlib and are skipped otherwise:
+#
+#   xvfb-run python -m pytest Your_Pure_AI_Computer_Control_App/tests
+import os
+import threading
+import pytest
+
+if not os.environ.get("DISPLAY"):
+    pytest.skip("No X display ($DISPLAY is not set).", allow_module_level=True)
+pytest.importorskip("Xlib")
+pytest.importorskip("pyperclip")
+
+from Xlib import X
+from Xlib import display as xdisplay
+import clipboard_service
+import clipboard_watcher
+
+
+class OtherApplication:
+    """A second X client that takes over the CLIPBOARD selection, like a text editor copying."""
+
+    def __init__(self):
+        self.display = xdisplay.Display()
+        self.window = self.display.screen().root.create_window(0, 0, 1, 1, 0, X.CopyFromParent)
+        self.atom_clipboard = self.display.get_atom("CLIPBOARD")
+
+    def take_ownership(self):
+        self.window.set_selection_owner(self.atom_clipboard, X.CurrentTime)
+        self.display.sync()
+
+    def close(self):
+        self.display.close()
+
+
+@pytest.fixture
+def other_application():
+    application = OtherApplication()
+    yield application
+    application.close()
+
+
+@pytest.fixture
+def watcher():
+    try:
+        watcher = clipboard_watcher.XFixesClipboardWatcher()
+    except RuntimeError as e:
+        pytest.skip(str(e))
+    yield watcher
+    watcher.close()
+
+
+@pytest.fixture
+def service():
+    service = clipboard_service.XSelectionClipboardService()
+    yield service
+    service.close()
+
+
+def test_watcher_times_out_without_change(watcher):
+    assert watcher.wait_for_change(timeout=0.2) is False
+
+
+def test_watcher_reports_owner_change(watcher, other_application):
+    other_application.take_ownership()
+    assert watcher.wait_for_change(timeout=2.0) is True
+    # The event was consumed - nothing else happened since
+    assert watcher.wait_for_change(timeout=0.2) is False
+
+
+def test_watcher_wakes_waiting_monitor(watcher, other_application):
+    # The monitor thread blocks in wait_for_change() and reads the clipboard when it returns
+    changes = []
+    monitor = threading.Thread(target=lambda: changes.append(watcher.wait_for_change(timeout=5.0)))
+    monitor.start()
+    other_application.take_ownership()
+    monitor.join(5.0)
+    assert not monitor.is_alive()
+    assert changes == [True]
+
+
+def test_watcher_reports_copy_of_clipboard_service(watcher, service):
+    service.copy("copied")
+    assert watcher.wait_for_change(timeout=2.0) is True
+
+
+def test_copy_then_paste_in_same_service(service):
+    service.copy("hello wörld")
+    assert service.paste() == "hello wörld"
+
+
+def test_paste_from_another_client_is_served(service):
+    reader = clipboard_service.XSelectionClipboardService()
+    try:
+        requests_before = service.request_count
+        service.copy("served over X")
+        assert reader.paste() == "served over X"
+        assert service.wait_for_request(requests_before, timeout=1.0)
+    finally:
+        reader.close()
+
+
+def test_paste_after_losing_ownership_reads_new_owner(service):
+    other = clipboard_service.XSelectionClipboardService()
+    try:
+        service.copy("old text")
+        other.copy("new text")
+        # Must not return the stale text, even before SelectionClear was handled
+        assert service.paste() == "new text"
+    finally:
+        other.close()
+
@@ -0,0 +1,98 @@
+# trigger_queue.py
+# Bounded priority queue that sits in front of ScenarioRunner.
+#
+# Triggers that arrive while a scenario is running are queued and executed back-to-back
+# by a single worker instead of being dropped. Higher 'priority' values run first,
+# triggers with the same priority run in arrival order. A trigger identical to one that
+# is still pending is not queued twice - the caller gets the already pending request.
+import heapq
+import itertools
+import json
+import threading
+
+
+class QueueFullError(Exception):
+    """Raised when a trigger is rejected because the queue has reached its maximum depth."""
+
+
+class TriggerRequest:
+    """A queued trigger. Callers can wait() for the result of its run."""
+
+    __slots__ = ("command_data", "source", "priority", "key", "result", "_done")
+
+    def __init__(self, command_data, source, priority, key):
+        self.command_data = command_data
+        self.source = source  # 'clipboard' or 'server' - decides how errors are reported
+        self.priority = priority
+        self.key = key
+        self.result = None
+        self._done = threading.Event()
+
+    def set_result(self, result):
+        self.result = result
+        self._done.set()
+
+    def wait(self, timeout=None):
+        """Blocks until the request has been executed. Returns the result dict (None on timeout)."""
+        self._done.wait(timeout)
+        return self.result
+
+
+class TriggerQueue:
+    def __init__(self, max_depth):
+        self.max_depth = max_depth
+        self._heap = []
+        self._pending = {}  # Dedup key -> pending TriggerRequest
+        self._counter = itertools.count()  # Keeps FIFO order within one priority
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def _make_key(command_data):
+        return json.dumps(command_data, sort_keys=True, default=str)
+
+    def put(self, command_data, source="clipboard"):
+        """
+        Queues a trigger payload.
+
+        Args:
+            command_data (dict): Parsed trigger JSON. An optional integer 'priority' is honoured.
+            source (str): Where the trigger came from.
+
+        Returns:
+            tuple: (TriggerRequest, bool) - the request and whether it was newly queued
+                   (False if an identical request was already pending).
+
+        Raises:
+            QueueFullError: If max_depth requests are already pending.
+            ValueError: If 'priority' is not an integer.
+        """
+        priority = command_data.get("priority", 0) if isinstance(command_data, dict) else 0
+        if isinstance(priority, bool) or not isinstance(priority, int):
+            raise ValueError("'priority' must be an integer.")
+
+        key = self._make_key(command_data)
+        with self._condition:
+            existing = self._pending.get(key)
+            if existing is not None:
+                return existing, False
+            if len(self._heap) >= self.max_depth:
+                raise QueueFullError(f"Trigger queue is full ({self.max_depth} pending). Trigger rejected.")
+
+            request = TriggerRequest(command_data, source, priority, key)
+            heapq.heappush(self._heap, (-priority, next(self._counter), request))
+            self._pending[key] = request
+            self._condition.notify()
+            return request, True
+
+    def get(self):
+        """Blocks until a request is available and returns the highest-priority one."""
+        with self._condition:
+            while not self._heap:
+                self._condition.wait()
+            _, _, request = heapq.heappop(self._heap)
+            del self._pending[request.key]
+            return request
+
+    def __len__(self):
+        with self._condition:
+            return len(self._heap)
@@ -0,0 +1,167 @@
+# trigger_server.py
+# Optional local trigger endpoint for scenario_executor.py.
+#
+# Accepts the same JSON payload as the clipboard trigger ({"actionName", "dataForExecution"}),
+# one JSON object per line, and answers with one JSON line containing the run result:
+#   {"actionName": ..., "success": true, "variables": {...}, "steps": [{"step", "type", "success", "duration_ms"}, ...]}
+# On errors the reply is {"success": false, "error": "..."}.
+#
+# Address formats:
+#   "unix:/path/to/socket"   - Unix domain socket (Linux/macOS), only accessible by the current user
+#   "tcp:127.0.0.1:8765"     - TCP, always bound to the loopback interface
+#
+# Any program - including a web page open in the user's browser - can connect to a loopback
+# TCP port, so TCP triggers must carry the configured shared secret in a "token" field. The
+# connection is closed on the first line that is not a JSON object (e.g. the headers of an
+# HTTP request), so a request body that happens to be valid JSON is never dispatched.
+import hmac
+import json
+import os
+import re
+import socket
+import socketserver
+import stat
+import threading
+
+MAX_REQUEST_BYTES = 1024 * 1024  # Largest accepted trigger line
+LOCAL_TCP_HOSTS = ("127.0.0.1", "localhost")
+TOKEN_FIELD = "token"
+# Request line of an HTTP request ('POST /run HTTP/1.1', also the methods browsers send)
+HTTP_REQUEST_LINE = re.compile(rb"^(GET|POST|PUT|PATCH|DELETE|HEAD|OPTIONS|CONNECT|TRACE) ")
+
+
+class TriggerRequestHandler(socketserver.StreamRequestHandler):
+    """Handles one connection: reads trigger lines and writes a result line for each."""
+
+    def handle(self):
+        while True:
+            line = self.rfile.readline(MAX_REQUEST_BYTES + 1)
+            if not line:
+                break  # Client closed the connection
+            if len(line) > MAX_REQUEST_BYTES:
+                self._reply({"success": False, "error": f"Request exceeds {MAX_REQUEST_BYTES} bytes."})
+                break
+            if not line.strip():
+                continue
+            if HTTP_REQUEST_LINE.search(line):
+                print("Trigger server: rejected an HTTP request and closed the connection.")
+                break  # No reply - this is not a trigger client
+
+            try:
+                command_data = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                self._reply({"success": False, "error": f"Invalid trigger JSON: {e}"})
+                break  # Not speaking our protocol - don't read anything else from it
+            if not isinstance(command_data, dict):
+                self._reply({"success": False, "error": "Trigger JSON must be an object."})
+                break
+            if not self.server.check_token(command_data.pop(TOKEN_FIELD, None)):
+                print("Trigger server: rejected a trigger with a missing or wrong token.")
+                self._reply({"success": False, "error": f"Missing or invalid '{TOKEN_FIELD}'."})
+                break
+
+            print("\nTrigger received on trigger server.")
+            try:
+                result = self.server.dispatch(command_data)
+            except Exception as e:
+                result = {"success": False, "error": f"Unexpected error: {e}"}
+            self._reply(result)
+
+    def _reply(self, result):
+        try:
+            self.wfile.write(json.dumps(result, default=str).encode("utf-8") + b"\n")
+            self.wfile.flush()
+        except OSError as e:
+            print(f"Trigger server: could not send reply ({e}).")
+
+
+class TCPTriggerServer(socketserver.ThreadingMixIn, socketserver.TCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address, dispatch, token):
+        if not token:
+            raise ValueError("A TCP trigger server needs a token (TRIGGER_SERVER_TOKEN in scenario_executor.py).")
+        self.dispatch = dispatch
+        self.token = token
+        super().__init__(address, TriggerRequestHandler)
+
+    def check_token(self, token):
+        return isinstance(token, str) and hmac.compare_digest(token.encode("utf-8"), self.token.encode("utf-8"))
+
+
+if hasattr(socket, "AF_UNIX"):
+    class UnixTriggerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+
+        def __init__(self, path, dispatch):
+            self.dispatch = dispatch
+            try:
+                mode = os.lstat(path).st_mode
+            except FileNotFoundError:
+                pass
+            else:
+                if not stat.S_ISSOCK(mode):
+                    raise ValueError(f"'{path}' exists and is not a socket - refusing to replace it.")
+                os.remove(path)  # Stale socket from a previous run
+            super().__init__(path, TriggerRequestHandler)
+            os.chmod(path, 0o600)  # Only the current user may send triggers
+
+        def check_token(self, token):
+            return True  # The socket file's permissions already restrict access
+
+        def server_bind(self):
+            # Create the socket file as 0600 - it must not be reachable by others between
+            # bind() and the chmod() above
+            previous_umask = os.umask(0o177)
+            try:
+                super().server_bind()
+            finally:
+                os.umask(previous_umask)
+
+        def server_close(self):
+            super().server_close()
+            try:
+                os.remove(self.server_address)
+            except OSError:
+                pass
+else:
+    UnixTriggerServer = None
+
+
+def start_trigger_server(address, dispatch, token=None):
+    """
+    Starts the trigger server in a daemon thread.
+
+    Args:
+        address (str): "unix:/path" or "tcp:host:port" (host must be a loopback address).
+        dispatch (callable): Called with the parsed payload dict; must return the reply dict.
+        token (str): Shared secret TCP triggers must send in their "token" field (required
+                     for TCP, not used for Unix sockets).
+
+    Returns:
+        The running server instance (call shutdown() / server_close() to stop it).
+    """
+    kind, _, location = address.partition(":")
+    kind = kind.lower()
+
+    if kind == "unix":
+        if UnixTriggerServer is None:
+            raise ValueError("Unix domain sockets are not supported on this platform. Use 'tcp:127.0.0.1:<port>'.")
+        if not location:
+            raise ValueError("Missing socket path in trigger server address.")
+        server = UnixTriggerServer(location, dispatch)
+    elif kind == "tcp":
+        host, _, port = location.rpartition(":")
+        host = host or "127.0.0.1"
+        if host not in LOCAL_TCP_HOSTS:
+            raise ValueError(f"Trigger server must listen on a loopback address, not '{host}'.")
+        if not port.isdigit():
+            raise ValueError(f"Invalid port in trigger server address: '{address}'.")
+        server = TCPTriggerServer((host, int(port)), dispatch, token)
+    else:
+        raise ValueError(f"Unknown trigger server address '{address}'. Use 'unix:/path' or 'tcp:127.0.0.1:<port>'.")
+
+    thread = threading.Thread(target=server.serve_forever, name="TriggerServer", daemon=True)
+    thread.start()
+    return server
@@ -0,0 +1,226 @@
+# wait_conditions.py
+# "Wait until" post-conditions that replace fixed settle delays after actions.
+#
+# Any step can attach a condition in its data, e.g.
+#
+#   "wait_until": {"condition": "clipboard_changed", "timeout": 2}
+#
+# The condition is parsed when the scenario is compiled, armed right before the action
+# runs (e.g. the current clipboard content is remembered) and polled after it until it
+# holds, the timeout expires or the scenario is stopped. Polling starts at
+# 'poll_interval' and backs off up to 'max_poll_interval', so a UI that is ready
+# immediately costs only a few milliseconds and a slow one doesn't burn CPU.
+#
+# Conditions:
+#   clipboard_changed     - the clipboard text differs from the text before the action
+#   region_changed        - pixels in 'region' {x, y, width, height} (or at 'point' {x, y}) changed
+#   window_title_matches  - the active window's title matches the regular expression 'pattern'
+#   file_exists           - 'path' exists
+# 'pattern' and 'path' support ${variable} substitution.
+import os
+import platform
+import re
+import threading
+import time
+import numpy as np
+import pyautogui
+import screen_capture
+from clipboard_service import get_clipboard_service
+
+# python-xlib is optional - used to read the active window title on Linux
+try:
+    import Xlib.threaded  # Must be imported first: makes the connection thread-safe
+    from Xlib import X, Xatom
+    from Xlib import display as xdisplay
+except ImportError:
+    xdisplay = None
+
+DEFAULT_TIMEOUT_SECONDS = 5.0
+DEFAULT_POLL_INTERVAL_SECONDS = 0.01
+DEFAULT_MAX_POLL_INTERVAL_SECONDS = 0.1
+
+_title_display = None
+_title_display_lock = threading.Lock()
+
+
+def wait_until(predicate, timeout, poll_interval=DEFAULT_POLL_INTERVAL_SECONDS,
+               max_poll_interval=DEFAULT_MAX_POLL_INTERVAL_SECONDS, stop_event=None):
+    """
+    Calls 'predicate' until it returns True.
+
+    The delay between checks starts at 'poll_interval' and doubles up to
+    'max_poll_interval'. Waiting is done on 'stop_event' (if given), so a stop request
+    ends the wait immediately.
+
+    Returns:
+        bool: True if the predicate held, False on timeout or when 'stop_event' was set.
+    """
+    deadline = time.monotonic() + timeout
+    interval = poll_interval
+    while True:
+        if predicate():
+            return True
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return False
+        delay = min(interval, remaining)
+        if stop_event is not None:
+            if stop_event.wait(delay):
+                return False
+        else:
+            time.sleep(delay)
+        interval = min(interval * 2, max_poll_interval)
+
+
+def _get_title_display():
+    global _title_display
+    with _title_display_lock:
+        if _title_display is None:
+            _title_display = xdisplay.Display()
+        return _title_display
+
+
+def active_window_title():
+    """Returns the title of the focused window ('' if there is none)."""
+    if platform.system() == "Linux" and xdisplay is not None:
+        display = _get_title_display()
+        root = display.screen().root
+        active = root.get_full_property(display.get_atom("_NET_ACTIVE_WINDOW"), X.AnyPropertyType)
+        if active is None or not active.value or not active.value[0]:
+            return ""
+        window = display.create_resource_object("window", active.value[0])
+        title = window.get_full_property(display.get_atom("_NET_WM_NAME"), display.get_atom("UTF8_STRING"))
+        if title is None:
+            title = window.get_full_property(Xatom.WM_NAME, X.AnyPropertyType)
+        if title is None:
+            return ""
+        value = title.value
+        return value.decode("utf-8", errors="replace") if isinstance(value, bytes) else str(value)
+
+    get_title = getattr(pyautogui, "getActiveWindowTitle", None)  # Windows (pygetwindow)
+    if get_title is None:
+        raise RuntimeError("Reading the active window title is not supported on this platform.")
+    return get_title() or ""
+
+
+def _parse_box(params):
+    """(x, y, width, height) from a 'region' or 'point' parameter."""
+    if "point" in params:
+        point = params["point"]
+        box = (point.get("x"), point.get("y"), 1, 1) if isinstance(point, dict) else None
+    else:
+        region = params.get("region")
+        box = (tuple(region.get(key) for key in ("x", "y", "width", "height"))
+               if isinstance(region, dict) else None)
+    if box is None or not all(isinstance(value, int) for value in box):
+        raise ValueError("region_changed needs 'region' {x, y, width, height} or 'point' {x, y} with integer values.")
+    if box[2] <= 0 or box[3] <= 0:
+        raise ValueError("region_changed: 'width' and 'height' must be positive.")
+    return box
+
+
+class ClipboardChanged:
+    def __init__(self, params):
+        pass
+
+    def arm(self, runner):
+        clipboard = get_clipboard_service()
+        before = clipboard.paste()
+        return lambda: clipboard.paste() != before
+
+
+class RegionChanged:
+    def __init__(self, params):
+        self.box = _parse_box(params)
+
+    def arm(self, runner):
+        before = screen_capture.grab(self.box).copy()  # grab() reuses its buffer
+        return lambda: not np.array_equal(screen_capture.grab(self.box), before)
+
+
+class WindowTitleMatches:
+    def __init__(self, params):
+        pattern = params.get("pattern")
+        if not isinstance(pattern, str) or not pattern:
+            raise ValueError("window_title_matches needs a 'pattern' (regular expression).")
+        if "${" not in pattern:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"window_title_matches: invalid 'pattern': {e}")
+        self.pattern = pattern
+
+    def arm(self, runner):
+        regex = re.compile(runner._substitute_variables(self.pattern))
+        return lambda: regex.search(active_window_title()) is not None
+
+
+class FileExists:
+    def __init__(self, params):
+        path = params.get("path")
+        if not isinstance(path, str) or not path:
+            raise ValueError("file_exists needs a 'path'.")
+        self.path = path
+
+    def arm(self, runner):
+        path = os.path.expanduser(runner._substitute_variables(self.path))
+        return lambda: os.path.exists(path)
+
+
+CONDITIONS = {
+    "clipboard_changed": ClipboardChanged,
+    "region_changed": RegionChanged,
+    "window_title_matches": WindowTitleMatches,
+    "file_exists": FileExists,
+}
+
+
+class PostCondition:
+    """A parsed 'wait_until' specification of a compiled step."""
+
+    __slots__ = ("name", "condition", "timeout", "poll_interval", "max_poll_interval", "required")
+
+    def __init__(self, name, condition, timeout, poll_interval, max_poll_interval, required):
+        self.name = name
+        self.condition = condition
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.required = required  # False: a timeout is only logged and the scenario continues
+
+    def arm(self, runner):
+        """Captures the 'before' state. Returns the predicate to wait for after the action."""
+        return self.condition.arm(runner)
+
+    def wait(self, predicate, stop_event=None):
+        return wait_until(predicate, self.timeout, self.poll_interval, self.max_poll_interval, stop_event)
+
+
+def parse_post_condition(spec):
+    """
+    Parses a 'wait_until' object.
+
+    Raises:
+        ValueError: If the specification is invalid.
+    """
+    if not isinstance(spec, dict):
+        raise ValueError("'wait_until' must be a JSON object.")
+    name = spec.get("condition")
+    condition_class = CONDITIONS.get(name)
+    if condition_class is None:
+        raise ValueError(f"Unknown wait_until condition '{name}'. Available conditions: {sorted(CONDITIONS)}")
+
+    numbers = {}
+    for key, default in (("timeout", DEFAULT_TIMEOUT_SECONDS),
+                         ("poll_interval", DEFAULT_POLL_INTERVAL_SECONDS),
+                         ("max_poll_interval", DEFAULT_MAX_POLL_INTERVAL_SECONDS)):
+        value = spec.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+            raise ValueError(f"wait_until '{key}' must be a positive number.")
+        numbers[key] = float(value)
+    required = spec.get("required", True)
+    if not isinstance(required, bool):
+        raise ValueError("wait_until 'required' must be true or false.")
+
+    return PostCondition(name, condition_class(spec), numbers["timeout"], numbers["poll_interval"],
+                         max(numbers["max_poll_interval"], numbers["poll_interval"]), required)